@@ -11,7 +11,7 @@ import { useFirestoreEventSchedules } from '../../hooks/useFirestoreEventSchedul
 import { useFirestoreMembers } from '../../hooks/useFirestoreMembers';
 import { useFirestoreAdmins } from '../../hooks/useFirestoreAdmins';
 import { useFirestoreEventsWithAttendees } from '../../hooks/useFirestoreEventsWithAttendees';
-import heroesData from '../../data/heroes.json';
+import { heroSummaries } from '../../data/hero-chunks';
 // BlurView moved to modal components
 import { Ionicons } from '@expo/vector-icons';
 import { LinearGradient } from 'expo-linear-gradient';
@@ -56,7 +56,7 @@ Notifications.setNotificationHandler({
     }),
 });
 
-const HERO_NAMES = heroesData.map(h => h.name);
+const HERO_NAMES = heroSummaries.map(h => h.name);
 // Note: Options are localized in the render function using t()
 const FORTRESS_IDS = Array.from({ length: 12 }, (_, i) => `fortress_${i + 1}`);
 const CITADEL_IDS = Array.from({ length: 4 }, (_, i) => `citadel_${i + 1}`);
@@ -1,9 +1,9 @@
-import React, { useState } from 'react';
-import { View, Text, ScrollView, TouchableOpacity, Image, StyleSheet, Pressable } from 'react-native';
+import React, { useEffect, useState } from 'react';
+import { View, Text, ScrollView, TouchableOpacity, Image, StyleSheet, Pressable, ActivityIndicator } from 'react-native';
 import { Stack, useLocalSearchParams, useRouter, useNavigation } from 'expo-router';
 import { BlurView } from 'expo-blur';
 import { Ionicons } from '@expo/vector-icons';
-import heroesData from '../../data/heroes.json';
+import { Hero, loadHero } from '../../data/hero-chunks';
 import { heroImages } from '../../assets/images/heroes';
 import { skillIcons } from '../../assets/images/skill-icons';
 import { useAuth, useTheme } from '../context';
@@ -58,7 +58,16 @@ export default function HeroDetail() {
     const { t } = useTranslation();
     const router = useRouter();
     const navigation = useNavigation();
-    const hero = heroesData.find(h => h.id === id);
+    // undefined while the hero's generation chunk is loading, null if there is no such hero
+    const [hero, setHero] = useState<Hero | null | undefined>(undefined);
+    useEffect(() => {
+        let active = true;
+        setHero(undefined);
+        (typeof id === 'string' ? loadHero(id) : Promise.resolve(undefined))
+            .then(found => { if (active) setHero(found ?? null); })
+            .catch(() => { if (active) setHero(null); });
+        return () => { active = false; };
+    }, [id]);
     const { theme, fontSizeScale } = useTheme();
     const isDark = theme === 'dark';
     const [activeTab, setActiveTab] = useState('story');
@@ -167,6 +176,14 @@ export default function HeroDetail() {
         '천재': 'genius'
     };
 
+    if (hero === undefined) {
+        return (
+            <View className="flex-1 bg-brand-dark items-center justify-center">
+                <ActivityIndicator size="large" color="#38bdf8" />
+            </View>
+        );
+    }
+
     if (!hero) {
         return (
             <View className="flex-1 bg-brand-dark items-center justify-center">
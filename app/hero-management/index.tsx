@@ -5,7 +5,7 @@ import { BlurView } from 'expo-blur';
 import { useAuth, useTheme } from '../context';
 import { useTranslation } from 'react-i18next';
 import { Ionicons } from '@expo/vector-icons';
-import heroesData from '../../data/heroes.json';
+import { heroSummaries } from '../../data/hero-chunks';
 
 import { heroImages } from '../../assets/images/heroes';
 
@@ -74,7 +74,7 @@ export default function HeroManagement() {
         ...Array.from({ length: 15 }, (_, i) => ({ id: `S${i + 1}`, label: t('heroes.categories.gen_format', { gen: i + 1 }) })),
     ];
 
-    const filteredHeroes = heroesData
+    const filteredHeroes = heroSummaries
         .filter(hero => {
             // Filter Logic
             if (selectedCategory === '레어') return hero.rarity === '레어';
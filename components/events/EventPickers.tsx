@@ -8,10 +8,10 @@ import React, { useState, useMemo, useEffect, useRef, useCallback, memo } from '
 import { View, Text, TextInput, ScrollView, TouchableOpacity, Dimensions } from 'react-native';
 import { useTranslation } from 'react-i18next';
 import { Ionicons } from '@expo/vector-icons';
-import heroesData from '../../data/heroes.json';
+import { heroSummaries } from '../../data/hero-chunks';
 
 // 영웅 원본 데이터(JSON)에서 'name(이름)'만 쏙 뽑아서 배열(Array) 리스트로 만듭니다.
-const HERO_NAMES = heroesData.map(h => h.name);
+const HERO_NAMES = heroSummaries.map(h => h.name);
 
 // --- HeroPicker ---
 export const HeroPicker = memo(({ value, onSelect, num, isDark }: { value: string, onSelect: (v: string) => void, num: number, isDark: boolean }) => {
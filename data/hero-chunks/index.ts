@@ -0,0 +1,72 @@
+// Auto-generated by `python -m tools.heroes_chunks` from data/heroes.json -- do not edit.
+
+import summary from './summary.json';
+
+export interface HeroSkill {
+    name: string;
+    desc?: string;
+    icon?: string;
+    [key: string]: unknown;
+}
+
+export interface HeroEquipment {
+    name?: string;
+    icon?: string;
+    power?: string | number;
+    skills?: HeroSkill[];
+    [key: string]: unknown;
+}
+
+export interface Hero {
+    id: string;
+    name: string;
+    type: string;
+    gen: string;
+    rarity: string;
+    image: string;
+    displayInfo?: { rarity?: string; class?: string; subClass?: string };
+    description?: string;
+    skills?: {
+        exploration?: HeroSkill[];
+        expedition?: HeroSkill[];
+        special?: HeroSkill[];
+        equipment?: HeroEquipment;
+    };
+    equipment?: HeroEquipment;
+}
+
+export type HeroSummary = (typeof summary)[number];
+
+export const heroSummaries: HeroSummary[] = summary;
+
+// Dynamic imports, so each generation is a separate module the bundler can split out.
+const chunks: { [gen: string]: () => Promise<{ default: unknown }> } = {
+    'S1': () => import('./gen-s1.json'),
+    'S2': () => import('./gen-s2.json'),
+    'S3': () => import('./gen-s3.json'),
+    'S4': () => import('./gen-s4.json'),
+    'S5': () => import('./gen-s5.json'),
+    'S6': () => import('./gen-s6.json'),
+    'S7': () => import('./gen-s7.json'),
+    'S8': () => import('./gen-s8.json'),
+    'S9': () => import('./gen-s9.json'),
+    'S10': () => import('./gen-s10.json'),
+    'S11': () => import('./gen-s11.json'),
+    'S12': () => import('./gen-s12.json'),
+    'S13': () => import('./gen-s13.json'),
+    'S14': () => import('./gen-s14.json'),
+    'S15': () => import('./gen-s15.json'),
+    '상설': () => import('./gen-permanent.json'),
+};
+
+const summaryById = new Map(summary.map(h => [h.id, h]));
+
+export async function loadHeroChunk(gen: string): Promise<Hero[]> {
+    const load = chunks[gen];
+    return load ? ((await load()).default as Hero[]) : [];
+}
+
+export async function loadHero(id: string): Promise<Hero | undefined> {
+    const entry = summaryById.get(id);
+    return entry ? (await loadHeroChunk(entry.gen)).find(h => h.id === id) : undefined;
+}
@@ -0,0 +1,97 @@
+import json
+import struct
+import zlib
+
+import pytest
+
+from tools import asset_refs, common
+from tools.asset_refs import read_header, verify
+
+
+def png(width, height):
+    ihdr = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    chunk = struct.pack('>I', len(ihdr)) + b'IHDR' + ihdr + struct.pack('>I', zlib.crc32(b'IHDR' + ihdr))
+    return b'\x89PNG\r\n\x1a\n' + chunk + b'\x00' * 200
+
+
+def jpeg(width, height):
+    app0 = b'\xff\xe0' + struct.pack('>H', 16) + b'JFIF\x00' + b'\x00' * 9
+    sof = b'\xff\xc0' + struct.pack('>HBHHB', 11, 8, height, width, 3) + b'\x00' * 6
+    return b'\xff\xd8' + app0 + sof + b'\x00' * 200
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    assets = tmp_path / 'assets'
+    (assets / 'images' / 'heroes').mkdir(parents=True)
+    (assets / 'images' / 'skill-icons').mkdir()
+    (tmp_path / 'app').mkdir()
+    (assets / 'images' / 'heroes' / 'gwen.png').write_bytes(png(350, 350))
+    (assets / 'images' / 'heroes' / 'nora.jpg').write_bytes(png(350, 350))      # PNG saved as .jpg
+    (assets / 'images' / 'skill-icons' / 'gwen_1.png').write_bytes(png(400, 400))
+    (assets / 'images' / 'unused.png').write_bytes(png(10, 10))
+    (assets / 'images' / 'heroes' / 'index.ts').write_text(
+        "export const heroImages = {\n  'gwen.png': require('./gwen.png'),\n  'nora.jpg': require('./nora.jpg'),\n};\n",
+        encoding='utf-8')
+    (assets / 'images' / 'skill-icons' / 'index.ts').write_text(
+        "export const skillIcons = {\n  'gwen_1.png': require('./gwen_1.png'),\n};\n", encoding='utf-8')
+    (tmp_path / 'app' / 'index.tsx').write_text(
+        "const a = require('../assets/images/bg-main.png');\n", encoding='utf-8')
+    heroes = [{'id': 'gwen', 'image': 'gwen.png', 'skills': {'exploration': [{'icon': 'gwen_1.png'}]}},
+              {'id': 'nora', 'image': 'nora.jpg', 'equipment': {'icon': 'item_icon_1.png'}},
+              {'id': 'wu', 'image': 'wu.png'}]
+    (tmp_path / 'heroes.json').write_text(json.dumps(heroes), encoding='utf-8')
+    for module in (common, asset_refs):
+        monkeypatch.setattr(module, 'REPO_ROOT', tmp_path)
+    monkeypatch.setattr(asset_refs, 'ASSETS_DIR', assets)
+    monkeypatch.setattr(asset_refs, 'APP_JSON', tmp_path / 'app.json')
+    monkeypatch.setattr(asset_refs, 'HEROES_JSON', tmp_path / 'heroes.json')
+    monkeypatch.setattr(asset_refs, 'HERO_INDEX', assets / 'images' / 'heroes' / 'index.ts')
+    monkeypatch.setattr(asset_refs, 'SKILL_INDEX', assets / 'images' / 'skill-icons' / 'index.ts')
+    return tmp_path
+
+
+@pytest.mark.parametrize('data, expected', [
+    (png(640, 480), ('png', 640, 480)),
+    (jpeg(1024, 768), ('jpeg', 1024, 768)),
+    (b'GIF89a' + struct.pack('<HH', 16, 8) + b'\x00' * 20, ('gif', 16, 8)),
+    (b'<html>not an image</html>', ('unknown', 0, 0)),
+    (b'', ('unknown', 0, 0)),
+])
+def test_read_header(tmp_path, data, expected):
+    path = tmp_path / 'image.bin'
+    path.write_bytes(data)
+    info = read_header(path)
+    assert (info.format, info.width, info.height) == expected
+    assert info.bytes == len(data)
+
+
+def test_verify_reports_every_problem_in_one_pass(repo):
+    report = verify(jobs=2)
+    assert sorted(report['references']) == [
+        'assets/images/bg-main.png', 'assets/images/heroes/gwen.png', 'assets/images/heroes/nora.jpg',
+        'assets/images/skill-icons/gwen_1.png',
+    ]
+    assert report['references']['assets/images/bg-main.png'] == ['app/index.tsx:1']
+    assert report['missing'] == [
+        ('app/index.tsx:1', 'assets/images/bg-main.png', 'file not found'),
+        ('heroes.json:wu', 'wu.png', 'not in assets/images/heroes/index.ts'),
+    ]
+    assert report['orphaned'] == ['assets/images/unused.png']
+    assert report['invalid'] == [('assets/images/heroes/nora.jpg', 'extension says jpeg, header says png')]
+    assert [path for path, _ in report['oversized']] == ['assets/images/skill-icons/gwen_1.png']
+    assert report['remote_icons'] == 1
+
+
+def test_case_mismatch_is_named(repo):
+    (repo / 'app' / 'index.tsx').write_text("require('../assets/images/Unused.png');\n", encoding='utf-8')
+    assert verify()['missing'][0] == ('app/index.tsx:1', 'assets/images/Unused.png',
+                                      'case differs from assets/images/unused.png')
+
+
+def test_main_fails_on_missing_assets_and_writes_the_index(repo, capsys):
+    out = repo / 'out' / 'index.json'
+    assert asset_refs.main(['--quiet', '--json', str(out)]) == 1
+    assert '2 missing, 1 orphaned, 1 oversized, 1 invalid' in capsys.readouterr().out
+    index = json.loads(out.read_text(encoding='utf-8'))
+    assert index['assets']['assets/images/heroes/gwen.png']['width'] == 350
@@ -0,0 +1,87 @@
+import pytest
+
+from tools import build_logs
+from tools.build_logs import LogDB, parse_deploy, regressions, unwrap
+
+HEAD = ('Vercel CLI 44.4.3\n'
+        'Retrieving project…\n'
+        'Inspect: https://vercel.com/team/wos/{id} [2s]\n'
+        '2026-02-02T07:53:00.000Z  Running build in Washington, D.C., USA (East) – iad1\n'
+        '2026-02-02T07:53:10.000Z  Bundled {bundle}ms\n'
+        '2026-02-02T07:53:11.000Z  _expo/static/js/web/entry-0123456789abcdef0123456789abcdef.js (3.5 MB)\n'
+        '2026-02-02T07:53:11.000Z  assets/images/bg-main.png (600 kB)\n'
+        '2026-02-02T07:53:12.000Z  npm warn deprecated inflight@1.0.6\n')
+TAIL = ('2026-02-02T07:{end}.000Z  Build Completed in /vercel/output [79s]\n'
+        'Production: https://wos-abc.vercel.app [80s]\n'
+        'Deployment completed\n')
+
+
+def transcript(run_id='AbCdEf123', bundle=62000, end='54:19'):
+    return HEAD.format(id=run_id, bundle=bundle) + TAIL.format(end=end)
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = LogDB(tmp_path / 'logs.sqlite')
+    yield db
+    db.close()
+
+
+def test_parse_deploy():
+    run = parse_deploy(transcript().splitlines(), 'deploy.txt')
+    assert {k: run[k] for k in ('id', 'url', 'bundle_ms', 'build_seconds', 'errors', 'warnings', 'files')} == {
+        'id': 'AbCdEf123', 'url': 'https://wos-abc.vercel.app', 'bundle_ms': 62000, 'build_seconds': 79.0,
+        'errors': 0, 'warnings': 1, 'files': 2}
+    assert run['artifacts'] == [('_expo/static/js/web/entry.js', 3_500_000), ('assets/images/bg-main.png', 600_000)]
+    assert (run['js_bytes'], run['asset_bytes']) == (3_500_000, 600_000)
+
+
+def test_unwrap_rejoins_console_width_lines():
+    text = 'A' * 30 + '\nBBB\n' + 'C' * 30 + '\n' + 'D' * 30 + '\nE\n'
+    assert unwrap(text) == ['A' * 30 + 'BBB', 'C' * 30 + 'D' * 30 + 'E']
+    assert unwrap('short\nlines\nonly\n') == ['short', 'lines', 'only']
+
+
+def test_ingest_is_incremental_and_waits_for_a_complete_run(db, tmp_path):
+    log = tmp_path / 'deploy_log.txt'
+    # PowerShell captures are UTF-16 with a BOM.
+    log.write_bytes(b'\xff\xfe' + HEAD.format(id='AbCdEf123', bundle=62000).encode('utf-16-le'))
+    assert db.ingest(log) == 0                     # still being written
+    log.write_bytes(b'\xff\xfe' + transcript().encode('utf-16-le'))
+    assert db.ingest(log) == 1
+    assert db.ingest(log) == 0                     # nothing new
+    with open(log, 'ab') as f:
+        f.write(transcript('XyZ987654', bundle=64000, end='55:40').encode('utf-16-le'))
+    assert db.ingest(log) == 1
+    assert [(r['id'], r['bundle_ms']) for r in db.runs()] == [('AbCdEf123', 62000), ('XyZ987654', 64000)]
+
+
+def test_rewritten_log_is_parsed_from_the_start(db, tmp_path):
+    log = tmp_path / 'deploy_result.txt'
+    log.write_text(transcript(), encoding='utf-8')
+    assert db.ingest(log) == 1
+    log.write_text(transcript('New000001'), encoding='utf-8')
+    assert db.ingest(log) == 1
+    assert [r['id'] for r in db.runs()] == ['AbCdEf123', 'New000001']
+
+
+def test_deployment_lists_store_urls_once(db, tmp_path):
+    log = tmp_path / 'deployments.txt'
+    log.write_text('  https://wos-commander-kyc5omn4l-sejunsong-6398s-projects.vercel.app  Ready\n'
+                   '  https://wos-commander-kyc5omn4l-sejunsong-6398s-projects.vercel.app  Ready\n'
+                   '  https://wos-commander-gj1ypl7ep-team.vercel.app  Ready\n'
+                   '  https://wos-commander.vercel.app  (alias)\n', encoding='utf-8')
+    assert db.ingest(log) == 2
+    assert [row[0] for row in db.conn.execute('SELECT deployment FROM deployments ORDER BY url')] == [
+        'gj1ypl7ep', 'kyc5omn4l']
+
+
+def test_regressions_need_a_relative_and_an_absolute_jump():
+    def run(run_id, build, js):
+        row = {metric: None for metric, *_ in build_logs.METRICS}
+        return {**row, 'id': run_id, 'build_seconds': build, 'js_bytes': js}
+
+    runs = [run('a', 80, 3_500_000), run('b', 82, 3_510_000), run('c', 81, 3_505_000), run('d', 120, 3_520_000)]
+    [(flagged, baseline, found)] = regressions(runs, window=3)
+    assert flagged['id'] == 'd' and len(baseline) == 3
+    assert [(metric, value, median) for metric, _, value, median, _ in found] == [('build_seconds', 120, 81)]
@@ -0,0 +1,71 @@
+import pytest
+
+from tools.common import decode_bytes, encode_text, find_mojibake, read_text
+from tools import text_encoding
+from tools.text_encoding import classify_file
+
+KOREAN = '영웅 이름: 제시'
+
+SAMPLES = [
+    # (bytes, kind, codec)
+    (KOREAN.encode('utf-8'), 'utf-8', 'utf-8'),
+    (b'const a = 1;\n', 'utf-8', 'utf-8'),
+    (b'\xef\xbb\xbf' + KOREAN.encode('utf-8'), 'utf-8-bom', 'utf-8-sig'),
+    (b'\xff\xfe' + KOREAN.encode('utf-16-le'), 'utf-16-le', 'utf-16'),
+    (b'\xfe\xff' + KOREAN.encode('utf-16-be'), 'utf-16-be', 'utf-16'),
+    ('Vercel CLI 33.0.0\r\n'.encode('utf-16-le'), 'utf-16-le', 'utf-16-le'),   # NUL pattern, no BOM
+    ('영웅이름제시'.encode('utf-16-le'), 'utf-16-le', 'utf-16-le'),              # no BOM and no NUL bytes
+    (KOREAN.encode('cp949'), 'cp949', 'cp949'),
+    ('const name = "제시";\n'.encode('cp949'), 'cp949', 'cp949'),
+]
+
+
+@pytest.mark.parametrize('data, kind, codec', SAMPLES)
+def test_decode_bytes_classifies_and_round_trips(data, kind, codec):
+    text, encoding = decode_bytes(data)
+    assert (encoding.kind, encoding.codec) == (kind, codec)
+    assert '\ufffd' not in text
+    assert encode_text(text, encoding) == data
+
+
+def test_mojibake_is_recognised():
+    # CP949 bytes that were read as Latin-1 and saved again as UTF-8.
+    damaged = KOREAN.encode('cp949').decode('latin-1').encode('utf-8')
+    text, encoding = decode_bytes(damaged)
+    assert encoding.kind == 'mojibake'
+    assert text.encode('latin-1').decode('cp949') == KOREAN
+    assert find_mojibake(damaged) == 0
+
+
+def test_accented_latin_text_is_not_mojibake():
+    assert decode_bytes('Café, naïve, Ærø'.encode('utf-8'))[1].kind == 'utf-8'
+
+
+def test_undecodable_bytes_are_unknown():
+    text, encoding = decode_bytes(b'\x80\xff\xfe\x81 x')
+    assert encoding.kind == 'unknown'
+    assert '\ufffd' in text
+
+
+def test_read_text_and_classify_file_agree(tmp_path):
+    path = tmp_path / 'legacy.txt'
+    path.write_bytes(b'\xff\xfe' + KOREAN.encode('utf-16-le'))
+    assert read_text(path) == KOREAN
+    assert classify_file(path).kind == 'utf-16-le'
+
+
+def test_classify_file_decodes_only_ambiguous_files(tmp_path, monkeypatch):
+    samples = {
+        'bom.txt': b'\xef\xbb\xbf' + KOREAN.encode('utf-8'),
+        'utf16.txt': 'Vercel CLI 33.0.0\r\n'.encode('utf-16-le'),
+        'ascii.txt': b'plain ascii\n' * 100,
+        'cp949.txt': KOREAN.encode('cp949'),
+    }
+    expected = {}
+    for name, data in samples.items():
+        (tmp_path / name).write_bytes(data)
+        expected[name] = decode_bytes(data)[1]
+    decoded = []
+    monkeypatch.setattr(text_encoding, 'decode_bytes', lambda data: decoded.append(data) or decode_bytes(data))
+    assert {name: classify_file(tmp_path / name) for name in samples} == expected
+    assert decoded == [samples['cp949.txt']]
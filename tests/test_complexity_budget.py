@@ -0,0 +1,104 @@
+import subprocess
+
+import pytest
+
+from tools import complexity_budget
+from tools.complexity_budget import Commit, Metrics, budget_for, check_range, check_tip, measure
+
+CARD = """import React, { memo } from 'react';
+
+function Header() {
+    return <View style={{ padding: 4 }}><Text>title</Text></View>;
+}
+
+const Badge = memo(({ n }: { n: number }) => <Text style={[styles.badge, { color: 'red' }]}>{n}</Text>);
+const helper = (x: number) => x + 1;
+
+export default class Card extends React.Component {
+    render() {
+        return <View><View><Header /><Badge n={helper(1)} /></View></View>;
+    }
+}
+"""
+
+
+def test_measure():
+    metrics = measure('components/Card.tsx', CARD.encode('utf-8'))
+    assert metrics == Metrics(len(CARD.encode('utf-8')), 3, 2, 3)
+
+
+def test_budget_for_takes_the_first_matching_limit(monkeypatch):
+    monkeypatch.setattr(complexity_budget, 'BUDGETS', (
+        ('app/growth/events.tsx', {'jsx_depth': 25}),
+        ('app/*', {'jsx_depth': 30, 'bytes': 100}),
+    ))
+    assert budget_for('app/growth/events.tsx') == {'jsx_depth': 25, 'bytes': 100}
+    assert budget_for('components/Card.tsx') == {}
+
+
+def _history():
+    metrics = {'a': Metrics(100, 10, 0, 1), 'b': Metrics(300, 10, 0, 1), 'c': Metrics(400, 10, 0, 1),
+               'd': Metrics(150, 10, 0, 1)}
+    commits = [Commit('1', 0, 'add card', {'components/Card.tsx': 'a'}),
+               Commit('2', 1, 'grow card', {'components/Card.tsx': 'b'}),
+               Commit('3', 2, 'grow card more', {'components/Card.tsx': 'c'})]
+    return commits, metrics
+
+
+@pytest.fixture
+def budget(monkeypatch):
+    monkeypatch.setattr(complexity_budget, 'BUDGETS', (('components/Card.tsx', {'bytes': 200}),))
+
+
+def test_tip_violation_is_blamed_on_the_commit_that_crossed_the_budget(budget):
+    commits, metrics = _history()
+    [violation] = check_tip(commits, metrics)
+    assert (violation.value, violation.limit, violation.before, violation.commit.sha) == (400, 200, 100, '2')
+    # Back under budget: nothing to report.
+    commits.append(Commit('4', 3, 'split card', {'components/Card.tsx': 'd'}))
+    assert check_tip(commits, metrics) == []
+
+
+def test_range_reports_commits_that_break_or_worsen_a_budget(budget):
+    commits, metrics = _history()
+    assert [(v.commit.sha, v.before, v.value) for v in check_range(commits, metrics, {'2', '3'})] == [
+        ('2', 100, 300), ('3', 300, 400)]
+    assert check_range(commits, metrics, {'1'}) == []
+
+
+@pytest.fixture
+def git_repo(tmp_path, monkeypatch):
+    def git(*args):
+        subprocess.run(['git', *args], cwd=tmp_path, check=True, capture_output=True)
+
+    git('init', '-q')
+    git('config', 'user.email', 'dev@example.com')
+    git('config', 'user.name', 'dev')
+    (tmp_path / 'components').mkdir()
+    card = tmp_path / 'components' / 'Card.tsx'
+    for subject, text in (('add card', 'export const A = () => <View />;\n'), ('grow card', CARD)):
+        card.write_text(text, encoding='utf-8')
+        git('add', '.')
+        git('commit', '-q', '-m', subject)
+    cache = {}
+    monkeypatch.setattr(complexity_budget, 'REPO_ROOT', tmp_path)
+    monkeypatch.setattr(complexity_budget, 'load_cache', lambda name: cache.get(name, {}))
+    monkeypatch.setattr(complexity_budget, 'save_cache', lambda name, data: cache.__setitem__(name, data))
+    monkeypatch.setattr(complexity_budget, 'BUDGETS', (('components/Card.tsx', {'jsx_depth': 2}),))
+    return tmp_path
+
+
+def test_main_reads_the_git_history(git_repo, capsys):
+    assert complexity_budget.main(['--jobs', '1']) == 1
+    out, err = capsys.readouterr()
+    assert out.startswith('components/Card.tsx: jsx_depth 3 > budget 2 (was 1; ')
+    assert out.rstrip().endswith('grow card)')
+    assert err.startswith('2 commits, 2 TSX blobs, 1 budget violation(s)')
+
+    assert complexity_budget.main(['--history', 'components/Card.tsx']) == 0
+    assert len(capsys.readouterr().out.splitlines()) == 3
+
+
+def test_main_reports_a_bad_range(git_repo, capsys):
+    assert complexity_budget.main(['--range', 'nosuchref..HEAD~5']) == 2
+    assert capsys.readouterr().err.startswith('error: ')
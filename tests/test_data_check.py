@@ -0,0 +1,65 @@
+import pytest
+
+from tools.data_check import check_file, check_json, check_module
+
+
+def _json(text):
+    return [(d.rule, d.line, d.col, d.fix) for d in check_json('x.json', text)]
+
+
+def _module(text):
+    return [(d.rule, d.line, d.col, d.fix) for d in check_module('x.ts', text)]
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('{"a": 1, "a": 2}', [('duplicate-key', 1, 10, None)]),
+    ('[1, 2,]', [('trailing-comma', 1, 6, '')]),
+    ('{"a" 1}', [('missing-colon', 1, 5, ':')]),
+    ('[{"id": 1} {"id": 2}]', [('missing-comma', 1, 11, ',')]),
+    ("{a: 'x'}", [('invalid-key', 1, 2, '"a"'), ('invalid-value', 1, 5, '"x"')]),
+    ('[', [('unclosed-bracket', 1, 1, ']')]),
+    ('[{"id": "a"}, {"id": "b", "skills": [{"id": "a"}]}]', []),
+])
+def test_json_diagnostics(text, expected):
+    assert _json(text) == expected
+
+
+def test_json_reports_every_error_in_one_pass():
+    text = '[\n  {"id": "a", "n": 1,},\n  {"id": "a" "n": 2}\n'
+    assert [(rule, line, col) for rule, line, col, _ in _json(text)] == [
+        ('unclosed-bracket', 1, 1), ('trailing-comma', 2, 21), ('duplicate-id', 3, 10), ('missing-comma', 3, 13),
+    ]
+
+
+def test_numeric_and_string_ids_are_different():
+    diagnostics = check_json('x.json', '[{"id": 1}, {"id": "1"}, {"id": 1}]')
+    assert [(d.rule, d.col, d.message) for d in diagnostics] == [
+        ('duplicate-id', 33, 'duplicate id 1 (first at line 1)'),
+    ]
+
+
+def test_module_accepts_typescript_literals():
+    text = ("export const EVENTS = [\n"
+            "  { id: 'a', title: '곰 사냥', },\n"
+            "  { id: 'b', ...base, [key]: 1, run() { return 1 }, icon },\n"
+            "];\n"
+            "const n = 1 < 2 ? { a: 1 } : {};\n")
+    assert _module(text) == []
+
+
+@pytest.mark.parametrize('text, expected', [
+    ("export const A = [{ id: 'a' }, { id: 'a' }];\n", [('duplicate-id', 1, 38, None)]),
+    ('const B = { a: 1, a: 2 };\n', [('duplicate-key', 1, 19, None)]),
+    ('export default {\n  a: 1\n  b: [1, 2,\n};\n', [('missing-comma', 2, 7, ','), ('unclosed-bracket', 3, 6, ']')]),
+])
+def test_module_diagnostics(text, expected):
+    assert _module(text) == expected
+
+
+def test_check_file_picks_the_mode_and_decodes_legacy_files(tmp_path):
+    ts = tmp_path / 'events.ts'
+    ts.write_bytes("export const A = [{ id: '곰' }, { id: '곰' }];\n".encode('cp949'))
+    json_file = tmp_path / 'heroes.json'
+    json_file.write_bytes(b'\xef\xbb\xbf' + "[{'id': 1}]".encode('utf-8'))
+    assert [d.rule for d in check_file(ts)] == ['duplicate-id']
+    assert [(d.rule, d.line, d.col) for d in check_file(json_file)] == [('invalid-key', 1, 3)]
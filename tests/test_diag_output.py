@@ -0,0 +1,73 @@
+import io
+import json
+
+from tools import tsx_check
+from tools.diag_output import SARIF_SCHEMA, diagnostic_dict, open_writer
+from tools.tsx_check import RULES, Diagnostic
+
+UNCLOSED = Diagnostic('unclosed-tag', 'app/a.tsx', 3, 5, 3, 6, '<View> is never closed', '</View>')
+STRAY = Diagnostic('unmatched-bracket', 'app/b.tsx', 7, 10, 7, 11, "'}' has no opening bracket", '')
+MISMATCH = Diagnostic('mismatched-bracket', 'app/b.tsx', 9, 2, 9, 3, "')' does not match '['", ']')
+
+
+class Stream(io.StringIO):
+    """Records what had been written at every flush."""
+
+    def __init__(self):
+        super().__init__()
+        self.flushed = []
+
+    def flush(self):
+        self.flushed.append(self.getvalue())
+
+
+def _write(fmt, diagnostics):
+    stream = Stream()
+    writer = open_writer(fmt, 'tools.tsx_check', RULES, stream)
+    for d in diagnostics:
+        writer.emit(d)
+    writer.close()
+    return stream
+
+
+def test_jsonl_is_one_object_per_diagnostic_flushed_as_it_comes():
+    stream = _write('jsonl', [UNCLOSED, STRAY])
+    lines = stream.getvalue().splitlines()
+    assert [json.loads(line) for line in lines] == [diagnostic_dict(UNCLOSED), diagnostic_dict(STRAY)]
+    assert json.loads(lines[0])['span'] == {'start': {'line': 3, 'col': 5}, 'end': {'line': 3, 'col': 6}}
+    assert stream.flushed == [lines[0] + '\n', lines[0] + '\n' + lines[1] + '\n']
+
+
+def test_sarif_streams_a_complete_document():
+    stream = _write('sarif', [UNCLOSED, STRAY, MISMATCH])
+    # The header and every result are flushed before the run is over.
+    assert len(stream.flushed) == 5
+    assert '"ruleId": "unclosed-tag"' in stream.flushed[1] and '"ruleId"' not in stream.flushed[0]
+    document = json.loads(stream.getvalue())
+    assert document['$schema'] == SARIF_SCHEMA
+    run = document['runs'][0]
+    assert [r['id'] for r in run['tool']['driver']['rules']] == list(RULES)
+    unclosed, stray, mismatch = run['results']
+    assert unclosed['properties'] == {'missingText': '</View>'} and 'fixes' not in unclosed
+    assert stray['fixes'][0]['description'] == {'text': 'delete'}
+    [replacement] = mismatch['fixes'][0]['artifactChanges'][0]['replacements']
+    assert replacement == {'deletedRegion': {'startLine': 9, 'startColumn': 2, 'endLine': 9, 'endColumn': 3},
+                           'insertedContent': {'text': ']'}}
+
+
+def test_sarif_without_results_is_still_valid():
+    assert json.loads(_write('sarif', []).getvalue())['runs'][0]['results'] == []
+
+
+def test_text_is_the_default():
+    assert _write('nonsense', [STRAY]).getvalue() == "app/b.tsx:7:10: unmatched-bracket: '}' has no opening bracket\n"
+
+
+def test_tsx_check_main_streams_jsonl(tmp_path, capsys):
+    path = tmp_path / 'card.tsx'
+    path.write_text('const a = <View></View></View>;\n', encoding='utf-8')
+    assert tsx_check.main([str(path), '--format', 'jsonl', '--jobs', '1']) == 1
+    out, err = capsys.readouterr()
+    [record] = [json.loads(line) for line in out.splitlines()]
+    assert (record['rule'], record['line'], record['col']) == ('unmatched-tag', 1, 24)
+    assert err == '1 files, 1 problems\n'
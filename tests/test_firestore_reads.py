@@ -0,0 +1,71 @@
+import pytest
+
+from tools import firestore_reads
+from tools.firestore_reads import Fixture, _Scanner, route_of
+from tools.tsx_tokens import tokenize
+
+PAGE = """import { useEffect } from 'react';
+export default function Members({ pageSize }: { pageSize: number }) {
+    useEffect(() => {
+        const ref = collection(db, 'servers', serverId, 'members');
+        return onSnapshot(query(ref, orderBy('name'), limit(pageSize)), () => {});
+    }, []);
+    const loadNotices = () => getDocs(query(collection(db, 'notices'), limit(20)));
+    const loadAll = () => getDocs(collection(db, 'events'));
+    return null;
+}
+"""
+FIXTURE = Fixture({'paths': {'servers/*/members': {'docs': 300, 'changes': 5}, 'notices': {'docs': 80}}})
+
+
+def _reads(text):
+    return _Scanner(text, list(tokenize(text, jsx=False))).reads('app/members.tsx')
+
+
+def test_reads_are_resolved_with_their_query_shape():
+    members, notices, events = _reads(PAGE)
+    assert (members.op, members.trigger, members.line) == ('listen', 'mount', 5)
+    assert members.refs[0].path == 'servers/{serverId}/members'
+    assert members.refs[0].ordered and not members.refs[0].filtered
+    assert (notices.op, notices.trigger, notices.refs[0].limit) == ('get', 'action', 20)
+    assert events.unbounded
+
+
+@pytest.mark.parametrize('call, limit', [
+    ('limit(20)', 20), ('limitToLast(5)', 5), ('limit(pageSize)', 'pageSize'), ('limit(page * 10)', 'page * 10'),
+])
+def test_limit_argument(call, limit):
+    [read] = _reads(f"getDocs(query(collection(db, 'notices'), {call}));\n")
+    assert read.refs[0].limit == limit
+    assert read.unknown_limit is isinstance(limit, str)
+    assert not read.unbounded
+
+
+def test_only_a_literal_limit_bounds_the_cost():
+    members, notices, _ = _reads(PAGE)
+    assert FIXTURE.cost(members) == (300 + 5, True)
+    assert FIXTURE.cost(notices) == (20, True)
+
+
+def test_report_flags_unknown_limits(tmp_path, monkeypatch, capsys):
+    (tmp_path / 'app').mkdir()
+    (tmp_path / 'app' / 'members.tsx').write_text(PAGE, encoding='utf-8')
+    index = type('Index', (), {'files': {'app/members.tsx': {'exports': {'default': 'Members'}, 'imports': {}}}})
+    monkeypatch.setattr(firestore_reads, 'REPO_ROOT', tmp_path)
+    monkeypatch.setattr(firestore_reads.UsageIndex, 'update', classmethod(lambda cls: (index, 0)))
+    fixture = tmp_path / 'counts.json'
+    fixture.write_text('{"paths": {"servers/*/members": {"docs": 300}}}', encoding='utf-8')
+
+    assert firestore_reads.main(['--fixture', str(fixture)]) == 0
+    out = capsys.readouterr().out
+    assert '1 listener(s), 0 unbounded, 1 with unknown limit, ' in out
+    assert '[ordered, limit ?(pageSize)]' in out
+    assert '[limit 20]' in out
+
+    assert firestore_reads.main(['--fixture', str(fixture), '--route', '/nowhere']) == 1
+    assert '/nowhere: no such route' in capsys.readouterr().err
+
+
+def test_route_of():
+    assert route_of('app/(tabs)/growth/events.tsx') == '/growth/events'
+    assert route_of('app/hero-management/index.tsx') == '/hero-management'
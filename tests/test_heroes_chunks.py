@@ -0,0 +1,82 @@
+import json
+
+import pytest
+
+from tools import heroes_chunks
+from tools.common import HEROES_JSON, sha256_bytes
+from tools.heroes_chunks import LOADER, MANIFEST, OUT_DIR, SUMMARY, build, is_current
+
+HEROES = [
+    {'id': 'jeronimo', 'name': '제로니모', 'type': '보병', 'gen': 'S1', 'rarity': 'SSR', 'image': 'jeronimo',
+     'displayInfo': {'subClass': '전투', 'class': '보병'}, 'skills': {'exploration': [{'name': '검술'}]}},
+    {'id': 'sergey', 'name': '세르게이', 'type': '보병', 'gen': '상설', 'rarity': 'SR', 'image': 'sergey'},
+    {'id': 'wuming', 'name': '무명', 'type': '보병', 'gen': 'S10', 'rarity': 'SSR', 'image': 'wuming'},
+    {'id': 'molly', 'name': '몰리', 'type': '창병', 'gen': 'S1', 'rarity': 'SSR', 'image': 'molly'},
+]
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / 'heroes.json'
+    path.write_text(json.dumps(HEROES, ensure_ascii=False, indent=4), encoding='utf-8')
+    return path
+
+
+def test_output_directory_does_not_shadow_heroes_json():
+    # Metro resolves ``data/<name>`` to ``<name>.json`` before a directory index.
+    assert not (OUT_DIR.parent / (OUT_DIR.name + '.json')).exists()
+    assert HEROES_JSON.exists()
+
+
+def test_build_splits_by_generation(source, tmp_path):
+    out = tmp_path / 'out'
+    written = build(source, out)
+    assert sorted(written) == sorted([SUMMARY, LOADER, MANIFEST, 'gen-s1.json', 'gen-s10.json',
+                                      'gen-permanent.json'])
+    assert [h['id'] for h in json.loads((out / 'gen-s1.json').read_text(encoding='utf-8'))] == ['jeronimo', 'molly']
+    summary = json.loads((out / SUMMARY).read_text(encoding='utf-8'))
+    assert summary[0] == {'id': 'jeronimo', 'name': '제로니모', 'type': '보병', 'gen': 'S1', 'rarity': 'SSR',
+                          'image': 'jeronimo', 'displayInfo': {'subClass': '전투'}}
+    manifest = json.loads((out / MANIFEST).read_text(encoding='utf-8'))
+    assert list(manifest['chunks']) == ['S1', 'S10', '상설']
+    assert manifest['source_sha256'] == sha256_bytes(source.read_bytes())
+
+
+def test_loader_imports_chunks_lazily_and_is_typed(source, tmp_path):
+    build(source, tmp_path / 'out')
+    loader = (tmp_path / 'out' / LOADER).read_text(encoding='utf-8')
+    assert "'S10': () => import('./gen-s10.json')," in loader
+    assert "'상설': () => import('./gen-permanent.json')," in loader
+    assert 'require(' not in loader
+    assert 'any' not in loader.replace('Promise', '')
+    assert 'export async function loadHero(id: string): Promise<Hero | undefined>' in loader
+
+
+def test_rebuild_is_skipped_until_the_source_changes(source, tmp_path):
+    out = tmp_path / 'out'
+    build(source, out)
+    assert build(source, out) is None
+    assert is_current(sha256_bytes(source.read_bytes()), out)
+
+    source.write_text(json.dumps(HEROES[:2], ensure_ascii=False, indent=4), encoding='utf-8')
+    written = build(source, out)
+    assert 'gen-s10.json' in written
+    assert not (out / 'gen-s10.json').exists()
+
+
+def test_damaged_output_is_rebuilt(source, tmp_path):
+    out = tmp_path / 'out'
+    build(source, out)
+    (out / 'gen-s1.json').write_text('[]\n', encoding='utf-8')
+    assert not is_current(sha256_bytes(source.read_bytes()), out)
+    assert build(source, out) == ['gen-s1.json']
+
+
+def test_duplicate_ids_are_refused(source, tmp_path):
+    source.write_text(json.dumps(HEROES + HEROES[:1], ensure_ascii=False, indent=4), encoding='utf-8')
+    with pytest.raises(ValueError, match="duplicate hero id 'jeronimo'"):
+        build(source, tmp_path / 'out')
+
+
+def test_repository_chunks_are_current():
+    assert heroes_chunks.main(['--check']) == 0
@@ -0,0 +1,145 @@
+import json
+
+from tools.common import HEROES_JSON
+from tools.heroes_store import HeroStore, merge
+
+# Hand-formatted on purpose: untouched records must come back exactly as written.
+SAMPLE = (
+    '[\n'
+    '    {"id": "jeronimo", "name": "제로니모", "type": "infantry", "gen": "1", "rarity": "SSR",\n'
+    '     "image": "/heroes/jeronimo.png", "displayInfo": {"subClass": "공격"}},\n'
+    '    {\n'
+    '        "id": "molly",\n'
+    '        "name": "몰리",\n'
+    '        "type": "lancer",\n'
+    '        "gen": "1",\n'
+    '        "rarity": "SSR",\n'
+    '        "image": "/heroes/molly.png",\n'
+    '        "description": ""\n'
+    '    }\n'
+    ']'
+)
+NEW_HERO = {'id': 'zinman', 'name': '진만', 'type': 'marksman', 'gen': '1', 'rarity': 'SSR',
+            'image': '/heroes/zinman.png'}
+
+
+def _store(tmp_path, text=SAMPLE, encoding='utf-8'):
+    path = tmp_path / 'heroes.json'
+    path.write_bytes(text.encode(encoding))
+    return HeroStore.load(path)
+
+
+def test_repository_file_round_trips_byte_for_byte():
+    store = HeroStore.load(HEROES_JSON)
+    assert store.dumps().encode('utf-8') == HEROES_JSON.read_bytes()
+    assert store.save() is False
+
+
+def test_sample_round_trips_and_keeps_the_bom(tmp_path):
+    store = _store(tmp_path)
+    assert store.dumps() == SAMPLE
+    assert store.save() is False
+
+    store = _store(tmp_path, SAMPLE, 'utf-8-sig')
+    assert store.encoding.kind == 'utf-8-bom'
+    store.upsert({'id': 'molly', 'description': '방패 전문'})
+    assert store.save() is True
+    assert (tmp_path / 'heroes.json').read_bytes().startswith(b'\xef\xbb\xbf')
+
+
+def test_update_rewrites_only_the_changed_record(tmp_path):
+    store = _store(tmp_path)
+    assert store.upsert({'id': 'molly', 'description': '방패 전문'}) == 'updated'
+    assert store.upsert({'id': 'molly', 'description': '방패 전문'}) == 'unchanged'
+    text = store.dumps()
+    assert text.startswith(SAMPLE[:SAMPLE.index('    {\n')])
+    assert json.loads(text)[1]['description'] == '방패 전문'
+
+
+def test_unknown_id_is_not_inserted_by_default(tmp_path):
+    store = _store(tmp_path)
+    assert store.upsert(NEW_HERO) == 'unknown id'
+    assert store.get('zinman') is None
+    assert store.problems == ["unknown id 'zinman'; not inserted (use --allow-insert for new heroes)"]
+
+
+def test_insert_requires_every_required_field(tmp_path):
+    store = _store(tmp_path)
+    partial = {k: v for k, v in NEW_HERO.items() if k != 'image'}
+    assert store.upsert(partial, allow_insert=True) == 'rejected'
+    assert store.problems == ["new hero 'zinman' rejected: missing image"]
+    assert store.upsert(NEW_HERO, allow_insert=True) == 'inserted'
+    assert [r['id'] for r in store.query(type='marksman')] == ['zinman']
+
+
+def test_insert_with_damaged_text_is_rejected(tmp_path):
+    store = _store(tmp_path)
+    assert store.upsert(dict(NEW_HERO, name='진\ufffd'), allow_insert=True) == 'rejected'
+    assert store.problems == ["new hero 'zinman' rejected: damaged text (U+FFFD)"]
+
+
+def test_merge_keeps_good_values_over_damaged_ones():
+    base = {'id': 'molly', 'name': '몰리', 'description': '', 'displayInfo': {'subClass': '방어'}}
+    update = {'name': '\ufffd\ufffd', 'description': '\ufffd', 'displayInfo': {'subClass': '\ufffd'}, 'gen': None}
+    merged = merge(base, update)
+    assert merged['name'] == '몰리'
+    assert merged['displayInfo'] == {'subClass': '방어'}
+    assert merged['description'] == '\ufffd'   # nothing to lose: the field was empty
+    assert 'gen' not in merged
+
+
+def test_merge_is_deep_for_objects_and_replaces_lists():
+    base = {'displayInfo': {'subClass': '공격', 'role': 'dps'}, 'skills': [1, 2]}
+    merged = merge(base, {'displayInfo': {'role': 'tank'}, 'skills': [3]})
+    assert merged == {'displayInfo': {'subClass': '공격', 'role': 'tank'}, 'skills': [3]}
+
+
+GUARD_HEROES = [
+    {'id': 'gwen', 'name': '그웬', 'type': '궁병', 'gen': 'S5', 'rarity': '전설', 'image': 'gwen.png',
+     'skills': {'exploration': [{'name': '독수리의 눈', 'desc': '공격력 증가'}]}},
+    {'id': 'nora', 'name': '노라', 'type': '창병', 'gen': 'S5', 'rarity': '전설', 'image': 'nora.png',
+     'skills': {'exploration': [{'name': '연쇄 폭발', 'desc': '범위 피해'}]}},
+]
+
+
+def _guard_store(tmp_path):
+    return _store(tmp_path, json.dumps(GUARD_HEROES, ensure_ascii=False, indent=4))
+
+
+def test_english_text_does_not_overwrite_korean(tmp_path):
+    store = _guard_store(tmp_path)
+    update = {'id': 'gwen', 'name': 'Gwen', 'type': '보병',
+              'skills': {'exploration': [{'name': "Eagle's Eye", 'desc': 'Attack up'}]}}
+    assert store.upsert(update) == 'updated'
+    assert store.get('gwen')['name'] == '그웬'
+    assert store.get('gwen')['skills'] == GUARD_HEROES[0]['skills']
+    assert store.get('gwen')['type'] == '보병'
+    assert store.problems == ["'gwen': kept name (en text over ko text); use --force to overwrite",
+                              "'gwen': kept skills (en text over ko text); use --force to overwrite"]
+
+
+def test_another_heroes_record_is_refused_as_a_whole(tmp_path):
+    store = _guard_store(tmp_path)
+    update = {'id': 'gwen', 'name': '노라', 'type': '창병', 'skills': GUARD_HEROES[1]['skills']}
+    assert store.upsert(update) == 'refused'
+    assert store.get('gwen') == GUARD_HEROES[0]
+    assert store.problems == ["'gwen': update belongs to 'nora' ('노라' is the name of 'nora'; skills of 'nora'); "
+                              'not applied, use --force to overwrite']
+
+
+def test_same_language_updates_and_force_pass_the_guard(tmp_path):
+    store = _guard_store(tmp_path)
+    skills = {'exploration': [{'name': '독수리의 눈', 'desc': '공격력 20% 증가'}]}
+    assert store.upsert({'id': 'gwen', 'skills': skills}) == 'updated'
+    assert store.get('gwen')['skills'] == skills
+    assert store.upsert({'id': 'gwen', 'name': 'Gwen'}, force=True) == 'updated'
+    assert store.get('gwen')['name'] == 'Gwen'
+    assert store.problems == []
+
+
+def test_apply_batch_counts_refusals(tmp_path):
+    store = _guard_store(tmp_path)
+    stats = store.apply_batch({'heroes': [{'id': 'gwen', 'name': 'Gwen', 'source': 'docs/gwen_wiki.html',
+                                           'lang': 'en'}]})
+    assert stats == {'refused': 1}
+    assert 'lang' not in store.get('gwen')
@@ -0,0 +1,74 @@
+import io
+import re
+import sys
+
+import pytest
+
+from tools import asset_refs, image_budget
+from tools.asset_refs import DENSITY, ImageInfo, side_budget
+from tools.common import REPO_ROOT
+
+Image = pytest.importorskip('PIL.Image')
+PngInfo = pytest.importorskip('PIL.PngImagePlugin').PngInfo
+
+
+def _png(size, mode='RGB'):
+    meta = PngInfo()
+    meta.add_text('Software', 'some editor')
+    out = io.BytesIO()
+    Image.new(mode, size, 'red').save(out, 'PNG', pnginfo=meta)
+    return out.getvalue()
+
+
+def _largest_tailwind_width(path, component):
+    """Largest ``w-N`` (4 points per step) given to ``component`` in ``path``."""
+    text = (REPO_ROOT / path).read_text(encoding='utf-8')
+    pattern = rf'<{component}\b[^>]*?className="[^"]*\bw-(\d+)\b'
+    return max(int(n) for n in re.findall(pattern, text, re.S)) * 4
+
+
+def test_budget_follows_the_sizes_the_components_draw():
+    skill = _largest_tailwind_width('app/hero-management/[id].tsx', 'SkillImage')
+    assert side_budget('assets/images/skill-icons/cara_L1.png') == skill * DENSITY
+    assert side_budget('assets/images/skill-icons/cara_L1.png') < side_budget('assets/images/heroes/gwen.png')
+    assert side_budget('assets/images/bg-main.png') == max(limit for _, limit in asset_refs.MAX_SIDE)
+
+
+def test_encode_caps_the_longest_side_and_drops_metadata():
+    encoded = image_budget.encode(_png((800, 400)), 'png', 240)
+    with Image.open(io.BytesIO(encoded)) as image:
+        assert image.size == (240, 120)
+        assert 'Software' not in image.info
+
+
+def test_encode_jpeg_drops_alpha_and_keeps_small_images():
+    encoded = image_budget.encode(_png((100, 50), 'RGBA'), 'jpeg', 240)
+    with Image.open(io.BytesIO(encoded)) as image:
+        assert (image.format, image.mode, image.size) == ('JPEG', 'RGB', (100, 50))
+
+
+def test_optimise_uses_the_shared_budget_and_caches(tmp_path, monkeypatch):
+    icon = 'assets/images/skill-icons/big.png'
+    (tmp_path / 'assets/images/skill-icons').mkdir(parents=True)
+    (tmp_path / icon).write_bytes(_png((1000, 1000)))
+    report = {'assets': {icon: ImageInfo(icon, (tmp_path / icon).stat().st_size, 'png', 1000, 1000)},
+              'references': {icon: ['heroes.json:cara']}}
+    cache = {}
+    monkeypatch.setattr(image_budget, 'REPO_ROOT', tmp_path)
+    monkeypatch.setattr(image_budget, 'BLOB_DIR', tmp_path / 'blobs')
+    monkeypatch.setattr(image_budget, 'OUT_DIR', tmp_path / 'out')
+    monkeypatch.setattr(image_budget, 'load_cache', lambda name: cache.get(name, {}))
+    monkeypatch.setattr(image_budget, 'save_cache', lambda name, data: cache.__setitem__(name, data))
+    monkeypatch.setattr(asset_refs, 'verify', lambda: report)
+
+    [(path, before, after, cached)] = image_budget.optimise(jobs=1)
+    assert (path, cached) == (icon, False) and after < before
+    with Image.open(tmp_path / 'out' / icon) as image:
+        assert image.size == (side_budget(icon),) * 2
+    assert image_budget.optimise(jobs=1)[0][3] is True
+
+
+def test_missing_pillow_is_a_clear_error(monkeypatch):
+    monkeypatch.setitem(sys.modules, 'PIL', None)
+    with pytest.raises(SystemExit, match='pip install Pillow'):
+        image_budget._require_pillow()
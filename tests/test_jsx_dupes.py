@@ -0,0 +1,82 @@
+from tools.jsx_dupes import K, find_duplicates, fingerprints, main, normalise
+from tools.tsx_tokens import tokenize
+
+SLOT_EDITOR = """export default function {name}() {{
+    return (
+        <View className="p-4">
+            <View className="flex-row gap-2">
+                <Text style={{{{ fontSize: 12 }}}}>{label}</Text>
+                <TouchableOpacity onPress={{() => {setter}({value} + 1)}}>
+                    <Ionicons name="add" size={{16}} />
+                </TouchableOpacity>
+                <TouchableOpacity onPress={{() => {setter}({value} - 1)}}>
+                    <Ionicons name="remove" size={{16}} />
+                </TouchableOpacity>
+            </View>
+        </View>
+    );
+}}
+"""
+OTHER = """export default function Notice() {
+    return (
+        <ScrollView>
+            {items.map(item => <Pressable key={item.id} onPress={open}><Image source={{ uri: item.url }} /></Pressable>)}
+        </ScrollView>
+    );
+}
+"""
+
+
+def _write(tmp_path, files):
+    paths = []
+    for name, text in files.items():
+        path = tmp_path / name
+        path.write_text(text, encoding='utf-8')
+        paths.append(path)
+    return paths
+
+
+def test_renamed_copy_is_reported_once_at_its_outermost_element(tmp_path):
+    paths = _write(tmp_path, {
+        'Events.tsx': SLOT_EDITOR.format(name='Events', label='요새', setter='setSlot', value='slot'),
+        'ScheduleModal.tsx': SLOT_EDITOR.format(name='Modal', label='성채', setter='setCount', value='count'),
+        'Notice.tsx': OTHER,
+    })
+    blocks, pairs = find_duplicates(paths, min_tokens=20, jobs=1)
+    assert len(pairs) == 1
+    score, a, b = pairs[0]
+    assert score == 1.0
+    assert {a.path.rsplit('/', 1)[-1], b.path.rsplit('/', 1)[-1]} == {'Events.tsx', 'ScheduleModal.tsx'}
+    assert (a.line, a.end_line, a.name) == (3, 13, 'View')
+
+
+def test_different_trees_do_not_match(tmp_path):
+    paths = _write(tmp_path, {'Events.tsx': SLOT_EDITOR.format(name='E', label='a', setter='s', value='v'),
+                              'Notice.tsx': OTHER})
+    assert find_duplicates(paths, min_tokens=20, jobs=1)[1] == []
+
+
+def test_unclosed_elements_are_skipped(tmp_path):
+    broken = SLOT_EDITOR.format(name='E', label='a', setter='s', value='v').replace('        </View>\n    );', '    );')
+    [path] = _write(tmp_path, {'Broken.tsx': broken})
+    blocks, _ = find_duplicates([path], min_tokens=20, jobs=1)
+    assert [b.line for b in blocks] == [4, 6, 9]     # the unclosed <View> of line 3 is not a block
+
+
+def test_normalise_keeps_shape_not_names():
+    values = [normalise(t) for t in tokenize('<Text style={a}>{count + 1}</Text>')]
+    assert values == [normalise(t) for t in tokenize('<Text style={b}>{total + 2}</Text>')]
+    assert 'I' in values and 'N' in values
+
+
+def test_fingerprints_of_short_and_repeated_sequences():
+    assert fingerprints(['a'] * (K - 1)) == []
+    values = [str(i) for i in range(40)]
+    assert fingerprints(values) == fingerprints(list(values))
+    assert {h for _, h in fingerprints(values)} <= {h for _, h in fingerprints(['x'] * 5 + values)}
+
+
+def test_main_summarises(tmp_path, capsys):
+    _write(tmp_path, {'Notice.tsx': OTHER})
+    assert main([str(tmp_path), '--min-tokens', '10', '--jobs', '1']) == 0
+    assert capsys.readouterr().err.startswith('1 files, ')
@@ -0,0 +1,111 @@
+import pytest
+
+from tools import patchset
+from tools.patchset import ALREADY_APPLIED, APPLIED, Journal, PatchSet, PatchSetError, apply_edits, undo
+
+EDITS = [
+    {'file': 'app/card.tsx', 'old': 'className="gap-2"', 'new': 'className="gap-2 justify-between"'},
+    {'file': 'app/list.tsx', 'old': 'limit = 10', 'new': 'limit = 20'},
+]
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    root = tmp_path / 'repo'
+    (root / 'app').mkdir(parents=True)
+    (root / 'app' / 'card.tsx').write_text('<View className="gap-2" />\n', encoding='utf-8')
+    (root / 'app' / 'list.tsx').write_bytes('const limit = 10;\r\n// 목록\r\n'.encode('cp949'))
+    monkeypatch.setattr(patchset, 'REPO_ROOT', root)
+    return root
+
+
+@pytest.fixture
+def journal(tmp_path):
+    return Journal(tmp_path / 'journal')
+
+
+def _apply(journal, edits=EDITS):
+    patch = PatchSet('test', journal)
+    apply_edits(patch, edits)
+    return patch, patch.commit()
+
+
+def test_apply_keeps_each_file_encoding(repo, journal):
+    patch, set_id = _apply(journal)
+    assert set_id is not None
+    assert [r.status for r in patch.results] == [APPLIED, APPLIED]
+    assert (repo / 'app' / 'card.tsx').read_text(encoding='utf-8') == '<View className="gap-2 justify-between" />\n'
+    assert (repo / 'app' / 'list.tsx').read_bytes() == 'const limit = 20;\r\n// 목록\r\n'.encode('cp949')
+    assert journal.find(set_id)['state'] == 'applied'
+
+
+def test_apply_is_idempotent(repo, journal):
+    _apply(journal)
+    before = {p: p.read_bytes() for p in (repo / 'app').iterdir()}
+    patch, set_id = _apply(journal)
+    assert set_id is None
+    assert [r.status for r in patch.results] == [ALREADY_APPLIED, ALREADY_APPLIED]
+    assert {p: p.read_bytes() for p in (repo / 'app').iterdir()} == before
+    assert len(journal.entries()) == 1
+
+
+def test_missing_text_aborts_the_whole_set(repo, journal):
+    card = (repo / 'app' / 'card.tsx').read_bytes()
+    with pytest.raises(PatchSetError, match='neither the text to replace nor its replacement'):
+        _apply(journal, EDITS[:1] + [{'file': 'app/list.tsx', 'old': 'limit = 99', 'new': 'limit = 5'}])
+    assert (repo / 'app' / 'card.tsx').read_bytes() == card
+    assert journal.entries() == []
+
+
+def test_paths_outside_the_repository_are_refused(repo, journal):
+    with pytest.raises(PatchSetError, match='outside the repository'):
+        PatchSet('test', journal).write('../escape.txt', 'x')
+
+
+def test_undo_restores_pre_images_and_deletes_created_files(repo, journal):
+    originals = {p: p.read_bytes() for p in (repo / 'app').iterdir()}
+    patch = PatchSet('test', journal)
+    apply_edits(patch, EDITS + [{'file': 'app/new.ts', 'content': 'export {};\n'}])
+    set_id = patch.commit()
+
+    undo_id = undo(set_id, journal=journal)
+    assert {p: p.read_bytes() for p in (repo / 'app').iterdir()} == originals
+    entry = journal.find(set_id)
+    assert (entry['state'], entry['undone_by']) == ('undone', undo_id)
+    assert journal.find(undo_id)['undoes'] == set_id
+    with pytest.raises(PatchSetError, match='is undone'):
+        undo(set_id, journal=journal)
+
+
+def test_undo_refuses_files_changed_since_without_force(repo, journal):
+    _, set_id = _apply(journal)
+    (repo / 'app' / 'card.tsx').write_text('edited by hand\n', encoding='utf-8')
+    with pytest.raises(PatchSetError, match='app/card.tsx'):
+        undo(set_id, journal=journal)
+    assert journal.find(set_id)['state'] == 'applied'
+    undo(set_id, force=True, journal=journal)
+    assert (repo / 'app' / 'card.tsx').read_text(encoding='utf-8') == '<View className="gap-2" />\n'
+
+
+def test_undo_with_nothing_to_restore_leaves_the_entry_applied(repo, journal):
+    originals = {p: p.read_bytes() for p in (repo / 'app').iterdir()}
+    _, set_id = _apply(journal)
+    for path, data in originals.items():
+        path.write_bytes(data)
+    with pytest.raises(PatchSetError, match='nothing to restore'):
+        undo(set_id, force=True, journal=journal)
+    entry = journal.find(set_id)
+    assert entry['state'] == 'applied'
+    assert entry.get('undone_by') is None
+
+
+def test_deletion_is_idempotent(repo, journal):
+    deletion = [{'file': 'app/card.tsx', 'old': ' className="gap-2"', 'new': ''}]
+    patch, set_id = _apply(journal, deletion)
+    assert set_id is not None and patch.results[0].status == APPLIED
+    assert (repo / 'app' / 'card.tsx').read_text(encoding='utf-8') == '<View />\n'
+
+    patch, set_id = _apply(journal, deletion)
+    assert set_id is None
+    assert patch.results[0].status == ALREADY_APPLIED
+    assert (repo / 'app' / 'card.tsx').read_text(encoding='utf-8') == '<View />\n'
@@ -0,0 +1,80 @@
+import pytest
+
+from tools import tsc_log
+from tools.tsc_log import _log_diagnostics, is_syntax_error, parse_lines, summarise
+
+LOG = [
+    'app/a.tsx(3,5): error TS2322: Type \'string\' is not assignable to type \'number\'.\n',
+    "services/i18n/index.ts(16,6): error TS2769: No overload matches this call.\n",
+    '  Overload 1 of 2, \'(options: InitOptions): Promise\', gave the following error.\n',
+    '    Argument of type \'{}\' is not assignable.\n',
+    '\n',
+    '\x1b[96mapp/b.tsx\x1b[0m:\x1b[93m7\x1b[0m:\x1b[93m1\x1b[0m - \x1b[91merror\x1b[0m TS1005: \'}\' expected.\n',
+]
+
+BROKEN = (
+    'export default function Card() {\n'       # 1
+    '    const n: number = 1;\n'               # 2
+    '    return (\n'                            # 3
+    '        <View>\n'                          # 4  never closed
+    '            <Text>{n}</Text>\n'            # 5
+    '    );\n'                                  # 6
+    '}\n'                                       # 7
+)
+
+
+def test_parse_lines_plain_pretty_and_traces():
+    diagnostics = list(parse_lines(LOG))
+    assert [(d.file, d.line, d.col, d.code) for d in diagnostics] == [
+        ('app/a.tsx', 3, 5, 'TS2322'), ('services/i18n/index.ts', 16, 6, 'TS2769'), ('app/b.tsx', 7, 1, 'TS1005'),
+    ]
+    assert diagnostics[1].details == ("Overload 1 of 2, '(options: InitOptions): Promise', gave the following error.",
+                                      "Argument of type '{}' is not assignable.")
+    assert diagnostics[2].message == "'}' expected."
+
+
+def test_repeats_across_logs_are_reported_once(tmp_path):
+    first, second = tmp_path / 'tsc_output.txt', tmp_path / 'tsc_output_v2.txt'
+    first.write_text(''.join(LOG), encoding='utf-8')
+    # PowerShell redirection writes UTF-16 with a BOM.
+    second.write_bytes(b'\xff\xfe' + ''.join(LOG[1:3] + ['app/c.tsx(1,1): error TS2307: Cannot find module.\n'])
+                       .encode('utf-16-le'))
+    diagnostics = list(_log_diagnostics([first, second, first]))
+    assert [(d.file, d.code) for d in diagnostics] == [
+        ('app/a.tsx', 'TS2322'), ('services/i18n/index.ts', 'TS2769'), ('app/b.tsx', 'TS1005'), ('app/c.tsx', 'TS2307'),
+    ]
+
+
+def test_same_position_with_another_message_is_kept(tmp_path):
+    log = tmp_path / 'tsc.txt'
+    log.write_text('a.ts(1,1): error TS2554: Expected 2 arguments, but got 1.\n'
+                   'a.ts(1,1): error TS2554: Expected 3 arguments, but got 1.\n', encoding='utf-8')
+    assert len(list(_log_diagnostics([log]))) == 2
+
+
+@pytest.mark.parametrize('code, syntax', [('TS1005', True), ('TS17002', True), ('TS2322', False), ('TS2769', False)])
+def test_is_syntax_error(code, syntax):
+    assert is_syntax_error(code) is syntax
+
+
+def test_only_syntax_errors_cascade_from_a_structural_root_cause(tmp_path, monkeypatch):
+    (tmp_path / 'app').mkdir()
+    (tmp_path / 'app' / 'Card.tsx').write_text(BROKEN, encoding='utf-8')
+    monkeypatch.setattr(tsc_log, 'REPO_ROOT', tmp_path)
+    log = [
+        'app/Card.tsx(2,11): error TS2322: Type \'string\' is not assignable to type \'number\'.\n',
+        'app/Card.tsx(4,10): error TS17008: JSX element \'View\' has no corresponding closing tag.\n',
+        'app/Card.tsx(6,5): error TS1005: \'</\' expected.\n',
+        'app/Card.tsx(6,7): error TS2304: Cannot find name \'x\'.\n',
+    ]
+    summary = summarise(parse_lines(log))['app/Card.tsx']
+    assert (summary.root_cause.rule, summary.root_cause.line) == ('unclosed-tag', 4)
+    assert summary.cascaded == 2
+    assert [(d.line, d.code) for d in summary.independent] == [(2, 'TS2322'), (6, 'TS2304')]
+
+
+def test_files_without_structural_errors_have_no_cascades(tmp_path, monkeypatch):
+    monkeypatch.setattr(tsc_log, 'REPO_ROOT', tmp_path)
+    summary = summarise(parse_lines(LOG[:1]))['app/a.tsx']   # not on disk: nothing to check
+    assert summary.root_cause is None
+    assert (summary.count, summary.cascaded, len(summary.independent)) == (1, 0, 1)
@@ -0,0 +1,52 @@
+from tools.tsx_check import check_source
+from tools.tsx_tokens import tokenize
+
+
+def _tokens(text):
+    return [(t.kind, t.value) for t in tokenize(text)]
+
+
+def _problems(text):
+    return [(d.rule, d.line, d.col) for d in check_source('x.tsx', text).diagnostics]
+
+
+def test_closing_tag_after_an_element_lexes_as_jsx_close():
+    assert _tokens('<View></View></View>')[3:] == [
+        ('jsx_close', '</'), ('jsx_name', 'View'), ('jsx_end', '>'),
+        ('jsx_close', '</'), ('jsx_name', 'View'), ('jsx_end', '>'),
+    ]
+    assert _tokens('<Icon /></Row>')[3:] == [('jsx_close', '</'), ('jsx_name', 'Row'), ('jsx_end', '>')]
+
+
+def test_tag_after_an_element_lexes_as_jsx():
+    assert _tokens('<A />\n<B />')[3:] == [('jsx_open', '<'), ('jsx_name', 'B'), ('jsx_self', '/>')]
+    assert _tokens('<A></A><B>x</B>')[6:9] == [('jsx_open', '<'), ('jsx_name', 'B'), ('jsx_end', '>')]
+
+
+def test_less_than_after_an_element_stays_an_operator():
+    assert _tokens('<A /> < b')[3:] == [('punct', '<'), ('ident', 'b')]
+    assert _tokens('a < b')[1] == ('punct', '<')
+
+
+def test_stray_closing_tag_is_reported():
+    assert _problems('const a = <View></View></View>;\n') == [('unmatched-tag', 1, 24)]
+
+
+def test_brace_in_jsx_text_is_an_unmatched_bracket():
+    # The ``{`` of ``{count}`` was deleted, leaving ``count}`` as text.
+    source = 'const a = (\n  <Text>\n    count}\n  </Text>\n);\n'
+    diagnostics = check_source('x.tsx', source).diagnostics
+    assert [(d.rule, d.line, d.col, d.end_col) for d in diagnostics] == [('unmatched-bracket', 3, 10, 11)]
+    assert _tokens(source)[7] == ('jsx_text', '\n    count}\n  ')
+
+
+def test_expression_containers_are_not_jsx_text():
+    assert _problems('const a = <Text>{count} items</Text>;\n') == []
+    assert _problems("const a = <Text style={{ gap: 2 }}>{'}'}</Text>;\n") == []
+
+
+def test_generic_arrow_type_parameters_are_not_jsx():
+    assert _tokens('<T,>(x: T) => x')[:4] == [('punct', '<'), ('ident', 'T'), ('punct', ','), ('punct', '>')]
+    assert _problems('const id = <T,>(x: T) => x;\n') == []
+    assert _problems('const f = <T extends object>(x: T): T => x;\nconst a = <View />;\n') == []
+    assert _tokens('<Text>{x}</Text>')[0] == ('jsx_open', '<')
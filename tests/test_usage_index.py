@@ -0,0 +1,63 @@
+import pytest
+
+from tools import common, usage_index
+from tools.usage_index import UsageIndex
+
+PICKER = 'export default function WheelPicker({ value }: { value: number }) {\n    return null;\n}\n'
+MODAL = ("import WheelPicker from '../common/WheelPicker';\n"
+         "export const Modal = () => <WheelPicker value={1} />;\n")
+
+
+@pytest.fixture
+def tree(tmp_path, monkeypatch):
+    (tmp_path / 'components' / 'common').mkdir(parents=True)
+    (tmp_path / 'components' / 'modals').mkdir()
+    (tmp_path / 'components' / 'common' / 'WheelPicker.tsx').write_text(PICKER, encoding='utf-8')
+    (tmp_path / 'components' / 'modals' / 'Modal.tsx').write_text(MODAL, encoding='utf-8')
+    cache = {}
+    monkeypatch.setattr(common, 'REPO_ROOT', tmp_path)
+    monkeypatch.setattr(usage_index, 'source_files', lambda: sorted((tmp_path / 'components').rglob('*.tsx')))
+    monkeypatch.setattr(usage_index, 'load_cache', lambda name: cache.get(name, {}))
+    monkeypatch.setattr(usage_index, 'save_cache', lambda name, data: cache.__setitem__(name, data))
+    return tmp_path
+
+
+def test_find_reports_imports_and_renders_with_props(tree):
+    index, parsed = UsageIndex.update(jobs=1)
+    assert parsed == 2
+    assert index.find('WheelPicker') == {'components/common/WheelPicker.tsx:default': [
+        ['components/modals/Modal.tsx', 'import', 1, 1, None],
+        ['components/modals/Modal.tsx', 'render', 2, 28, ['value']],
+    ]}
+    assert index.find('WheelPicker', kind='call') == {'components/common/WheelPicker.tsx:default': []}
+
+
+def test_find_reads_the_index_without_rescanning(tree, monkeypatch, capsys):
+    assert usage_index.main(['--jobs', '1', 'update']) == 0
+    (tree / 'components' / 'modals' / 'Other.tsx').write_text(MODAL, encoding='utf-8')
+    monkeypatch.setattr(usage_index, 'check_file', lambda path: pytest.fail('find parsed a file'))
+    assert usage_index.main(['find', 'WheelPicker']) == 0
+    out, err = capsys.readouterr()
+    assert 'Other.tsx' not in out
+    assert err.rstrip().endswith('(index as of the last update)')
+
+
+def test_refresh_picks_up_changed_files(tree, capsys):
+    assert usage_index.main(['--jobs', '1', 'update']) == 0
+    (tree / 'components' / 'modals' / 'Other.tsx').write_text(MODAL, encoding='utf-8')
+    assert usage_index.main(['--jobs', '1', 'find', 'WheelPicker', '--kind', 'render', '--refresh']) == 0
+    out, err = capsys.readouterr()
+    assert 'components/modals/Other.tsx:2:28 render [value]' in out
+    assert '(refreshed, 1 file(s) re-parsed)' in err
+
+
+def test_find_without_an_index_is_an_error(tree, capsys):
+    assert UsageIndex.load() is None
+    assert usage_index.main(['find', 'WheelPicker']) == 1
+    assert 'run `python -m tools.usage_index update`' in capsys.readouterr().err
+
+
+def test_unknown_symbol(tree, capsys):
+    UsageIndex.update(jobs=1)
+    assert usage_index.main(['find', 'NoSuchThing']) == 1
+    assert 'no such export' in capsys.readouterr().err
@@ -0,0 +1,82 @@
+import pytest
+
+from tools import wiki_extract
+from tools.wiki_extract import extract, parse_page, resolve_detail, text_language
+
+KNOWN = {'gwen': 'gwen', '그웬': 'gwen', 'nora': 'nora', '노라': 'nora', 'hector': 'hector', '헥터': 'hector',
+         'seurat': 'seurat', '쇠라': 'seurat'}
+
+
+def detail_page(heading, skill=('검술', '적에게 피해를 줍니다'), troop='infantry'):
+    name, desc = skill
+    return (f'<html><head><title>{heading} - Whiteout Survival Wiki</title></head><body>'
+            f'<div class="content-hero"><h2 class="fs-1">{heading}</h2>'
+            f'<img src="https://example.com/uploads/{troop}.png">'
+            f'<div id="exploration-skills"><div class="bg-dark">'
+            f'<img src="https://example.com/uploads/hero_skill_icon_1.png"><h5>{name}</h5><p>{desc}</p>'
+            f'</div></div></div></body></html>')
+
+
+@pytest.fixture(autouse=True)
+def no_cache(monkeypatch):
+    monkeypatch.setattr(wiki_extract, 'load_cache', lambda name: {})
+    monkeypatch.setattr(wiki_extract, 'save_cache', lambda name, data: None)
+
+
+def _extract(tmp_path, pages):
+    paths = []
+    for name, html in pages.items():
+        path = tmp_path / name
+        path.write_text(html, encoding='utf-8')
+        paths.append(path)
+    results, stats = extract(paths, jobs=1, known=KNOWN)
+    heroes = [hero for records in results.values() for hero in records['heroes']]
+    return heroes, [(page.rsplit('/', 1)[-1], reason) for page, reason in stats['unresolved']]
+
+
+def test_korean_detail_page(tmp_path):
+    heroes, unresolved = _extract(tmp_path, {'gwen_wiki_ko.html': detail_page('그웬', troop='marksman')})
+    assert unresolved == []
+    assert heroes == [{'id': 'gwen', 'name': '그웬', 'type': '궁병', 'lang': 'ko', 'skills': {
+        'exploration': [{'name': '검술', 'desc': '적에게 피해를 줍니다', 'icon': 'hero_skill_icon_1.png'}]}}]
+
+
+def test_page_of_another_hero_is_reported_not_emitted(tmp_path):
+    heroes, unresolved = _extract(tmp_path, {'gwen_wiki.html': detail_page('Norah', troop='lancer')})
+    assert heroes == []
+    assert unresolved == [('gwen_wiki.html', "file name says 'gwen' but the page is 'Norah' ('nora')")]
+
+
+def test_heading_decides_when_the_file_name_is_unknown(tmp_path):
+    heroes, unresolved = _extract(tmp_path, {'xura_wiki_ko.html': detail_page('쇠라')})
+    assert unresolved == []
+    assert [h['id'] for h in heroes] == ['seurat']
+
+
+def test_unknown_or_missing_heading_is_reported(tmp_path):
+    heroes, unresolved = _extract(tmp_path, {
+        'gwen_wiki_ko.html': detail_page('그웬드'),
+        'hector_wiki.html': detail_page('').replace('<title> - Whiteout Survival Wiki</title>', ''),
+    })
+    assert heroes == []
+    assert unresolved == [('gwen_wiki_ko.html', "heading '그웬드' matches no known hero"),
+                          ('hector_wiki.html', 'no heading or title to identify the hero')]
+
+
+def test_english_page_keeps_only_language_neutral_fields(tmp_path):
+    heroes, _ = _extract(tmp_path, {'hector_wiki_temp.html': detail_page('Hector', ('Blade', 'Deals damage'))})
+    assert heroes == [{'id': 'hector', 'type': '보병', 'lang': 'en'}]
+
+
+def test_undecodable_heading_leaves_the_page_unidentified(tmp_path):
+    path = tmp_path / 'gwen_wiki_ko.html'
+    path.write_text(detail_page('그\ufffd'), encoding='utf-8')
+    records = parse_page(path)
+    assert 'title' not in records['detail']
+    assert records['warnings'] == [f"{wiki_extract.rel(path)} detail: dropped 'title' (undecodable text)"]
+    assert resolve_detail(records['detail'], KNOWN) == (None, 'no heading or title to identify the hero')
+
+
+@pytest.mark.parametrize('text, lang', [('헥터', 'ko'), ('Hector', 'en'), ('Hector 헥터', 'ko'), ('123', None)])
+def test_text_language(text, lang):
+    assert text_language(text) == lang
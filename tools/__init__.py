@@ -0,0 +1,6 @@
+"""Offline Python tooling for WOS-Commander data, assets and source checks.
+
+Every module is runnable from the repository root, e.g.::
+
+    python -m tools.wiki_extract --help
+"""
@@ -0,0 +1,295 @@
+"""Asset-reference verifier for the images under ``assets/``.
+
+Builds the set of every image the app can load in one pass:
+
+* ``require('...png')`` calls in the TS/TSX/JS sources,
+* ``./assets/...`` paths in ``app.json``,
+* ``image`` / skill ``icon`` / equipment ``icon`` names in ``data/heroes.json``,
+  resolved through the generated ``heroImages`` / ``skillIcons`` index files.
+
+Every asset file is then inspected by reading only its PNG/JPEG header through
+``mmap`` on a thread pool, and the run reports missing, orphaned, oversized and
+invalid (bad signature, placeholder-sized) assets.
+
+Usage::
+
+    python -m tools.asset_refs
+    python -m tools.asset_refs --json .tools-cache/asset_index.json
+"""
+
+import argparse
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import NamedTuple
+
+from tools.common import HEROES_JSON, REPO_ROOT, read_text, rel
+
+ASSETS_DIR = REPO_ROOT / 'assets'
+APP_JSON = REPO_ROOT / 'app.json'
+SOURCE_DIRS = ('app', 'components', 'hooks', 'services', 'data', 'utils')
+SOURCE_SUFFIXES = ('.ts', '.tsx', '.js', '.jsx')
+IMAGE_SUFFIXES = ('.png', '.jpg', '.jpeg', '.gif', '.webp')
+
+# Generated lookup tables (scripts/generate_*_index.js). Their require() calls
+# only make a file reachable if heroes.json actually uses the key.
+HERO_INDEX = ASSETS_DIR / 'images' / 'heroes' / 'index.ts'
+SKILL_INDEX = ASSETS_DIR / 'images' / 'skill-icons' / 'index.ts'
+
+# Pixel density of the sharpest screens the app runs on (iPhone @3x).
+DENSITY = 3
+# Longest side (pixels) per path prefix: the largest size, in points, the UI
+# draws the image at times DENSITY. The first matching prefix wins. Also the
+# resize target of tools.image_budget, so keep it in step with the components.
+MAX_SIDE = (
+    ('assets/images/skill-icons/', 80 * DENSITY),      # SkillImage w-20 h-20, app/hero-management/[id].tsx
+    ('assets/images/heroes/', (430 - 48) * DENSITY),   # [id].tsx art: w-full in p-6 on a 430pt-wide phone
+    ('assets/images/fortress.png', 40 * DENSITY),      # w-10 h-10 event icon, components/events/GrowthEventCard.tsx
+    ('assets/logo_transparent.png', 135 * DENSITY),    # 120% of a w-28 box, app/screens/GateScreen.tsx
+    ('assets/icon.png', 1024),                         # app.json icon: Expo wants 1024x1024
+    ('assets/splash.png', 430 * DENSITY),              # app.json splash, resizeMode contain on a 430pt-wide phone
+    ('', 932 * DENSITY),                               # full-screen cover backgrounds (bg-main, selection_gate_bg)
+)
+MAX_BYTES = 512 * 1024
+# Same threshold as scripts/find_broken_images.js.
+PLACEHOLDER_BYTES = 100
+
+_REQUIRE_RE = re.compile(r'''require\(\s*(['"])([^'"]+)\1\s*\)''')
+_INDEX_ENTRY_RE = re.compile(r'''(['"])([^'"]+)\1\s*:\s*require\(\s*(['"])([^'"]+)\3\s*\)''')
+_ASSET_STRING_RE = re.compile(r'"(\./assets/[^"]+)"')
+
+_PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+_JPEG_SOF = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+class ImageInfo(NamedTuple):
+    path: str
+    bytes: int
+    format: str
+    width: int
+    height: int
+
+    @property
+    def max_side(self):
+        return max(self.width, self.height)
+
+
+def _jpeg_size(buf):
+    pos, length = 2, len(buf)
+    while pos + 9 < length:
+        if buf[pos] != 0xFF:
+            return None
+        marker = buf[pos + 1]
+        if marker == 0xFF:
+            pos += 1
+            continue
+        if marker in (0x01, 0xD8) or 0xD0 <= marker <= 0xD7:
+            pos += 2
+            continue
+        if marker in _JPEG_SOF:
+            height, width = struct.unpack('>HH', buf[pos + 5:pos + 9])
+            return width, height
+        pos += 2 + struct.unpack('>H', buf[pos + 2:pos + 4])[0]
+    return None
+
+
+def read_header(path):
+    """Identify an image from its header bytes only; dimensions are 0 when unknown."""
+    size = os.path.getsize(path)
+    fmt, width, height = 'unknown', 0, 0
+    if size:
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            if buf[:8] == _PNG_SIGNATURE and buf[12:16] == b'IHDR':
+                fmt = 'png'
+                width, height = struct.unpack('>II', buf[16:24])
+            elif buf[:3] == b'\xff\xd8\xff':
+                fmt = 'jpeg'
+                width, height = _jpeg_size(buf) or (0, 0)
+            elif buf[:6] in (b'GIF87a', b'GIF89a'):
+                fmt = 'gif'
+                width, height = struct.unpack('<HH', buf[6:10])
+            elif buf[:4] == b'RIFF' and buf[8:12] == b'WEBP':
+                fmt = 'webp'
+    return ImageInfo(rel(path), size, fmt, width, height)
+
+
+def _read_index(path):
+    """Map the keys of a generated ``{ 'name.png': require('./name.png') }`` table to files."""
+    if not path.exists():
+        return {}
+    text = read_text(path)
+    return {m.group(2): rel(path.parent / m.group(4)) for m in _INDEX_ENTRY_RE.finditer(text)}
+
+
+def _source_files():
+    for name in SOURCE_DIRS:
+        for path in sorted((REPO_ROOT / name).rglob('*')):
+            if path.suffix in SOURCE_SUFFIXES and path.is_file():
+                yield path
+    for path in sorted(REPO_ROOT.glob('*')):
+        if path.suffix in SOURCE_SUFFIXES and path.is_file():
+            yield path
+
+
+def _icons(node):
+    """Yield every ``icon`` value nested anywhere in a skills/equipment structure."""
+    if isinstance(node, dict):
+        if isinstance(node.get('icon'), str) and node['icon']:
+            yield node['icon']
+        for value in node.values():
+            if isinstance(value, (dict, list)):
+                yield from _icons(value)
+    elif isinstance(node, list):
+        for item in node:
+            yield from _icons(item)
+
+
+def _hero_icons(hero):
+    yield from _icons(hero.get('skills'))
+    yield from _icons(hero.get('equipment'))
+
+
+def collect_references():
+    """Return ``(references, unresolved, remote)``.
+
+    ``references`` maps each asset path to the places that use it,
+    ``unresolved`` lists ``(referrer, name, reason)`` for names that cannot be
+    loaded locally, and ``remote`` counts skill icons that are expected to be
+    fetched from the wiki CDN instead.
+    """
+    references = {}
+    unresolved = []
+    remote = 0
+
+    def add(asset, referrer):
+        references.setdefault(asset, []).append(referrer)
+
+    index_files = {HERO_INDEX.resolve(), SKILL_INDEX.resolve()}
+    for path in _source_files():
+        if path.resolve() in index_files:
+            continue
+        text = read_text(path)
+        for match in _REQUIRE_RE.finditer(text):
+            target = match.group(2)
+            if target.lower().endswith(IMAGE_SUFFIXES):
+                line = text.count('\n', 0, match.start()) + 1
+                add(rel(path.parent / target), f'{rel(path)}:{line}')
+
+    if APP_JSON.exists():
+        for match in _ASSET_STRING_RE.finditer(read_text(APP_JSON)):
+            add(rel(REPO_ROOT / match.group(1)), 'app.json')
+
+    hero_index = _read_index(HERO_INDEX)
+    skill_index = _read_index(SKILL_INDEX)
+    heroes = json.loads(read_text(HEROES_JSON))
+    for hero in heroes:
+        referrer = f"heroes.json:{hero.get('id')}"
+        image = hero.get('image')
+        if image:
+            if image in hero_index:
+                add(hero_index[image], referrer)
+            else:
+                unresolved.append((referrer, image, f'not in {rel(HERO_INDEX)}'))
+        for icon in _hero_icons(hero):
+            if icon in skill_index:
+                add(skill_index[icon], referrer)
+            elif not icon.startswith('http'):
+                remote += 1
+    return references, unresolved, remote
+
+
+def scan_assets(jobs=None):
+    paths = [p for p in sorted(ASSETS_DIR.rglob('*')) if p.suffix.lower() in IMAGE_SUFFIXES and p.is_file()]
+    with ThreadPoolExecutor(max_workers=jobs or min(32, (os.cpu_count() or 1) * 4)) as pool:
+        return {info.path: info for info in pool.map(read_header, paths)}
+
+
+def side_budget(path):
+    for prefix, limit in MAX_SIDE:
+        if path.startswith(prefix):
+            return limit
+    return None
+
+
+def verify(jobs=None, max_bytes=MAX_BYTES):
+    """Run the full check and return a report dict (also used by ``tools.image_budget``)."""
+    references, unresolved, remote = collect_references()
+    assets = scan_assets(jobs)
+    lowered = {path.lower(): path for path in assets}
+
+    missing = []
+    for asset, referrers in sorted(references.items()):
+        if asset not in assets:
+            hint = lowered.get(asset.lower())
+            reason = f'case differs from {hint}' if hint else 'file not found'
+            missing.extend((referrer, asset, reason) for referrer in referrers)
+    missing.extend(unresolved)
+
+    oversized, invalid = [], []
+    for path, info in assets.items():
+        expected = 'jpeg' if path.lower().endswith(('.jpg', '.jpeg')) else path.rsplit('.', 1)[-1].lower()
+        if info.bytes < PLACEHOLDER_BYTES:
+            invalid.append((path, f'placeholder-sized ({info.bytes} bytes)'))
+        elif info.format != expected:
+            invalid.append((path, f'extension says {expected}, header says {info.format}'))
+        limit = side_budget(path)
+        if info.bytes > max_bytes or (limit and info.max_side > limit):
+            oversized.append((path, info))
+
+    return {
+        'assets': assets,
+        'references': references,
+        'missing': missing,
+        'orphaned': sorted(path for path in assets if path not in references),
+        'oversized': sorted(oversized),
+        'invalid': sorted(invalid),
+        'remote_icons': remote,
+    }
+
+
+def write_index(report, path):
+    """Persist the asset-reference index as JSON for other tools."""
+    payload = {
+        'assets': {p: info._asdict() for p, info in report['assets'].items()},
+        'references': report['references'],
+    }
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    Path(path).write_text(json.dumps(payload, ensure_ascii=False, indent=2) + '\n', encoding='utf-8')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--jobs', type=int, help='header reader threads')
+    parser.add_argument('--max-bytes', type=int, default=MAX_BYTES, help='flag files larger than this')
+    parser.add_argument('--json', help='also write the asset-reference index to this file')
+    parser.add_argument('--quiet', action='store_true', help='print the summary only')
+    args = parser.parse_args(argv)
+
+    report = verify(jobs=args.jobs, max_bytes=args.max_bytes)
+    if args.json:
+        write_index(report, args.json)
+
+    if not args.quiet:
+        for referrer, asset, reason in report['missing']:
+            print(f'[MISSING] {referrer} -> {asset} ({reason})')
+        for path, reason in report['invalid']:
+            print(f'[INVALID] {path}: {reason}')
+        for path, info in report['oversized']:
+            print(f'[OVERSIZED] {path}: {info.width}x{info.height}, {info.bytes / 1024:.0f} KB')
+        for path in report['orphaned']:
+            print(f'[ORPHANED] {path}')
+
+    print(f"{len(report['assets'])} assets, {len(report['references'])} referenced, "
+          f"{len(report['missing'])} missing, {len(report['orphaned'])} orphaned, "
+          f"{len(report['oversized'])} oversized, {len(report['invalid'])} invalid, "
+          f"{report['remote_icons']} skill icons served remotely")
+    return 1 if report['missing'] or report['invalid'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
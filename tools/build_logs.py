@@ -0,0 +1,379 @@
+"""Build and deploy log analytics with trend storage.
+
+Ingests the logs saved under ``.old_backup/logs`` (and any new ones):
+
+* ``vercel --prod`` transcripts (``deploy_*.txt``): UTF-16 PowerShell captures
+  whose lines were hard-wrapped at the console width; they are unwrapped and
+  parsed into one run per deployment (deployment id, production URL, build
+  time, Metro bundle time, exported bundle/asset sizes, error, warning and
+  npm-audit counts);
+* ``vercel ls`` output (``deployments*.txt``, ``vercel_out.txt``): deployment URLs;
+* ``tsc`` output (``tsc*``): one type-check run per distinct log content, with
+  its error count (parsed by :mod:`tools.tsc_log`).
+
+Everything is stored in ``.tools-cache/build_logs.sqlite``. Ingest is
+incremental: each log remembers how many bytes were consumed (and a hash of
+them), so appended content is parsed on its own and a deployment that is
+still being written is picked up on the next run. ``report`` compares each
+deploy run with the median of the runs before it and flags build-time and
+bundle-size jumps.
+
+Usage::
+
+    python -m tools.build_logs ingest                 # .old_backup/logs/*
+    python -m tools.build_logs ingest path/to/deploy.txt
+    python -m tools.build_logs report [--window 5] [--threshold 0.15] [--all]
+"""
+
+import argparse
+import glob
+import re
+import sqlite3
+import statistics
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+from tools import tsc_log
+from tools.common import CACHE_DIR, REPO_ROOT, decode_bytes, rel, sha256_bytes
+
+DB_PATH = CACHE_DIR / 'build_logs.sqlite'
+DEFAULT_LOGS = ('.old_backup/logs/*',)
+
+WINDOW = 5
+THRESHOLD = 0.15
+# Metrics compared against the rolling baseline, with the smallest absolute
+# change worth reporting (so 2 s -> 3 s is not a "50% regression").
+METRICS = (
+    ('build_seconds', 'build time', 5, 's'),
+    ('bundle_ms', 'Metro bundle time', 5000, 'ms'),
+    ('js_bytes', 'JS bundle size', 50_000, 'B'),
+    ('asset_bytes', 'exported asset size', 250_000, 'B'),
+    ('errors', 'errors', 1, ''),
+    ('warnings', 'warnings', 10, ''),
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    path TEXT PRIMARY KEY, consumed INTEGER NOT NULL, prefix_sha TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS runs (
+    id TEXT PRIMARY KEY, kind TEXT NOT NULL, source TEXT NOT NULL, started_at TEXT,
+    url TEXT, build_seconds REAL, bundle_ms INTEGER, js_bytes INTEGER, css_bytes INTEGER,
+    asset_bytes INTEGER, files INTEGER, errors INTEGER, warnings INTEGER, vulnerabilities INTEGER);
+CREATE TABLE IF NOT EXISTS artifacts (
+    run_id TEXT NOT NULL, path TEXT NOT NULL, bytes INTEGER NOT NULL, PRIMARY KEY (run_id, path));
+CREATE TABLE IF NOT EXISTS deployments (
+    url TEXT PRIMARY KEY, deployment TEXT NOT NULL, source TEXT NOT NULL);
+"""
+
+_TIMESTAMP = r'\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d(?:\.\d+)?Z'
+_TIMESTAMP_RE = re.compile(rf'^({_TIMESTAMP})\s+(.*)$')
+_EMBEDDED_TIMESTAMP_RE = re.compile(rf'(?<=.)(?={_TIMESTAMP}  )')
+# Newline bytes per codec; every other codec the logs use is ASCII-compatible.
+_NEWLINES = {'utf-16-le': b'\n\x00', 'utf-16-be': b'\x00\n'}
+_RUN_START_RE = re.compile(r'^(?:node\.exe : )?Vercel CLI \d', re.M)
+_INSPECT_RE = re.compile(r'Inspect: https://vercel\.com/\S+/(\w+)')
+_PRODUCTION_RE = re.compile(r'Production: (https://\S+)')
+_BUNDLED_RE = re.compile(r'Bundled (\d+)ms')
+_EXPORTED_RE = re.compile(r'^(\S+) \((\d+(?:\.\d+)?) (B|kB|MB|GB)\)$')
+_VULNERABILITIES_RE = re.compile(r'(\d+) vulnerabilit')
+_ERROR_RE = re.compile(r'\b(?:error|ERR!)\b', re.I)
+_DEPLOYMENT_URL_RE = re.compile(r'https://([a-z0-9-]+)\.vercel\.app')
+_CONTENT_HASH_RE = re.compile(r'[.-][0-9a-f]{32}(?=\.)')
+_RUN_END_MARKERS = ('Deployment completed', 'Error: ', 'Build Failed')
+# The CLI prints the bare production URL on stdout as its last line.
+_FINAL_URL_RE = re.compile(r'^https://\S+\.vercel\.app\s*$', re.M)
+
+_UNITS = {'B': 1, 'kB': 1000, 'MB': 1000 ** 2, 'GB': 1000 ** 3}
+
+
+def unwrap(text):
+    """Undo PowerShell's hard wrapping: rejoin lines cut at the console width."""
+    lines = text.splitlines()
+    lengths = [len(line) for line in lines if line]
+    width = statistics.mode(lengths) if lengths else 0
+    if width < 20 or lengths.count(width) < len(lengths) // 3:
+        return lines
+    out, current = [], ''
+    for line in lines:
+        current += line
+        if len(line) != width:
+            out.extend(_EMBEDDED_TIMESTAMP_RE.split(current))
+            current = ''
+    if current:
+        out.extend(_EMBEDDED_TIMESTAMP_RE.split(current))
+    return out
+
+
+def deployment_id(url_match):
+    """The 9-character deployment hash of ``<project>-<hash>-<scope>.vercel.app``, or ``None``.
+
+    Project and scope names may have 9-letter words of their own
+    (``wos-commander``, ``sejunsong-...``), so a segment with a digit wins.
+    """
+    segments = [s for s in url_match.group(1).split('-')[1:-1] if len(s) == 9]
+    return next((s for s in segments if any(c.isdigit() for c in s)), segments[0] if segments else None)
+
+
+def _seconds(start, end):
+    fmt = '%Y-%m-%dT%H:%M:%S.%fZ'
+    return (datetime.strptime(end, fmt) - datetime.strptime(start, fmt)).total_seconds()
+
+
+def parse_deploy(lines, source):
+    """Parse one ``vercel`` transcript into a run dict (with an ``artifacts`` list)."""
+    run = {'kind': 'deploy', 'source': source, 'errors': 0, 'warnings': 0, 'artifacts': []}
+    first = completed = None
+    in_console_header = True
+    for line in lines:
+        if line.startswith('Retrieving project'):
+            in_console_header = False   # above this is PowerShell's NativeCommandError noise
+        stamp = _TIMESTAMP_RE.match(line)
+        body = line
+        if stamp:
+            first = first or stamp.group(1)
+            body = stamp.group(2).strip()
+            if body.startswith('Build Completed'):
+                completed = stamp.group(1)
+        if (m := _INSPECT_RE.search(line)):
+            run['id'] = m.group(1)
+        elif (m := _PRODUCTION_RE.search(line)):
+            run['url'] = m.group(1)
+        elif (m := _BUNDLED_RE.search(body)):
+            run['bundle_ms'] = int(m.group(1))
+        elif (m := _EXPORTED_RE.match(body)):
+            size = round(float(m.group(2)) * _UNITS[m.group(3)])
+            run['artifacts'].append((_CONTENT_HASH_RE.sub('', m.group(1)), size))
+        elif (m := _VULNERABILITIES_RE.match(body)):
+            run['vulnerabilities'] = int(m.group(1))
+        if 'npm warn' in body or body.lower().startswith('warning'):
+            run['warnings'] += 1
+        elif not in_console_header and not _EXPORTED_RE.match(body) and _ERROR_RE.search(body):
+            run['errors'] += 1
+    run['started_at'] = first
+    if first and completed:
+        run['build_seconds'] = _seconds(first, completed)
+    artifacts = run['artifacts']
+    run['files'] = len(artifacts)
+    run['js_bytes'] = sum(size for path, size in artifacts if path.endswith('.js'))
+    run['css_bytes'] = sum(size for path, size in artifacts if path.endswith('.css'))
+    run['asset_bytes'] = sum(size for path, size in artifacts if path.startswith('assets/'))
+    return run
+
+
+def decode_lines(data, codec):
+    """Decode ``data`` one line at a time; return the text and ``{char offset: byte offset}`` of each line start.
+
+    The byte offsets come from the raw bytes: re-encoding text decoded with
+    ``errors='replace'`` gives the wrong length wherever a byte was replaced.
+    """
+    newline = _NEWLINES.get(codec, b'\n')
+    parts, line_bytes, chars, pos = [], {0: 0}, 0, 0
+    while pos < len(data):
+        end = data.find(newline, pos)
+        while end != -1 and (end - pos) % len(newline):   # straddles two UTF-16 code units
+            end = data.find(newline, end + 1)
+        end = len(data) if end == -1 else end + len(newline)
+        line = data[pos:end].decode(codec, errors='replace')
+        parts.append(line)
+        chars += len(line)
+        pos = end
+        line_bytes[chars] = pos
+    return ''.join(parts), line_bytes
+
+
+def split_runs(text):
+    """Split a transcript into ``(start, end, complete)`` character ranges, one per ``vercel`` run."""
+    starts = [m.start() for m in _RUN_START_RE.finditer(text)] or [0]
+    if starts[0] != 0 and text[:starts[0]].strip():
+        starts.insert(0, 0)
+    ranges = []
+    for start, end in zip(starts, starts[1:] + [len(text)]):
+        chunk = '\n'.join(unwrap(text[start:end]))
+        complete = (end != len(text) or any(marker in chunk for marker in _RUN_END_MARKERS)
+                    or bool(_FINAL_URL_RE.search(chunk)))
+        ranges.append((start, end, complete))
+    return ranges
+
+
+class LogDB:
+    def __init__(self, path=DB_PATH):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def _resume_point(self, source, data):
+        row = self.conn.execute('SELECT consumed, prefix_sha FROM sources WHERE path = ?', (source,)).fetchone()
+        if row is None or row['consumed'] > len(data) or sha256_bytes(data[:row['consumed']]) != row['prefix_sha']:
+            return 0   # new or rewritten log: parse it from the start
+        return row['consumed']
+
+    def _consumed(self, source, data, consumed):
+        self.conn.execute('INSERT OR REPLACE INTO sources VALUES (?, ?, ?)',
+                          (source, consumed, sha256_bytes(data[:consumed])))
+
+    def _store_run(self, run):
+        artifacts = run.pop('artifacts', [])
+        columns = ', '.join(run)
+        self.conn.execute(f'INSERT OR REPLACE INTO runs ({columns}) VALUES ({", ".join("?" * len(run))})',
+                          list(run.values()))
+        self.conn.execute('DELETE FROM artifacts WHERE run_id = ?', (run['id'],))
+        self.conn.executemany('INSERT OR REPLACE INTO artifacts VALUES (?, ?, ?)',
+                              [(run['id'], path, size) for path, size in artifacts])
+
+    def ingest(self, path):
+        """Parse whatever is new in ``path``; return the number of runs/deployments stored."""
+        source = rel(path)
+        data = Path(path).read_bytes()
+        name = Path(path).name
+        offset = self._resume_point(source, data)
+        if offset == len(data):
+            return 0
+        if name.startswith('tsc'):
+            return self._ingest_tsc(path, source, data)
+
+        # Decode without the BOM, so a resumed file and a fresh one decode alike.
+        encoding = decode_bytes(data)[1]
+        line_codec = encoding.kind if encoding.kind in ('utf-16-le', 'utf-16-be', 'cp949') else 'utf-8'
+        start_byte = offset or {'utf-16': 2, 'utf-8-sig': 3}.get(encoding.codec, 0)
+        text, line_bytes = decode_lines(data[start_byte:], line_codec)
+        stored = 0
+        if _RUN_START_RE.search(text) or 'Inspect: ' in text:
+            consumed_chars = 0
+            for start, end, complete in split_runs(text):
+                if not complete:
+                    break
+                run = parse_deploy(unwrap(text[start:end]), source)
+                if 'id' not in run:
+                    run['id'] = f'{source}@{offset + start}'
+                self._store_run(run)
+                stored += 1
+                consumed_chars = end
+            consumed = start_byte + line_bytes[consumed_chars] if consumed_chars else offset
+        else:
+            for match in _DEPLOYMENT_URL_RE.finditer(text):
+                deployment = deployment_id(match)
+                if deployment:
+                    stored += self.conn.execute('INSERT OR IGNORE INTO deployments VALUES (?, ?, ?)',
+                                                (match.group(0), deployment, source)).rowcount
+            consumed = len(data)
+        self._consumed(source, data, consumed)
+        self.conn.commit()
+        return stored
+
+    def _ingest_tsc(self, path, source, data):
+        # tsc output is redirected over the previous file, so each content is one run.
+        errors = sum(1 for _ in tsc_log.parse_log(path))
+        mtime = datetime.fromtimestamp(Path(path).stat().st_mtime, timezone.utc)
+        stored = self.conn.execute(
+            'INSERT OR IGNORE INTO runs (id, kind, source, started_at, errors) VALUES (?, ?, ?, ?, ?)',
+            ('tsc:' + sha256_bytes(data)[:12], 'tsc', source, mtime.strftime('%Y-%m-%dT%H:%M:%S.000Z'), errors)).rowcount
+        self._consumed(source, data, len(data))
+        self.conn.commit()
+        return stored
+
+    def runs(self, kind='deploy'):
+        return self.conn.execute('SELECT * FROM runs WHERE kind = ? ORDER BY started_at, id', (kind,)).fetchall()
+
+    def artifact_growth(self, run_id, baseline_ids, limit=5):
+        """The artifacts of ``run_id`` that grew most against their median size in ``baseline_ids``."""
+        marks = ', '.join('?' * len(baseline_ids))
+        rows = self.conn.execute(
+            f'SELECT path, bytes, run_id FROM artifacts WHERE run_id = ? OR run_id IN ({marks})',
+            [run_id, *baseline_ids]).fetchall()
+        current, history = {}, {}
+        for row in rows:
+            if row['run_id'] == run_id:
+                current[row['path']] = row['bytes']
+            else:
+                history.setdefault(row['path'], []).append(row['bytes'])
+        growth = [(size - statistics.median(history.get(path, [0])), path, size) for path, size in current.items()]
+        return [g for g in sorted(growth, reverse=True)[:limit] if g[0] > 0]
+
+
+def regressions(runs, window=WINDOW, threshold=THRESHOLD):
+    """Yield ``(run, baseline_runs, [(metric, label, value, baseline, unit)])`` per regressed run."""
+    for index, run in enumerate(runs):
+        baseline_runs = runs[max(0, index - window):index]
+        if not baseline_runs:
+            continue
+        found = []
+        for metric, label, minimum, unit in METRICS:
+            history = [r[metric] for r in baseline_runs if r[metric] is not None]
+            value = run[metric]
+            if value is None or not history:
+                continue
+            baseline = statistics.median(history)
+            if value - baseline >= minimum and value > baseline * (1 + threshold):
+                found.append((metric, label, value, baseline, unit))
+        if found:
+            yield run, baseline_runs, found
+
+
+def _fmt(value, unit):
+    if unit == 'B':
+        return f'{value / 1000:,.1f} kB'
+    return f'{value:,.0f}{unit}' if unit else f'{value:,.0f}'
+
+
+def _expand(patterns):
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(str(REPO_ROOT / pattern))) or sorted(glob.glob(pattern))
+        paths.extend(Path(p) for p in matches if Path(p).is_file())
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--db', default=str(DB_PATH))
+    sub = parser.add_subparsers(dest='command', required=True)
+    ingest = sub.add_parser('ingest', help='append new log content to the database')
+    ingest.add_argument('logs', nargs='*', default=list(DEFAULT_LOGS))
+    report = sub.add_parser('report', help='flag regressions against a rolling baseline')
+    report.add_argument('--window', type=int, default=WINDOW, help='runs in the rolling baseline')
+    report.add_argument('--threshold', type=float, default=THRESHOLD, help='relative jump to report')
+    report.add_argument('--all', action='store_true', help='scan the whole history, not just the latest run')
+    args = parser.parse_args(argv)
+
+    db = LogDB(args.db)
+    try:
+        if args.command == 'ingest':
+            for path in _expand(args.logs):
+                stored = db.ingest(path)
+                if stored:
+                    print(f'{rel(path)}: {stored} new record(s)')
+            counts = db.conn.execute('SELECT kind, COUNT(*) FROM runs GROUP BY kind').fetchall()
+            deployments = db.conn.execute('SELECT COUNT(*) FROM deployments').fetchone()[0]
+            print(', '.join(f'{kind}: {n} run(s)' for kind, n in counts) + f', {deployments} deployment URL(s)')
+            return 0
+
+        runs = db.runs('deploy')
+        for run in runs[-args.window:]:
+            print(f"{run['started_at'] or '?':<24} {run['id']:<28} build {_fmt(run['build_seconds'] or 0, 's'):>5}  "
+                  f"bundle {_fmt(run['bundle_ms'] or 0, 'ms'):>9}  js {_fmt(run['js_bytes'] or 0, 'B'):>11}  "
+                  f"assets {_fmt(run['asset_bytes'] or 0, 'B'):>12}  errors {run['errors']}")
+        flagged = list(regressions(runs, args.window, args.threshold))
+        if not args.all and runs:
+            flagged = [f for f in flagged if f[0]['id'] == runs[-1]['id']]
+        for run, baseline_runs, found in flagged:
+            print(f"REGRESSION {run['id']} ({run['started_at']}) vs median of {len(baseline_runs)} run(s):")
+            for _, label, value, baseline, unit in found:
+                print(f'  {label}: {_fmt(value, unit)} (baseline {_fmt(baseline, unit)}, '
+                      f'+{(value - baseline) / baseline:.0%})' if baseline else f'  {label}: {_fmt(value, unit)}')
+            for delta, path, size in db.artifact_growth(run['id'], [r['id'] for r in baseline_runs]):
+                print(f'    {path}: {_fmt(size, "B")} (+{_fmt(delta, "B")})')
+        tsc = db.runs('tsc')
+        if tsc:
+            print(f"tsc: {len(tsc)} run(s), latest {tsc[-1]['errors']} error(s)")
+        return 1 if flagged else 0
+    finally:
+        db.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
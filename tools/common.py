@@ -0,0 +1,231 @@
+"""Paths, hashing and cache helpers shared by the tools package."""
+
+import hashlib
+import io
+import json
+import os
+import re
+import sys
+import tempfile
+from pathlib import Path
+from typing import NamedTuple
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+CACHE_DIR = REPO_ROOT / '.tools-cache'
+HEROES_JSON = REPO_ROOT / 'data' / 'heroes.json'
+
+CHUNK_SIZE = 1 << 16
+
+
+def rel(path):
+    """Return ``path`` relative to the repository root, with forward slashes."""
+    path = Path(path).resolve()
+    try:
+        return path.relative_to(REPO_ROOT).as_posix()
+    except ValueError:
+        return path.as_posix()
+
+
+def sha256_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def stage_bytes(path, data):
+    """Write ``data`` to a fsync'ed temp file next to ``path`` and return the temp path.
+
+    ``os.replace(temp, path)`` then swaps it in atomically.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        mode = path.stat().st_mode & 0o777
+    except FileNotFoundError:
+        mode = 0o644
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix='.' + path.name + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates 0600 files; keep the mode of the file being replaced.
+        os.chmod(tmp, mode)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return tmp
+
+
+def atomic_write_bytes(path, data):
+    """Write ``data`` to ``path`` through a temp file so readers never see a torn file."""
+    tmp = stage_bytes(path, data)
+    try:
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def write_if_changed(path, data):
+    """Atomically write ``data`` unless ``path`` already holds exactly these bytes; return ``True`` if written.
+
+    Skipping identical writes keeps mtimes stable, so Metro/Expo watchers do not rebuild.
+    """
+    path = Path(path)
+    try:
+        if path.stat().st_size == len(data) and path.read_bytes() == data:
+            return False
+    except FileNotFoundError:
+        pass
+    atomic_write_bytes(path, data)
+    return True
+
+
+def load_cache(name):
+    """Load the JSON cache ``name`` from ``.tools-cache``; a missing or corrupt cache is empty."""
+    try:
+        return json.loads(read_text(CACHE_DIR / name))
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(name, data):
+    payload = json.dumps(data, ensure_ascii=False).encode('utf-8')
+    atomic_write_bytes(CACHE_DIR / name, payload)
+
+
+class Encoding(NamedTuple):
+    kind: str       # 'utf-8', 'utf-8-bom', 'utf-16-le', 'utf-16-be', 'mojibake', 'cp949' or 'unknown'
+    codec: str      # the codec that decodes the file as it is
+
+
+UTF8 = Encoding('utf-8', 'utf-8')
+MOJIBAKE = Encoding('mojibake', 'utf-8')
+CP949 = Encoding('cp949', 'cp949')
+UNKNOWN = Encoding('unknown', 'utf-8')
+
+_HANGUL_RE = re.compile('[\uac00-\ud7a3]')
+_LATIN_RE = re.compile('[A-Za-z]')
+# UTF-8 encoded runs of U+0080-U+00FF: what CP949 text becomes once it was read as Latin-1 and saved.
+_LATIN1_RUN_RE = re.compile(rb'(?:[\xc2\xc3][\x80-\xbf]){4,}')
+
+
+def sniff_head(head):
+    """Classify a file from its first bytes alone (BOM, or NUL pattern for BOM-less UTF-16); ``None`` if undecided."""
+    if head.startswith(b'\xef\xbb\xbf'):
+        return Encoding('utf-8-bom', 'utf-8-sig')
+    if head.startswith(b'\xff\xfe'):
+        return Encoding('utf-16-le', 'utf-16')
+    if head.startswith(b'\xfe\xff'):
+        return Encoding('utf-16-be', 'utf-16')
+    sample = head[:512]
+    if len(sample) >= 4:
+        if sample[1::2].count(0) > len(sample) // 4 and not sample[0::2].count(0):
+            return Encoding('utf-16-le', 'utf-16-le')
+        if sample[0::2].count(0) > len(sample) // 4 and not sample[1::2].count(0):
+            return Encoding('utf-16-be', 'utf-16-be')
+    return None
+
+
+def sniff_encoding(head):
+    """Guess the codec of a file from its first bytes (BOM, or NUL pattern for BOM-less UTF-16)."""
+    found = sniff_head(head)
+    return found.codec if found else 'utf-8'
+
+
+def find_mojibake(data):
+    """Offset of the first run of CP949 Hangul that was decoded as Latin-1 and re-saved as UTF-8, or -1."""
+    for match in _LATIN1_RUN_RE.finditer(data):
+        run = match.group()
+        latin = bytes(((run[i] & 0x03) << 6) | (run[i + 1] & 0x3f) for i in range(0, len(run), 2))
+        syllables, i = 0, 0
+        while i + 1 < len(latin):
+            if 0xb0 <= latin[i] <= 0xc8 and 0xa1 <= latin[i + 1] <= 0xfe:
+                syllables += 1
+                i += 2
+            else:
+                i += 1
+        if syllables >= 2:
+            return match.start()
+    return -1
+
+
+def decode_bytes(data):
+    """Classify ``data`` and decode it exactly once with the right codec; return ``(text, Encoding)``."""
+    found = sniff_head(data[:512])
+    if found is not None:
+        return data.decode(found.codec, errors='replace'), found
+    if data.isascii():
+        return data.decode('ascii'), UTF8
+    try:
+        text = data.decode('utf-8')
+    except UnicodeDecodeError:
+        return _decode_legacy(data)
+    return text, MOJIBAKE if find_mojibake(data) >= 0 else UTF8
+
+
+def encode_text(text, encoding):
+    """Encode ``text`` back the way :func:`decode_bytes` found it (BOM included); damaged kinds become UTF-8."""
+    if encoding.kind == 'utf-8-bom':
+        return text.encode('utf-8-sig')
+    if encoding.kind in ('utf-16-le', 'utf-16-be'):
+        bom = b'\xff\xfe' if encoding.kind == 'utf-16-le' else b'\xfe\xff'
+        return (bom if encoding.codec == 'utf-16' else b'') + text.encode(encoding.kind)
+    if encoding.kind == 'cp949':
+        return text.encode('cp949')
+    return text.encode('utf-8')
+
+
+def _plausible(text):
+    """True if ``text`` is mostly ASCII and Hangul, as our sources and logs are."""
+    good = sum(1 for ch in text if ch.isascii() or '\uac00' <= ch <= '\ud7a3' or '\u3130' <= ch <= '\u318f')
+    return good >= len(text) * 0.9
+
+
+def _decode_legacy(data):
+    """Decode bytes that are not UTF-8: BOM-less UTF-16 of mostly Korean text (no NUL bytes), or CP949."""
+    if len(data) % 2 == 0:
+        for codec in ('utf-16-le', 'utf-16-be'):
+            try:
+                text = data.decode(codec)
+            except UnicodeDecodeError:
+                continue
+            if _plausible(text):
+                return text, Encoding(codec, codec)
+    try:
+        return data.decode('cp949'), CP949
+    except UnicodeDecodeError:
+        return data.decode('utf-8', errors='replace'), UNKNOWN
+
+
+def open_text(path):
+    """Open ``path`` for streaming text reads in its sniffed encoding (``-`` is stdin)."""
+    if str(path) == '-':
+        stream = sys.stdin.buffer
+    else:
+        stream = open(path, 'rb')
+    buffered = io.BufferedReader(stream) if not hasattr(stream, 'peek') else stream
+    encoding = sniff_encoding(buffered.peek(512)[:512])
+    return io.TextIOWrapper(buffered, encoding=encoding, errors='replace')
+
+
+def text_language(text):
+    """``'ko'`` for text with Hangul, ``'en'`` for other Latin text, else ``None``."""
+    if _HANGUL_RE.search(text or ''):
+        return 'ko'
+    if _LATIN_RE.search(text or ''):
+        return 'en'
+    return None
+
+
+def read_text(path):
+    """Read a text file in whatever encoding it is in (UTF-8, UTF-8 BOM, UTF-16 or legacy CP949)."""
+    return decode_bytes(Path(path).read_bytes())[0]
@@ -0,0 +1,345 @@
+"""Size and complexity budgets for the TSX sources, tracked across git history.
+
+For every ``.tsx`` file under the app sources this records, at each commit on
+the first-parent history, four metrics:
+
+``bytes``          file size
+``jsx_depth``      deepest JSX element nesting (from :mod:`tools.tsx_check`)
+``inline_styles``  ``style={{...}}`` / ``style={[..., {...}]}`` object literals
+``components``     component definitions (``function Card``, ``const Card = (...) =>``,
+                   ``memo``/``forwardRef`` wrappers, class components)
+
+and compares them with :data:`BUDGETS`. History is read with one
+``git log --raw`` (which blob each path points to after each commit) and one
+``git cat-file --batch`` process for the blob contents. Metrics are cached by
+blob hash in ``.tools-cache``, so a blob is measured once no matter how many
+commits or paths contain it, and later runs only measure new blobs.
+
+Usage::
+
+    python -m tools.complexity_budget                         # over-budget files at HEAD and the commit that broke each
+    python -m tools.complexity_budget --range origin/main..HEAD   # commits that break or worsen a budget (CI)
+    python -m tools.complexity_budget --history components/events/GrowthEventCard.tsx
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from fnmatch import fnmatch
+from typing import NamedTuple
+
+from tools.common import REPO_ROOT, decode_bytes, load_cache, save_cache
+from tools.tsx_check import SOURCE_DIRS, check_source
+
+CACHE_NAME = 'complexity_budget.json'
+# Bump when a metric's definition changes so cached blob metrics are recomputed.
+METRICS_VERSION = 1
+
+# (path pattern, {metric: limit}); for each metric the first matching pattern wins.
+# Only files with an agreed limit are budgeted; metrics are still recorded for every file.
+BUDGETS = (
+    ('components/events/GrowthEventCard.tsx', {'bytes': 50 * 1024}),
+    ('app/growth/events.tsx', {'jsx_depth': 25}),
+)
+METRICS = ('bytes', 'jsx_depth', 'inline_styles', 'components')
+
+_DECLARATIONS = frozenset({'const', 'let', 'var'})
+_COMPONENT_WRAPPERS = frozenset({'memo', 'forwardRef', 'React', 'function', 'async'})
+_COMPONENT_BASES = frozenset({'Component', 'PureComponent'})
+_OPENERS = frozenset({'(', '[', '{'})
+_CLOSERS = frozenset({')', ']', '}'})
+
+
+class Metrics(NamedTuple):
+    bytes: int
+    jsx_depth: int
+    inline_styles: int
+    components: int
+
+
+class Commit(NamedTuple):
+    sha: str
+    date: int
+    subject: str
+    changes: dict      # path -> blob sha after the commit (None if deleted)
+
+
+class Violation(NamedTuple):
+    path: str
+    metric: str
+    value: int
+    limit: int
+    before: int        # value before the commit that is blamed (0 if the file was new)
+    commit: Commit
+
+
+def is_tracked(path):
+    return path.endswith('.tsx') and path.split('/', 1)[0] in SOURCE_DIRS
+
+
+def budget_for(path):
+    """``{metric: limit}`` for ``path``."""
+    limits = {}
+    for pattern, budget in BUDGETS:
+        if fnmatch(path, pattern):
+            for metric, limit in budget.items():
+                limits.setdefault(metric, limit)
+    return limits
+
+
+def _count_inline_styles(tokens, i):
+    """Inline style objects in the attribute value starting at ``tokens[i]`` (the ``{`` after ``=``)."""
+    if i + 1 >= len(tokens) or tokens[i + 1].kind != 'punct':
+        return 0
+    if tokens[i + 1].value == '{':
+        return 1
+    if tokens[i + 1].value != '[':
+        return 0
+    count, depth = 0, 0
+    for token in tokens[i + 1:]:
+        if token.kind != 'punct':
+            continue
+        if token.value in _OPENERS:
+            depth += 1
+            if depth == 2 and token.value == '{':
+                count += 1
+        elif token.value in _CLOSERS:
+            depth -= 1
+            if depth == 0:
+                break
+    return count
+
+
+def _is_component_declaration(tokens, i):
+    """``const Name[: Type] = (`` / ``= memo(`` / ``= function`` at ``tokens[i]`` (the name)."""
+    for j in range(i + 1, min(i + 40, len(tokens))):
+        token = tokens[j]
+        if token.kind == 'punct' and token.value == '=':
+            value = tokens[j + 1] if j + 1 < len(tokens) else None
+            return value is not None and (value.value == '(' and value.kind == 'punct'
+                                          or value.kind == 'ident' and value.value in _COMPONENT_WRAPPERS)
+        if token.kind == 'punct' and token.value in (';', ','):
+            return False
+    return False
+
+
+def measure(path, data):
+    """:class:`Metrics` of the TSX source ``data`` (bytes)."""
+    result = check_source(REPO_ROOT / path, decode_bytes(data)[0])
+    tokens = result.tokens
+    inline_styles = components = 0
+    for i, token in enumerate(tokens):
+        if token.kind == 'jsx_name' and token.value.lower().endswith('style'):
+            if i + 2 < len(tokens) and tokens[i + 1].value == '=' and tokens[i + 2].value == '{':
+                inline_styles += _count_inline_styles(tokens, i + 2)
+        elif token.kind != 'ident' or i + 1 >= len(tokens):
+            continue
+        elif (name := tokens[i + 1]).kind != 'ident' or not name.value[:1].isupper():
+            continue
+        elif token.value == 'function':
+            components += 1
+        elif token.value in _DECLARATIONS and _is_component_declaration(tokens, i + 1):
+            components += 1
+        elif token.value == 'class' and any(t.value in _COMPONENT_BASES for t in tokens[i + 2:i + 6]):
+            components += 1
+    return Metrics(len(data), result.max_depth, inline_styles, components)
+
+
+def _measure_job(job):
+    path, sha, data = job
+    return sha, measure(path, data)
+
+
+def _git(*args):
+    return subprocess.run(['git', *args], cwd=REPO_ROOT, check=True, capture_output=True).stdout
+
+
+def first_parent_history(tip='HEAD'):
+    """Every commit on the first-parent chain of ``tip``, oldest first, with its tracked blob changes."""
+    out = _git('log', '--first-parent', '-m', '--reverse', '--raw', '--no-abbrev', '--no-renames', '-z',
+               '--format=%x01%H %ct %s', tip, '--', *SOURCE_DIRS)
+    commits = []
+    for record in out.split(b'\x01')[1:]:
+        header, _, raw = record.partition(b'\n')
+        sha, date, subject = header.rstrip(b'\0').decode('utf-8', 'replace').split(' ', 2)
+        changes = {}
+        # -z: ":old_mode new_mode old_sha new_sha status\0path\0" per entry.
+        fields = raw.strip(b'\n\0').split(b'\0')
+        for meta, path in zip(fields[::2], fields[1::2]):
+            path = path.decode('utf-8', 'surrogateescape')
+            if not meta.startswith(b':') or not is_tracked(path):
+                continue
+            new_sha, status = meta.split()[3].decode(), meta.split()[4].decode()
+            changes[path] = None if status == 'D' else new_sha
+        commits.append(Commit(sha, int(date), subject, changes))
+    return commits
+
+
+class BlobReader:
+    """A single ``git cat-file --batch`` process serving blob contents by hash."""
+
+    def __init__(self):
+        self.proc = subprocess.Popen(['git', 'cat-file', '--batch'], cwd=REPO_ROOT,
+                                     stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+
+    def read(self, sha):
+        self.proc.stdin.write(sha.encode() + b'\n')
+        self.proc.stdin.flush()
+        header = self.proc.stdout.readline().split()
+        if len(header) < 3 or header[1] != b'blob':
+            raise ValueError(f'{sha} is not a blob: {b" ".join(header).decode()}')
+        data = self.proc.stdout.read(int(header[2]))
+        self.proc.stdout.read(1)
+        return data
+
+    def close(self):
+        self.proc.stdin.close()
+        self.proc.wait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def blob_metrics(commits, jobs=None):
+    """``{blob sha: Metrics}`` for every tracked blob in ``commits``, measuring only uncached ones."""
+    cache = load_cache(CACHE_NAME)
+    if cache.get('version') != METRICS_VERSION:
+        cache = {'version': METRICS_VERSION, 'blobs': {}}
+    cached = cache['blobs']
+    wanted = {}
+    for commit in commits:
+        for path, sha in commit.changes.items():
+            if sha is not None and sha not in cached:
+                wanted.setdefault(sha, path)
+
+    if wanted:
+        with BlobReader() as reader:
+            plan = [(path, sha, reader.read(sha)) for sha, path in wanted.items()]
+        if len(plan) < 2 or jobs == 1:
+            measured = map(_measure_job, plan)
+            cached.update((sha, list(m)) for sha, m in measured)
+        else:
+            with ProcessPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as pool:
+                cached.update((sha, list(m)) for sha, m in pool.map(_measure_job, plan, chunksize=4))
+        save_cache(CACHE_NAME, cache)
+    return {sha: Metrics(*values) for sha, values in cached.items()}
+
+
+def replay(commits, metrics):
+    """Yield ``(commit, {path: (before, after)})`` for each commit; ``None`` marks a missing file."""
+    tree = {}
+    for commit in commits:
+        changed = {}
+        for path, sha in commit.changes.items():
+            before = tree.get(path)
+            after = metrics[sha] if sha is not None else None
+            if after is None:
+                tree.pop(path, None)
+            else:
+                tree[path] = after
+            changed[path] = (before, after)
+        yield commit, changed
+
+
+def breaches(before, after, limits):
+    """``(metric, value, limit, previous)`` for each budget ``after`` exceeds and ``before`` did not beat."""
+    found = []
+    for metric, limit in limits.items():
+        value = getattr(after, metric)
+        previous = getattr(before, metric) if before is not None else 0
+        if value > limit and value > previous:
+            found.append((metric, value, limit, previous))
+    return found
+
+
+def check_range(commits, metrics, selected):
+    """Violations introduced or made worse by the commits whose sha is in ``selected``."""
+    violations = []
+    for commit, changed in replay(commits, metrics):
+        if commit.sha not in selected:
+            continue
+        for path, (before, after) in sorted(changed.items()):
+            if after is not None:
+                violations += [Violation(path, metric, value, limit, previous, commit)
+                               for metric, value, limit, previous in breaches(before, after, budget_for(path))]
+    return violations
+
+
+def check_tip(commits, metrics):
+    """Budgets exceeded at the last commit, each blamed on the commit where it last went from within to over."""
+    tree, crossed = {}, {}
+    for commit, changed in replay(commits, metrics):
+        for path, (before, after) in changed.items():
+            if after is None:
+                tree.pop(path, None)
+                continue
+            tree[path] = after
+            for metric, limit in budget_for(path).items():
+                previous = getattr(before, metric) if before is not None else 0
+                if getattr(after, metric) <= limit:
+                    crossed.pop((path, metric), None)
+                elif previous <= limit or (path, metric) not in crossed:
+                    crossed[(path, metric)] = (previous, commit)
+    violations = []
+    for (path, metric), (previous, commit) in sorted(crossed.items()):
+        if path in tree:
+            violations.append(Violation(path, metric, getattr(tree[path], metric), budget_for(path)[metric],
+                                        previous, commit))
+    return violations
+
+
+def _format(value, metric):
+    return f'{value / 1024:.1f} KB' if metric == 'bytes' else str(value)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--range', dest='revs', metavar='A..B',
+                        help='only check the commits in this range (default: what is over budget at HEAD)')
+    parser.add_argument('--history', metavar='PATH', help='print the metrics of PATH at every commit that changed it')
+    parser.add_argument('--jobs', type=int)
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    tip = (args.revs.rpartition('..')[2] or 'HEAD') if args.revs else 'HEAD'
+    try:
+        commits = first_parent_history(tip)
+    except subprocess.CalledProcessError as exc:
+        print(f'error: {exc.stderr.decode(errors="replace").strip()}', file=sys.stderr)
+        return 2
+    metrics = blob_metrics(commits, args.jobs)
+    elapsed = time.perf_counter() - started
+
+    if args.history:
+        path = args.history.replace('\\', '/')
+        print(f'{"commit":<9} {"date":<10} ' + ' '.join(f'{m:>13}' for m in METRICS))
+        for commit, changed in replay(commits, metrics):
+            if path in changed:
+                after = changed[path][1]
+                day = time.strftime('%Y-%m-%d', time.localtime(commit.date))
+                values = ' '.join(f'{_format(getattr(after, m), m):>13}' for m in METRICS) if after else '(deleted)'
+                print(f'{commit.sha[:8]:<9} {day:<10} {values}  {commit.subject[:50]}')
+        return 0
+
+    if args.revs:
+        selected = set(_git('rev-list', '--first-parent', args.revs).decode().split())
+        violations = check_range(commits, metrics, selected)
+    else:
+        violations = check_tip(commits, metrics)
+    for v in violations:
+        print(f'{v.path}: {v.metric} {_format(v.value, v.metric)} > budget {_format(v.limit, v.metric)} '
+              f'(was {_format(v.before, v.metric)}; {v.commit.sha[:8]} {v.commit.subject[:60]})')
+    blobs = len({sha for c in commits for sha in c.changes.values() if sha})
+    print(f'{len(commits)} commits, {blobs} TSX blobs, {len(violations)} budget violation(s) '
+          f'in {elapsed * 1000:.0f} ms', file=sys.stderr)
+    return 1 if violations else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,455 @@
+"""Structure checks for ``data/heroes.json`` and the hand-edited ``data/*.ts`` modules.
+
+``json.load`` stops at the first error and Metro only says the bundle failed,
+so one stray comma in ``heroes.json`` or ``wiki_events_*.ts`` (edited by hand
+and by scripts such as ``fix_heroes_json``) costs a round of bisecting. This
+checker runs the shared tokenizer (:mod:`tools.tsx_tokens`) through a small
+recovering parser and reports every structural error in one pass:
+
+* brackets that are never closed, closed by the wrong bracket or never opened;
+* missing commas, colons and values, and (JSON only) trailing commas,
+  unquoted or single-quoted keys and values that are not JSON;
+* duplicate keys in an object;
+* duplicate ``id`` values among the objects of one array (hero ids, event ids).
+
+Two modes, picked by file suffix:
+
+``json``  the whole file is one strict JSON value;
+``ts``    every object/array literal assigned by ``const``/``let``/``var`` or
+          ``export default`` is checked with TypeScript's rules: any key form,
+          trailing commas, shorthand and method properties, spreads, and
+          arbitrary expressions as values.
+
+Each file is decoded once with :func:`tools.common.read_text` and its tokens
+are consumed one at a time; only the open brackets, the keys of the open
+objects and the ids of the open arrays are kept, so the file's value is never
+built (the text itself is held in memory). Diagnostics use :class:`tools.tsx_check.Diagnostic` and are written
+as text, JSON Lines or SARIF (:mod:`tools.diag_output`).
+
+Usage::
+
+    python -m tools.data_check                        # data/*.json, data/*.ts
+    python -m tools.data_check data/heroes.json
+    python -m tools.data_check --format jsonl
+"""
+
+import argparse
+import json
+import sys
+
+from tools.common import REPO_ROOT, read_text, rel
+from tools.diag_output import FORMATS, open_writer
+from tools.tsx_check import BRACKETS, CLOSERS, Diagnostic
+from tools.tsx_tokens import EXPR_KEYWORDS, LineIndex, tokenize
+
+DEFAULT_PATHS = ('data',)
+MODES = {'.json': 'json', '.ts': 'ts'}
+
+RULES = {
+    'unclosed-bracket': 'An opening bracket is never closed',
+    'unmatched-bracket': 'A closing bracket has no opening bracket',
+    'mismatched-bracket': 'A closing bracket does not match the innermost open bracket',
+    'missing-comma': 'Two values or properties are not separated by a comma',
+    'missing-colon': 'An object key is not followed by a colon',
+    'missing-value': 'A key or array slot has no value',
+    'trailing-comma': 'JSON does not allow a comma before a closing bracket',
+    'invalid-key': 'JSON object keys must be double-quoted strings',
+    'invalid-value': 'Not a JSON value',
+    'unexpected-token': 'A token that cannot appear here',
+    'duplicate-key': 'The same key appears twice in one object',
+    'duplicate-id': 'Two objects in one array have the same id',
+}
+
+JSON_LITERALS = frozenset({'true', 'false', 'null'})
+# Words that continue an expression rather than end a value: ``'a' as const``.
+_INFIX_WORDS = EXPR_KEYWORDS | {'as', 'satisfies', 'keyof', 'async', 'function', 'get', 'set'}
+_DECLARATIONS = frozenset({'const', 'let', 'var', 'type', 'interface', 'enum', 'function', 'class'})
+_LITERAL_DECLARATIONS = frozenset({'const', 'let', 'var'})
+
+
+class _Frame:
+    """One open ``{`` or ``[`` literal."""
+
+    __slots__ = ('kind', 'opener', 'state', 'comma', 'key', 'keys', 'id', 'ids', 'depth')
+
+    def __init__(self, opener):
+        self.kind = opener.value
+        self.opener = opener
+        # '{': key -> colon -> value -> after; '[': value -> after; 'computed' inside ``[expr]:`` keys.
+        self.state = 'key' if self.kind == '{' else 'value'
+        self.comma = None      # the comma just read, while no member has followed it yet
+        self.key = None
+        self.keys = {}         # key -> line of its first occurrence
+        self.id = None         # ((kind, id), token) of this object
+        self.ids = {}          # (kind, id) -> line, over the objects of this array
+        self.depth = 0
+
+
+def _literal_text(token):
+    if token.kind == 'str':
+        if token.value.startswith('"'):
+            try:
+                return json.loads(token.value)
+            except ValueError:
+                pass
+        return token.value[1:-1]
+    return token.value
+
+
+class LiteralChecker:
+    """Recovering one-token-at-a-time parser for a JSON value (``strict``) or a TS literal.
+
+    ``feed`` every token, then ``finish``; ``done`` turns true once a TS literal
+    has been closed.
+    """
+
+    def __init__(self, path, lines, diagnostics, strict):
+        self.path = path
+        self.lines = lines
+        self.diagnostics = diagnostics
+        self.strict = strict
+        self.stack = []
+        self.expr = None        # open brackets of the TS expression being skipped, else None
+        self.expr_first = None
+        self.expr_len = 0
+        self.prev = None
+        self.root_done = False
+        self.trailing = False
+        self.done = False
+
+    def _report(self, rule, start, end, message, fix=None):
+        line, col = self.lines.line_col(start)
+        end_line, end_col = self.lines.line_col(end)
+        self.diagnostics.append(Diagnostic(rule, self.path, line, col, end_line, end_col, message, fix))
+
+    def _report_at(self, rule, token, message, fix=None):
+        self._report(rule, token.start, token.end, message, fix)
+
+    def _report_after_prev(self, rule, message, fix):
+        end = self.prev.end if self.prev is not None else 0
+        self._report(rule, end, end, message, fix)
+
+    def _unclosed(self, opener):
+        self._report_at('unclosed-bracket', opener, f"'{opener.value}' is never closed", fix=BRACKETS[opener.value])
+
+    def feed(self, token):
+        if not self.done:
+            self._dispatch(token)
+            self.prev = token
+
+    def finish(self):
+        if self.expr is not None:
+            for opener in self.expr:
+                self._unclosed(opener)
+            self.expr = []
+            self._end_expr()
+        for frame in reversed(self.stack):
+            self._unclosed(frame.opener)
+        self.stack = []
+        if self.strict and not self.root_done and self.prev is None:
+            self._report('missing-value', 0, 0, 'the file holds no JSON value')
+
+    # -- dispatch ---------------------------------------------------------
+
+    def _dispatch(self, token):
+        if self.expr is not None and self._feed_expr(token):
+            return
+        frame = self.stack[-1] if self.stack else None
+        if frame is not None and frame.state == 'computed':
+            self._on_computed(frame, token)
+        elif token.kind == 'punct' and token.value in CLOSERS:
+            self._close(token)
+        elif frame is None:
+            if self.root_done:
+                self._on_end(token)
+            else:
+                self._on_value(None, token)
+        else:
+            getattr(self, '_on_' + frame.state)(frame, token)
+
+    def _on_value(self, frame, token):
+        if token.kind == 'punct' and token.value in BRACKETS and token.value != '(':
+            if frame is not None:
+                frame.comma = None
+            self.stack.append(_Frame(token))
+            return
+        if token.kind == 'punct' and token.value == ',' and frame is not None:
+            self._report_at('missing-value', token, 'missing value before this comma')
+            self._value_done(None)
+            self._on_after(frame, token)
+            return
+        if frame is not None:
+            frame.comma = None
+        if not self.strict:
+            self.expr, self.expr_first, self.expr_len = [], None, 0
+            self._feed_expr(token)
+            return
+        if token.kind == 'punct' and token.value == '-':
+            return
+        if not (token.kind == 'str' and token.value.startswith('"') or token.kind == 'num'
+                or token.kind == 'ident' and token.value in JSON_LITERALS):
+            fix = json.dumps(_literal_text(token), ensure_ascii=False) if token.kind == 'str' else None
+            self._report_at('invalid-value', token, f'{token.value[:40]} is not a JSON value', fix)
+        self._value_done(token)
+
+    def _on_key(self, frame, token):
+        if token.kind in ('str', 'num', 'ident'):
+            if self.strict and not (token.kind == 'str' and token.value.startswith('"')):
+                self._report_at('invalid-key', token, f'key {token.value} must be a double-quoted string',
+                                fix=json.dumps(_literal_text(token), ensure_ascii=False))
+            self._key(frame, token)
+        elif not self.strict and token.kind == 'punct' and token.value == '[':
+            frame.state, frame.depth, frame.key, frame.comma = 'computed', 1, None, None
+        elif not self.strict and token.kind == 'punct' and token.value == '...':
+            frame.state, frame.key, frame.comma = 'value', None, None
+        elif token.kind == 'punct' and token.value in ('{', '['):
+            self._report_at('invalid-key', token, 'object member has no key')
+            frame.key, frame.state = None, 'value'
+            self._on_value(frame, token)
+        else:
+            self._report_at('unexpected-token', token, f'expected a key, found {token.value!r}')
+
+    def _on_colon(self, frame, token):
+        if token.kind == 'punct' and token.value == ':':
+            frame.state = 'value'
+            return
+        if not self.strict and token.kind == 'punct' and token.value in (',', ';'):
+            frame.state = 'after'          # shorthand property: ``{ id, name }``
+            self._on_after(frame, token)
+            return
+        if not self.strict and token.kind == 'punct' and token.value == '(':
+            frame.state = 'value'          # method: ``onPress() { ... }``
+            self._on_value(frame, token)
+            return
+        self._report_after_prev('missing-colon', f'missing \':\' after key {frame.key!r}', ':')
+        frame.state = 'value'
+        self._on_value(frame, token)
+
+    def _on_after(self, frame, token):
+        if token.kind == 'punct' and token.value in (',', ';'):
+            if token.value == ';':
+                self._report_at('unexpected-token', token, "';' between members; use ','", fix=',')
+            frame.comma = token
+            frame.state = 'key' if frame.kind == '{' else 'value'
+            return
+        if self._starts_value(token):
+            self._report_after_prev('missing-comma', f'missing \',\' before {token.value[:40]!r}', ',')
+            frame.state = 'key' if frame.kind == '{' else 'value'
+            self._dispatch(token)
+        elif self.strict:
+            self._report_at('unexpected-token', token, f'expected \',\' or \'{BRACKETS[frame.kind]}\', '
+                                                       f'found {token.value!r}')
+        else:
+            # The literal is part of a longer expression: ``[...].map(...)``, ``{...} as Foo``.
+            frame.state = 'value'
+            self.expr, self.expr_first, self.expr_len = [], None, 2
+            self._feed_expr(token)
+
+    def _on_computed(self, frame, token):
+        if token.kind == 'punct' and token.value in BRACKETS:
+            frame.depth += 1
+        elif token.kind == 'punct' and token.value in CLOSERS:
+            frame.depth -= 1
+            if frame.depth == 0:
+                frame.state = 'colon'
+
+    def _on_end(self, token):
+        if token.kind == 'punct' and token.value in CLOSERS:
+            return
+        if not self.trailing:
+            self._report_at('unexpected-token', token, f'unexpected {token.value[:40]!r} after the JSON value')
+            self.trailing = True
+
+    # -- values -----------------------------------------------------------
+
+    def _key(self, frame, token):
+        name = _literal_text(token)
+        first = frame.keys.get(name)
+        if first is not None:
+            self._report_at('duplicate-key', token, f'duplicate key {name!r} (first at line {first})')
+        else:
+            frame.keys[name] = self.lines.line(token.start)
+        frame.key, frame.state, frame.comma = name, 'colon', None
+
+    def _value_done(self, value):
+        if not self.stack:
+            if self.strict:
+                self.root_done = True
+            else:
+                self.done = True
+            return
+        frame = self.stack[-1]
+        if frame.kind == '{':
+            if frame.key == 'id' and value is not None and not isinstance(value, _Frame) \
+                    and value.kind in ('str', 'num'):
+                frame.id = ((value.kind, _literal_text(value)), value)
+        elif isinstance(value, _Frame) and value.id is not None:
+            ident, token = value.id   # 1 and "1" are different ids
+            first = frame.ids.get(ident)
+            if first is not None:
+                self._report_at('duplicate-id', token, f'duplicate id {token.value} (first at line {first})')
+            else:
+                frame.ids[ident] = self.lines.line(token.start)
+        frame.state = 'after'
+
+    def _close(self, token):
+        want = CLOSERS[token.value]
+        if not self.stack:
+            self._report_at('unmatched-bracket', token, f"'{token.value}' has no matching '{want}'")
+            return
+        if self.stack[-1].kind != want:
+            if not any(f.kind == want for f in self.stack):
+                top = self.stack[-1]
+                self._report_at('mismatched-bracket', token,
+                                f"'{token.value}' does not close '{top.kind}' opened at line "
+                                f'{self.lines.line(top.opener.start)}', fix=BRACKETS[top.kind])
+                return
+            while self.stack[-1].kind != want:
+                self._unclosed(self.stack.pop().opener)
+            self.stack[-1].state, self.stack[-1].comma = 'after', None
+        frame = self.stack.pop()
+        if frame.comma is not None:
+            if self.strict:
+                self._report_at('trailing-comma', frame.comma, f"trailing ',' before '{token.value}'", fix='')
+        elif frame.kind == '{' and (frame.state == 'value' or self.strict and frame.state == 'colon'):
+            self._report_at('missing-value', token, f'key {frame.key!r} has no value')
+        self._value_done(frame)
+
+    # -- TS expressions ---------------------------------------------------
+
+    def _ends_value(self, token):
+        if token is None:
+            return False
+        if token.kind in ('str', 'num', 'regex'):
+            return True
+        if token.kind == 'tmpl':
+            return token.value.endswith('`')
+        if token.kind == 'punct':
+            return token.value in CLOSERS
+        return token.kind == 'ident' and token.value not in _INFIX_WORDS
+
+    def _starts_value(self, token):
+        """True if ``token`` cannot continue the value that ended at ``self.prev``."""
+        if self.strict:
+            return token.kind in ('str', 'num', 'ident') or token.kind == 'punct' and token.value in '{[-'
+        if not self._ends_value(self.prev):
+            return False
+        if token.kind in ('str', 'num'):
+            return True
+        if token.kind == 'ident':
+            return token.value not in _INFIX_WORDS
+        if token.kind == 'punct' and token.value == '{':
+            return self.prev.value != ')'          # ``function () {``
+        if token.kind == 'punct' and token.value == '[':
+            return self.prev.value == '}'          # ``x[0]``, ``f()[0]`` and ``a[0][1]`` are indexing
+        return False
+
+    def _feed_expr(self, token):
+        """Consume ``token`` as part of the current TS value; False if it ends the value instead."""
+        stack = self.expr
+        if token.kind == 'punct' and token.value in BRACKETS:
+            stack.append(token)
+        elif token.kind == 'punct' and token.value in CLOSERS:
+            want = CLOSERS[token.value]
+            if not any(o.value == want for o in stack):
+                for opener in stack:
+                    self._unclosed(opener)
+                stack.clear()
+                self._end_expr()
+                return False
+            while stack[-1].value != want:
+                self._unclosed(stack.pop())
+            stack.pop()
+        elif not stack and (token.kind == 'punct' and token.value in (',', ';')
+                            or self.expr_len and self._starts_value(token)):
+            self._end_expr()
+            return False
+        if self.expr_len == 0:
+            self.expr_first = token
+        self.expr_len += 1
+        return True
+
+    def _end_expr(self):
+        value = self.expr_first if self.expr_len == 1 else None
+        self.expr = None
+        self._value_done(value)
+
+
+def check_json(path, text):
+    """Diagnostics for ``text`` as one strict JSON value."""
+    diagnostics = []
+    checker = LiteralChecker(path, LineIndex(text), diagnostics, strict=True)
+    for token in tokenize(text, jsx=False):
+        checker.feed(token)
+    checker.finish()
+    return sorted(diagnostics, key=lambda d: (d.line, d.col))
+
+
+def check_module(path, text):
+    """Diagnostics for the object and array literals assigned in the TS module ``text``."""
+    diagnostics = []
+    lines = LineIndex(text)
+    checker = None
+    declaration = prev = None
+    assigned = False
+    for token in tokenize(text, jsx=False):
+        if checker is not None:
+            checker.feed(token)
+            if checker.done:
+                checker = None
+        elif assigned and token.kind == 'punct' and token.value in ('{', '['):
+            checker = LiteralChecker(path, lines, diagnostics, strict=False)
+            checker.feed(token)
+        elif token.kind == 'ident' and token.value in _DECLARATIONS and (prev is None or prev.value != '.'):
+            declaration = token.value
+        assigned = (token.kind == 'punct' and token.value == '=' and declaration in _LITERAL_DECLARATIONS
+                    or token.kind == 'ident' and token.value == 'default'
+                    and prev is not None and prev.value == 'export')
+        prev = token
+    if checker is not None:
+        checker.finish()
+    return sorted(diagnostics, key=lambda d: (d.line, d.col))
+
+
+def check_file(path):
+    mode = MODES.get(path.suffix)
+    text = read_text(path)
+    if mode == 'json':
+        return check_json(rel(path), text)
+    return check_module(rel(path), text)
+
+
+def data_files(paths=None):
+    """Expand ``paths`` (files or directories) into JSON and TS files; default: ``data/``."""
+    found = []
+    for root in [REPO_ROOT / p for p in (paths or DEFAULT_PATHS)]:
+        if root.is_file():
+            found.append(root)
+        elif root.is_dir():
+            found.extend(p for p in sorted(root.rglob('*')) if p.suffix in MODES)
+    return found
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('paths', nargs='*', help='files or directories (default: data/)')
+    parser.add_argument('--format', choices=FORMATS, default='text', help='output format (default: text)')
+    args = parser.parse_args(argv)
+
+    paths = data_files(args.paths)
+    writer = open_writer(args.format, 'tools.data_check', RULES)
+    problems = 0
+    try:
+        for path in paths:
+            diagnostics = check_file(path)
+            for d in diagnostics:
+                writer.emit(d)
+            problems += len(diagnostics)
+    finally:
+        writer.close()
+    print(f'{len(paths)} files, {problems} problems', file=sys.stderr)
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
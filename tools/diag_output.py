@@ -0,0 +1,116 @@
+"""Machine-readable diagnostic output: JSON Lines and SARIF 2.1.0.
+
+Writers take :class:`tools.tsx_check.Diagnostic`-shaped records and emit each
+one as soon as it is produced, flushing after every record, so an editor or
+CI annotator reading the stream sees the first file's results while the rest
+of a parallel run is still going.
+
+``jsonl`` is one self-contained object per line::
+
+    {"rule": "unclosed-tag", "file": "app/growth/events.tsx", "line": 882, "col": 13,
+     "span": {"start": {"line": 882, "col": 13}, "end": {"line": 882, "col": 14}},
+     "message": "<View> is never closed", "fix": "</View>"}
+
+``sarif`` writes the document header up front and appends results as they
+arrive; the document is complete once the writer is closed. A diagnostic's
+``fix`` becomes a SARIF ``fixes`` entry replacing its region, except for
+unclosed brackets and tags, whose missing closer has no known position and is
+kept as ``properties.missingText``.
+"""
+
+import json
+import sys
+
+FORMATS = ('text', 'jsonl', 'sarif')
+
+SARIF_SCHEMA = 'https://json.schemastore.org/sarif-2.1.0.json'
+
+
+def diagnostic_dict(d):
+    return {
+        'rule': d.rule,
+        'file': d.path,
+        'line': d.line,
+        'col': d.col,
+        'span': {'start': {'line': d.line, 'col': d.col}, 'end': {'line': d.end_line, 'col': d.end_col}},
+        'message': d.message,
+        'fix': d.fix,
+    }
+
+
+class TextWriter:
+    def __init__(self, stream):
+        self.stream = stream
+
+    def emit(self, d):
+        self.stream.write(f'{d.path}:{d.line}:{d.col}: {d.rule}: {d.message}\n')
+        self.stream.flush()
+
+    def close(self):
+        pass
+
+
+class JsonLinesWriter(TextWriter):
+    def emit(self, d):
+        self.stream.write(json.dumps(diagnostic_dict(d), ensure_ascii=False) + '\n')
+        self.stream.flush()
+
+
+class SarifWriter:
+    """Streams one SARIF run; ``rules`` maps rule ids to short descriptions."""
+
+    def __init__(self, stream, tool, rules):
+        self.stream = stream
+        self.first = True
+        driver = {
+            'name': tool,
+            'informationUri': 'https://github.com/songkong72/WOS-Commander',
+            'rules': [{'id': rule, 'shortDescription': {'text': text}} for rule, text in rules.items()],
+        }
+        header = json.dumps({'$schema': SARIF_SCHEMA, 'version': '2.1.0', 'runs': [
+            {'tool': {'driver': driver}, 'columnKind': 'unicodeCodePoints', 'results': []}]},
+            ensure_ascii=False)
+        # Everything up to the empty results array; results are spliced in as they come.
+        self.tail = header[header.rindex('[]') + 1:]
+        stream.write(header[:header.rindex('[]') + 1])
+        stream.flush()
+
+    def emit(self, d):
+        region = {'startLine': d.line, 'startColumn': d.col, 'endLine': d.end_line, 'endColumn': d.end_col}
+        result = {
+            'ruleId': d.rule,
+            'level': 'error',
+            'message': {'text': d.message},
+            'locations': [{'physicalLocation': {'artifactLocation': {'uri': d.path}, 'region': region}}],
+        }
+        if d.fix is not None and d.rule.startswith('unclosed'):
+            # The missing closer belongs somewhere after the opener, not at a known span,
+            # so there is no replacement to offer; keep the text as a hint.
+            result['properties'] = {'missingText': d.fix}
+        elif d.fix is not None:
+            # The fix replaces the reported span; zero-width spans (missing ',' or ':') are insertions
+            # and an empty fix is a deletion.
+            replacement = {'deletedRegion': region}
+            if d.fix:
+                replacement['insertedContent'] = {'text': d.fix}
+            result['fixes'] = [{
+                'description': {'text': f'replace with {d.fix!r}' if d.fix else 'delete'},
+                'artifactChanges': [{'artifactLocation': {'uri': d.path}, 'replacements': [replacement]}],
+            }]
+        self.stream.write(('\n' if self.first else ',\n') + json.dumps(result, ensure_ascii=False))
+        self.first = False
+        self.stream.flush()
+
+    def close(self):
+        self.stream.write(self.tail + '\n')
+        self.stream.flush()
+
+
+def open_writer(fmt, tool, rules, stream=None):
+    """Return a writer for ``fmt`` (one of :data:`FORMATS`); call ``close()`` when done."""
+    stream = stream or sys.stdout
+    if fmt == 'jsonl':
+        return JsonLinesWriter(stream)
+    if fmt == 'sarif':
+        return SarifWriter(stream, tool, rules)
+    return TextWriter(stream)
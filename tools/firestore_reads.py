@@ -0,0 +1,458 @@
+"""Static Firestore listener and read-cost analyzer.
+
+Maps every expo-router route in ``app/`` to the Firestore reads its code can
+issue: ``onSnapshot`` listeners and ``getDoc``/``getDocs`` calls in the route
+file, its ``_layout`` files and everything they import (hooks, components,
+modals ...), with the collection or document path each one reads and whether
+a collection query is ordered, filtered or bounded by ``limit()``. Only a
+literal ``limit(20)`` bounds a query; ``limit(pageSize)`` is recorded as an
+unknown limit, costed as the whole collection and reported as such.
+
+* files are tokenized with :mod:`tools.tsx_tokens`; the ref passed to a read
+  is resolved through local variables, ``getCollectionRef()``-style helper
+  functions and ``query(...)`` wrappers, so every alternative path (alliance
+  path or legacy fallback ...) is listed;
+* the import graph comes from :mod:`tools.usage_index`;
+* a document-count fixture (``tools/firestore_docs.json``, path patterns with
+  ``*`` for variable segments) turns this into reads per visit: a listener
+  costs the documents it matches (at least 1) plus the changes it receives
+  during a session, a get costs the documents it returns.
+
+Reads inside ``useEffect`` run on every visit (``mount``); reads elsewhere run
+when the user does something (``action``) and are reported separately. The
+analysis is static: an imported component counts even if it is only rendered
+on some code path.
+
+Usage::
+
+    python -m tools.firestore_reads
+    python -m tools.firestore_reads --route /growth/events
+    python -m tools.firestore_reads --summary --fixture my_counts.json
+"""
+
+import argparse
+import json
+import posixpath
+import sys
+from pathlib import Path
+from typing import NamedTuple, Optional, Union
+
+from tools.common import REPO_ROOT, read_text
+from tools.tsx_tokens import LineIndex, is_jsx_path, tokenize
+from tools.usage_index import UsageIndex
+
+DEFAULT_FIXTURE = Path(__file__).resolve().parent / 'firestore_docs.json'
+
+# Firestore calls that bill reads, and how.
+READ_CALLS = {
+    'onSnapshot': 'listen',
+    'getDoc': 'get',
+    'getDocs': 'get',
+    'getDocFromServer': 'get',
+    'getDocsFromServer': 'get',
+}
+REF_CALLS = {'collection': 'collection', 'collectionGroup': 'collection', 'doc': 'doc'}
+# React hooks whose callbacks run when a screen mounts.
+MOUNT_HOOKS = frozenset({'useEffect', 'useLayoutEffect', 'useFocusEffect'})
+
+_OPEN = {'(': ')', '[': ']', '{': '}'}
+_CLOSE = frozenset(_OPEN.values())
+
+
+class Ref(NamedTuple):
+    kind: str               # 'collection', 'doc' or 'unknown'
+    path: str               # 'servers/{serverId}/alliances/{allianceId}/members'
+    ordered: bool = False
+    filtered: bool = False
+    limit: Union[int, str, None] = None    # 20 for limit(20), 'pageSize' for limit(pageSize), None without limit()
+
+
+class Read(NamedTuple):
+    file: str
+    line: int
+    col: int
+    op: str                 # 'listen' or 'get'
+    trigger: str            # 'mount' or 'action'
+    refs: tuple             # alternative :class:`Ref` s, e.g. alliance path and legacy fallback
+
+    @property
+    def unbounded(self):
+        return any(r.kind == 'collection' and r.limit is None and not r.filtered for r in self.refs)
+
+    @property
+    def unknown_limit(self):
+        """True if a ``limit()`` argument is not a literal, so the bound cannot be told statically."""
+        return any(isinstance(r.limit, str) for r in self.refs)
+
+
+class _Scanner:
+    """Resolves Firestore refs inside one tokenized file."""
+
+    def __init__(self, text, tokens):
+        self.tokens = tokens
+        self.lines = LineIndex(text)
+        self.match = {}
+        # Innermost enclosing ``{`` of every token (-1 at the top level), for block scoping.
+        self.block = []
+        stack, braces = [], []
+        for i, t in enumerate(tokens):
+            self.block.append(braces[-1] if braces else -1)
+            if t.kind != 'punct':
+                continue
+            if t.value in _OPEN:
+                stack.append(i)
+                if t.value == '{':
+                    braces.append(i)
+            elif t.value in _CLOSE and stack:
+                opened = stack.pop()
+                self.match[opened] = i
+                if tokens[opened].value == '{' and braces:
+                    braces.pop()
+        # name -> [(start, end, declared, block)]: ``const x = ...`` / ``function x`` declarations and
+        # ``x = ...`` reassignments, with the block they appear in.
+        self.defs = {}
+        for i, t in enumerate(tokens):
+            if t.kind != 'ident' or not self._at_name(i):
+                continue
+            prev = tokens[i - 1].value if i else None
+            if prev == 'function' and i + 1 < len(tokens) and tokens[i + 1].value == '(':
+                close = self.match.get(i + 1, i + 1)
+                body = next((k for k in range(close + 1, len(tokens)) if tokens[k].value == '{'), None)
+                if body is not None:
+                    self.defs.setdefault(t.value, []).append((body, self.match.get(body, body) + 1, True,
+                                                              self.block[i]))
+                continue
+            declared = prev in ('const', 'let', 'var')
+            j = i + 1
+            if declared:
+                while j < len(tokens) and tokens[j].value not in ('=', ';', ',', ')'):
+                    j = self.match.get(j, j) + 1          # skip a type annotation
+            if j < len(tokens) and tokens[j].value == '=' and (declared or prev in (';', '{', '}')):
+                self.defs.setdefault(t.value, []).append((j + 1, self._expression_end(j + 1), declared,
+                                                          self.block[i]))
+
+    def _contains(self, block, i):
+        return block < 0 or block < i < self.match.get(block, len(self.tokens))
+
+    def definitions(self, name, i):
+        """The value ranges ``name`` can hold at token ``i``: the innermost visible declaration and
+        every reassignment inside its block."""
+        visible = [d for d in self.defs.get(name, ()) if d[2] and self._contains(d[3], i)]
+        if not visible:
+            return []
+        scope = max(visible, key=lambda d: d[3])[3]
+        return [(start, end) for start, end, declared, block in self.defs[name]
+                if (declared and block == scope) or (not declared and self._contains(scope, start))]
+
+    def _at_name(self, i):
+        return not i or self.tokens[i - 1].value not in ('.', '?.')
+
+    def _expression_end(self, i):
+        while i < len(self.tokens):
+            value = self.tokens[i].value
+            if self.tokens[i].kind == 'punct':
+                if value in _OPEN:
+                    i = self.match.get(i, i) + 1
+                    continue
+                if value in _CLOSE or value in (';', ','):
+                    return i
+            i += 1
+        return i
+
+    def _args(self, open_index):
+        """Split the arguments of the call whose ``(`` is at ``open_index`` into token ranges."""
+        close = self.match.get(open_index, open_index)
+        args, start, i = [], open_index + 1, open_index + 1
+        while i < close:
+            if self.tokens[i].kind == 'punct' and self.tokens[i].value in _OPEN:
+                i = self.match.get(i, i) + 1
+                continue
+            if self.tokens[i].value == ',':
+                args.append((start, i))
+                start = i + 1
+            i += 1
+        if start < close:
+            args.append((start, close))
+        return args
+
+    def _function_body(self, start, end):
+        """The returned-expression ranges of an arrow function or ``function`` body in ``[start, end)``."""
+        tokens = self.tokens
+        arrow = next((k for k in range(start, end) if tokens[k].value == '=>'), None)
+        if arrow is not None:
+            start = arrow + 1
+        elif tokens[start].value != '{':
+            return None
+        if start < end and tokens[start].value == '{':
+            close = self.match.get(start, end)
+            return [(k + 1, self._expression_end(k + 1)) for k in range(start + 1, close)
+                    if tokens[k].kind == 'ident' and tokens[k].value == 'return']
+        return [(start, end)] if arrow is not None else None
+
+    def _segment(self, start, end):
+        t = self.tokens[start]
+        if end - start == 1 and t.kind == 'str':
+            return t.value[1:-1]
+        if end - start == 1 and t.kind == 'tmpl' and '${' not in t.value:
+            return t.value[1:-1]
+        if t.kind != 'ident':
+            return '{?}'
+        # The leading member chain: ``req.adminId`` -> {req.adminId}, ``id.toLowerCase()`` -> {id}.
+        chain, k = [t.value], start + 1
+        while k + 1 < end and self.tokens[k].value in ('.', '?.') and self.tokens[k + 1].kind == 'ident':
+            chain.append(self.tokens[k + 1].value)
+            k += 2
+        if k < end and self.tokens[k].value == '(' and len(chain) > 1:
+            chain.pop()
+        return '{' + '.'.join(chain) + '}'
+
+    def _ref_call(self, name, open_index, seen):
+        args = self._args(open_index)
+        if not args:
+            return []
+        bases = self.resolve(*args[0], seen)
+        if bases:
+            segments = args[1:]
+        else:
+            bases, segments = [Ref(REF_CALLS[name], '')], args[1:]
+        tail = '/'.join(self._segment(*a) for a in segments)
+        if name == 'collectionGroup':
+            tail = '**/' + tail
+        return [Ref(REF_CALLS[name], '/'.join(p for p in (base.path, tail) if p)) for base in bases]
+
+    def _query(self, open_index, seen):
+        args = self._args(open_index)
+        if not args:
+            return []
+        ordered = filtered = False
+        limit = None
+        for start, end in args[1:]:
+            for k in range(start, end):
+                value = self.tokens[k].value
+                if self.tokens[k].kind != 'ident' or not self._at_name(k):
+                    continue
+                if value == 'orderBy':
+                    ordered = True
+                elif value == 'where':
+                    filtered = True
+                elif value in ('limit', 'limitToLast') and k + 1 < end and self.tokens[k + 1].value == '(':
+                    limit = self._limit(k + 1)
+        return [r._replace(ordered=r.ordered or ordered, filtered=r.filtered or filtered,
+                           limit=limit if limit is not None else r.limit)
+                for r in self.resolve(*args[0], seen)]
+
+    def _limit(self, open_index):
+        """The bound of ``limit(...)`` at ``open_index``: an int for a literal, else the argument's source."""
+        args = self._args(open_index)
+        if not args:
+            return ''
+        start, end = args[0]
+        arg = self.tokens[start]
+        if end - start == 1 and arg.kind == 'num' and arg.value.isdigit():
+            return int(arg.value)
+        return ' '.join(t.value for t in self.tokens[start:end])
+
+    def resolve(self, start, end, seen=frozenset()):
+        """Return the :class:`Ref` alternatives the expression in ``[start, end)`` can evaluate to."""
+        tokens, refs, i = self.tokens, [], start
+        while i < end:
+            t = tokens[i]
+            if t.kind != 'ident' or not self._at_name(i):
+                i += 1
+                continue
+            is_call = i + 1 < end and tokens[i + 1].value == '('
+            if is_call and t.value == 'query':
+                refs += self._query(i + 1, seen)
+                i = self.match.get(i + 1, i + 1) + 1
+            elif is_call and t.value in REF_CALLS:
+                refs += self._ref_call(t.value, i + 1, seen)
+                i = self.match.get(i + 1, i + 1) + 1
+            elif t.value in self.defs and t.value not in seen:
+                inner = seen | {t.value}
+                for def_start, def_end in self.definitions(t.value, i):
+                    if is_call:
+                        for ret in self._function_body(def_start, def_end) or ():
+                            refs += self.resolve(*ret, inner)
+                    elif not self._function_body(def_start, def_end):
+                        refs += self.resolve(def_start, def_end, inner)
+                i = self.match.get(i + 1, i + 1) + 1 if is_call else i + 1
+            else:
+                i += 1
+        return list(dict.fromkeys(refs))
+
+    def reads(self, path):
+        tokens, found = self.tokens, []
+        mounts = [(i + 1, self.match.get(i + 1, i + 1)) for i, t in enumerate(tokens)
+                  if t.kind == 'ident' and t.value in MOUNT_HOOKS and i + 1 < len(tokens)
+                  and tokens[i + 1].value == '(']
+        for i, t in enumerate(tokens):
+            if t.kind != 'ident' or t.value not in READ_CALLS or not self._at_name(i) \
+                    or i + 1 >= len(tokens) or tokens[i + 1].value != '(':
+                continue
+            args = self._args(i + 1)
+            refs = tuple(self.resolve(*args[0])) if args else ()
+            trigger = 'mount' if any(lo < i < hi for lo, hi in mounts) else 'action'
+            found.append(Read(path, *self.lines.line_col(t.start), READ_CALLS[t.value], trigger,
+                              refs or (Ref('unknown', '?'),)))
+        return found
+
+
+def file_reads(path):
+    """Return the :class:`Read` s in one source file (repo-relative ``path``)."""
+    text = read_text(REPO_ROOT / path)
+    if not any(name in text for name in READ_CALLS):
+        return []
+    return _Scanner(text, list(tokenize(text, jsx=is_jsx_path(path)))).reads(path)
+
+
+class Fixture:
+    """Document counts per path pattern: ``{"default": {...}, "paths": {"servers/*/alliances/*/members": {...}}}``.
+
+    Each entry may give ``docs`` (collection size), ``matches`` (documents a
+    ``where`` query returns) and ``changes`` (document changes a listener sees
+    per session).
+    """
+
+    def __init__(self, data):
+        self.default = {'docs': 50, 'changes': 0, **data.get('default', {})}
+        self.patterns = sorted(((key.split('/'), entry) for key, entry in data.get('paths', {}).items()),
+                               key=lambda p: p[0].count('*'))
+
+    @classmethod
+    def load(cls, path=DEFAULT_FIXTURE):
+        return cls(json.loads(read_text(path)))
+
+    def lookup(self, path):
+        """Return ``(entry, known)`` for a resolved path such as ``servers/{serverId}/members``."""
+        segments = path.split('/')
+        for pattern, entry in self.patterns:
+            if len(pattern) == len(segments) and all(p in ('*', s) for p, s in zip(pattern, segments)):
+                return {**self.default, **entry}, True
+        return self.default, False
+
+    def cost(self, read):
+        """Estimated reads billed for ``read``: the most expensive of its alternative refs."""
+        best, known = 0, True
+        for ref in read.refs:
+            entry, found = self.lookup(ref.path)
+            known = known and found
+            if ref.kind == 'doc':
+                initial = 1
+            else:
+                initial = entry.get('matches', entry['docs']) if ref.filtered else entry['docs']
+                if isinstance(ref.limit, int):
+                    initial = min(initial, ref.limit)
+            cost = max(1, initial) + (entry['changes'] if read.op == 'listen' else 0)
+            best = max(best, cost)
+        return best, known
+
+
+def route_of(path):
+    """``app/hero-management/[id].tsx`` -> ``/hero-management/[id]``; groups like ``(tabs)`` are dropped."""
+    parts = [p for p in posixpath.splitext(path)[0].split('/')[1:] if not (p.startswith('(') and p.endswith(')'))]
+    if parts and parts[-1] == 'index':
+        parts.pop()
+    return '/' + '/'.join(parts)
+
+
+def routes(files):
+    """The route files of the index (default export under ``app/``) and the ``_layout`` files."""
+    pages, layouts = [], []
+    for path, record in files.items():
+        if not path.startswith('app/') or not path.endswith(('.tsx', '.ts', '.jsx', '.js')):
+            continue
+        name = posixpath.basename(path)
+        if name.startswith('_layout.'):
+            layouts.append(path)
+        elif not name.startswith(('_', '+')) and 'default' in record['exports']:
+            pages.append(path)
+    return sorted(pages), sorted(layouts)
+
+
+def reachable(files, start):
+    seen, todo = {start}, [start]
+    while todo:
+        for target, *_ in files.get(todo.pop(), {}).get('imports', {}).values():
+            if target in files and target not in seen:
+                seen.add(target)
+                todo.append(target)
+    return seen
+
+
+def analyse(index, fixture):
+    """Return ``[(route, page, reads, mount_cost, action_cost, all_known)]`` most expensive first."""
+    files = index.files
+    pages, layouts = routes(files)
+    per_file = {}
+    report = []
+    for page in pages:
+        scope = reachable(files, page)
+        for layout in layouts:
+            if page.startswith(posixpath.dirname(layout) + '/'):
+                scope |= reachable(files, layout)
+        reads = []
+        for path in sorted(scope):
+            if path not in per_file:
+                per_file[path] = file_reads(path)
+            reads += per_file[path]
+        mount = action = 0
+        all_known = True
+        for read in reads:
+            cost, known = fixture.cost(read)
+            all_known = all_known and known
+            if read.trigger == 'mount':
+                mount += cost
+            else:
+                action += cost
+        report.append((route_of(page), page, reads, mount, action, all_known))
+    report.sort(key=lambda r: (-r[3], r[0]))
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--fixture', default=str(DEFAULT_FIXTURE), help='document-count fixture (JSON)')
+    parser.add_argument('--route', help='only report this route (e.g. /growth/events)')
+    parser.add_argument('--summary', action='store_true', help='one line per route')
+    args = parser.parse_args(argv)
+
+    fixture = Fixture.load(args.fixture)
+    index, _ = UsageIndex.update()
+    report = analyse(index, fixture)
+    if args.route:
+        report = [r for r in report if r[0] == args.route]
+        if not report:
+            print(f'{args.route}: no such route', file=sys.stderr)
+            return 1
+
+    width = max(len(r[0]) for r in report)
+    for route, page, reads, mount, action, all_known in report:
+        listeners = [r for r in reads if r.op == 'listen']
+        unbounded = sum(r.unbounded for r in listeners)
+        unknown = sum(r.unknown_limit for r in listeners)
+        estimate = f'~{mount}' + ('' if all_known else '*')
+        print(f'{route:<{width}} {estimate:>7} reads/visit  {len(listeners)} listener(s), {unbounded} unbounded, '
+              + (f'{unknown} with unknown limit, ' if unknown else '')
+              + f'+{action} on actions  ({page})')
+        if args.summary:
+            continue
+        for read in sorted(reads, key=lambda r: (r.trigger != 'mount', r.op != 'listen', r.file, r.line)):
+            cost, known = fixture.cost(read)
+            flags = []
+            if read.unbounded:
+                flags.append('unbounded')
+            if any(r.ordered for r in read.refs):
+                flags.append('ordered')
+            if any(r.filtered for r in read.refs):
+                flags.append('filtered')
+            limits = sorted({r.limit for r in read.refs if r.limit is not None}, key=str)
+            flags.extend(f'limit {n}' if isinstance(n, int) else f'limit ?({n})' for n in limits)
+            paths = ' | '.join(f"{r.path}{'/' if r.kind == 'collection' else ''}" for r in read.refs)
+            print(f"    {read.op:<6} {read.trigger:<6} {cost:>5}{'' if known else '*'}  "
+                  f"{read.file}:{read.line}  {paths}" + (f"  [{', '.join(flags)}]" if flags else ''))
+    print('collections end in /; * = path not in the fixture, default counts used', file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
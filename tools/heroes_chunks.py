@@ -0,0 +1,234 @@
+"""Chunked, lazily loadable build of ``data/heroes.json``.
+
+Every screen that imports ``heroes.json`` pulls all heroes (skills,
+equipment, descriptions ...) into the bundle and parses them at startup, even
+when it only needs a list of names. This build splits the file into:
+
+* ``data/hero-chunks/summary.json`` -- one small record per hero (id, name,
+  type, gen, rarity, image, ``displayInfo.subClass``), enough for lists and
+  pickers;
+* ``data/hero-chunks/gen-<gen>.json`` -- the full records of one generation,
+  so a detail screen loads only the chunk its hero is in;
+* ``data/hero-chunks/manifest.json`` -- source hash, chunk files, their
+  hashes, sizes and hero ids;
+* ``data/hero-chunks/index.ts`` -- the loader: the ``Hero`` type,
+  ``heroSummaries`` and the async ``loadHeroChunk(gen)`` / ``loadHero(id)``.
+  Chunks are dynamic ``import()``-s, so the bundler can split them out (Metro
+  evaluates a chunk only when it is first asked for; web exports with bundle
+  splitting fetch it on demand).
+
+The directory is deliberately not ``data/heroes``: Metro resolves
+``data/heroes`` to ``heroes.json`` before it looks for a directory index.
+
+The output is a pure function of the source bytes (records keep their file
+order, no timestamps), and the build is skipped when the manifest already
+records the current source hash and every output is intact. Files whose bytes
+did not change are not rewritten, so Metro does not see them as modified.
+
+Usage::
+
+    python -m tools.heroes_chunks            # rebuild if heroes.json changed
+    python -m tools.heroes_chunks --check    # exit 1 if the chunks are stale (CI)
+    python -m tools.heroes_chunks --force
+"""
+
+import argparse
+import json
+import re
+import sys
+
+from tools.common import HEROES_JSON, REPO_ROOT, read_text, rel, sha256_bytes, write_if_changed
+from tools.heroes_store import HeroStore
+
+OUT_DIR = REPO_ROOT / 'data' / 'hero-chunks'
+MANIFEST = 'manifest.json'
+SUMMARY = 'summary.json'
+LOADER = 'index.ts'
+# Bump when the output layout changes so existing chunks are rebuilt.
+BUILD_VERSION = 3
+
+SUMMARY_FIELDS = ('id', 'name', 'type', 'gen', 'rarity', 'image')
+# Nested fields the hero list shows (the role icon).
+SUMMARY_DISPLAY_FIELDS = ('subClass',)
+# Generations whose names are not safe in a bundler path.
+GEN_SLUGS = {'상설': 'permanent'}
+UNKNOWN_GEN = 'unknown'
+
+
+def gen_slug(gen):
+    return GEN_SLUGS.get(gen) or re.sub(r'[^a-z0-9]+', '-', gen.lower()).strip('-') or UNKNOWN_GEN
+
+
+def gen_order(gen):
+    """Seasons in numeric order (S1, S2 ... S15), then everything else by name."""
+    match = re.fullmatch(r'S(\d+)', gen)
+    return (0, int(match.group(1)), '') if match else (1, 0, gen)
+
+
+def summary_record(record):
+    summary = {k: record[k] for k in SUMMARY_FIELDS if k in record}
+    display = {k: v for k, v in (record.get('displayInfo') or {}).items() if k in SUMMARY_DISPLAY_FIELDS}
+    if display:
+        summary['displayInfo'] = display
+    return summary
+
+
+def _dump(value):
+    return (json.dumps(value, ensure_ascii=False, separators=(',', ':')) + '\n').encode('utf-8')
+
+
+def render(records, source_sha):
+    """Return ``{file name: bytes}`` for every output of the build."""
+    chunks = {}
+    for record in records:
+        chunks.setdefault(record.get('gen') or UNKNOWN_GEN, []).append(record)
+    gens = sorted(chunks, key=gen_order)
+
+    files = {SUMMARY: _dump([summary_record(r) for r in records])}
+    entries = {}
+    for gen in gens:
+        name = f'gen-{gen_slug(gen)}.json'
+        if name in files:
+            raise ValueError(f'generations {gen!r} and another one both map to {name}')
+        files[name] = _dump(chunks[gen])
+        entries[gen] = {'file': name, 'sha256': sha256_bytes(files[name]), 'bytes': len(files[name]),
+                        'ids': [r['id'] for r in chunks[gen]]}
+
+    lines = [
+        '// Auto-generated by `python -m tools.heroes_chunks` from data/heroes.json -- do not edit.',
+        '',
+        "import summary from './summary.json';",
+        '',
+        'export interface HeroSkill {',
+        '    name: string;',
+        '    desc?: string;',
+        '    icon?: string;',
+        '    [key: string]: unknown;',
+        '}',
+        '',
+        'export interface HeroEquipment {',
+        '    name?: string;',
+        '    icon?: string;',
+        '    power?: string | number;',
+        '    skills?: HeroSkill[];',
+        '    [key: string]: unknown;',
+        '}',
+        '',
+        'export interface Hero {',
+        '    id: string;',
+        '    name: string;',
+        '    type: string;',
+        '    gen: string;',
+        '    rarity: string;',
+        '    image: string;',
+        '    displayInfo?: { rarity?: string; class?: string; subClass?: string };',
+        '    description?: string;',
+        '    skills?: {',
+        '        exploration?: HeroSkill[];',
+        '        expedition?: HeroSkill[];',
+        '        special?: HeroSkill[];',
+        '        equipment?: HeroEquipment;',
+        '    };',
+        '    equipment?: HeroEquipment;',
+        '}',
+        '',
+        'export type HeroSummary = (typeof summary)[number];',
+        '',
+        'export const heroSummaries: HeroSummary[] = summary;',
+        '',
+        '// Dynamic imports, so each generation is a separate module the bundler can split out.',
+        'const chunks: { [gen: string]: () => Promise<{ default: unknown }> } = {',
+    ]
+    lines += [f"    '{gen}': () => import('./{entries[gen]['file']}')," for gen in gens]
+    lines += [
+        '};',
+        '',
+        'const summaryById = new Map(summary.map(h => [h.id, h]));',
+        '',
+        'export async function loadHeroChunk(gen: string): Promise<Hero[]> {',
+        '    const load = chunks[gen];',
+        '    return load ? ((await load()).default as Hero[]) : [];',
+        '}',
+        '',
+        'export async function loadHero(id: string): Promise<Hero | undefined> {',
+        '    const entry = summaryById.get(id);',
+        '    return entry ? (await loadHeroChunk(entry.gen)).find(h => h.id === id) : undefined;',
+        '}',
+        '',
+    ]
+    files[LOADER] = '\n'.join(lines).encode('utf-8')
+
+    manifest = {
+        'version': BUILD_VERSION,
+        'source': rel(HEROES_JSON),
+        'source_sha256': source_sha,
+        'heroes': len(records),
+        'summary': {'file': SUMMARY, 'sha256': sha256_bytes(files[SUMMARY]), 'bytes': len(files[SUMMARY])},
+        'loader': {'file': LOADER, 'sha256': sha256_bytes(files[LOADER])},
+        'chunks': entries,
+    }
+    files[MANIFEST] = (json.dumps(manifest, ensure_ascii=False, indent=2) + '\n').encode('utf-8')
+    return files
+
+
+def is_current(source_sha, out_dir=OUT_DIR):
+    """True if ``out_dir`` holds an intact build of the source with hash ``source_sha``."""
+    try:
+        manifest = json.loads(read_text(out_dir / MANIFEST))
+        if manifest.get('version') != BUILD_VERSION or manifest.get('source_sha256') != source_sha:
+            return False
+        outputs = [manifest['summary'], manifest['loader'], *manifest['chunks'].values()]
+        return all(sha256_bytes((out_dir / o['file']).read_bytes()) == o['sha256'] for o in outputs)
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return False
+
+
+def build(source=HEROES_JSON, out_dir=OUT_DIR, force=False):
+    """Rebuild the chunks if needed; return the names of the files written (``None`` if up to date)."""
+    data = source.read_bytes()
+    source_sha = sha256_bytes(data)
+    if not force and is_current(source_sha, out_dir):
+        return None
+    store = HeroStore.load(source)
+    if store.duplicates:
+        hero_id, index = store.duplicates[0]
+        raise ValueError(f'duplicate hero id {hero_id!r} at record #{index}; run tools.heroes_store check')
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    files = render(store.records, source_sha)
+    written = [name for name, payload in files.items() if write_if_changed(out_dir / name, payload)]
+    # Chunks of generations that no longer exist.
+    for stale in out_dir.glob('gen-*.json'):
+        if stale.name not in files:
+            stale.unlink()
+            written.append(stale.name)
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--check', action='store_true', help='only report whether the chunks are up to date')
+    parser.add_argument('--force', action='store_true', help='rebuild even if heroes.json did not change')
+    args = parser.parse_args(argv)
+
+    if args.check:
+        if is_current(sha256_bytes(HEROES_JSON.read_bytes())):
+            print(f'{rel(OUT_DIR)} is up to date')
+            return 0
+        print(f'{rel(OUT_DIR)} is stale; run python -m tools.heroes_chunks')
+        return 1
+
+    try:
+        written = build(force=args.force)
+    except ValueError as exc:
+        print(f'error: {exc}', file=sys.stderr)
+        return 1
+    if written is None:
+        print(f'{rel(OUT_DIR)} is up to date')
+    else:
+        print(f'{rel(OUT_DIR)}: {len(written)} file(s) written' + (f" ({', '.join(written)})" if written else ''))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,444 @@
+"""Indexed, incremental editing of ``data/heroes.json``.
+
+Replaces the one-off rewrite scripts (``fix_heroes_json.js``,
+``remove_duplicate_heroes.js``, ``sync_heroes_ko.js`` ...) with one engine:
+
+* records are indexed by ``id`` with secondary indexes on ``gen`` and ``type``,
+  so lookups and duplicate checks are O(1) per record;
+* batches of upserts (e.g. ``tools.wiki_extract`` output) and dotted-path field
+  patches are applied in memory; an upsert for an unknown id is reported, not
+  inserted, unless inserts are allowed (``--allow-insert``), and then only
+  complete records (:data:`REQUIRED_FIELDS`) are accepted;
+* text that was damaged on the way in (U+FFFD replacement characters) never
+  overwrites an existing non-empty value;
+* a non-empty name, description or skill text is not overwritten by text in
+  another language (``Hector`` over ``헥터``) or by another hero's name or
+  skills (a wiki page saved under the wrong file name) unless ``--force``;
+* on save, records that did not change are written back from their original
+  bytes, and changed records are serialised exactly like
+  ``JSON.stringify(heroes, null, 4)``, so diffs only touch edited heroes.
+
+Usage::
+
+    python -m tools.heroes_store check
+    python -m tools.heroes_store query --gen S6 --type 보병
+    python -m tools.heroes_store apply /tmp/wiki.json --only skills,type --dry-run
+    python -m tools.heroes_store apply /tmp/new_heroes.json --allow-insert
+    python -m tools.heroes_store apply /tmp/wiki.json --force     # skip the language/other-hero guard
+"""
+
+import argparse
+import json
+import sys
+from collections import Counter, defaultdict
+
+from tools.common import (HEROES_JSON, UTF8, atomic_write_bytes, decode_bytes, encode_text, read_text, rel,
+                          text_language)
+
+INDENT = 4
+
+# Key order used for fields that a record does not have yet.
+FIELD_ORDER = ('id', 'name', 'type', 'gen', 'rarity', 'image', 'displayInfo', 'description', 'skills', 'equipment')
+# Fields every hero has; a record missing one of them is never inserted.
+REQUIRED_FIELDS = FIELD_ORDER[:6]
+
+# Text fields guarded against other-language and other-hero values (see HeroStore.upsert).
+GUARDED_FIELDS = ('name', 'description', 'skills', 'equipment')
+# Keys of the skill objects inside ``skills``/``equipment`` that hold text.
+TEXT_KEYS = frozenset({'name', 'desc'})
+
+# Bookkeeping keys added by the extractor that never belong in heroes.json.
+META_KEYS = frozenset({'source', 'lang'})
+
+
+class HeroStoreError(ValueError):
+    pass
+
+
+def _record_spans(text):
+    """Yield ``(record, start, end)`` for every element of the top-level array."""
+    decoder = json.JSONDecoder()
+    pos = text.index('[') + 1
+    length = len(text)
+    while True:
+        while pos < length and text[pos] in ' \t\r\n,':
+            pos += 1
+        if pos >= length:
+            raise HeroStoreError('unterminated heroes array')
+        if text[pos] == ']':
+            return
+        record, end = decoder.raw_decode(text, pos)
+        yield record, pos, end
+        pos = end
+
+
+def dump_record(record):
+    """Serialise one record as it appears inside the 4-space indented array."""
+    return json.dumps(record, indent=INDENT, ensure_ascii=False).replace('\n', '\n' + ' ' * INDENT)
+
+
+def _ordered(record):
+    known = [k for k in FIELD_ORDER if k in record]
+    return {k: record[k] for k in known + [k for k in record if k not in FIELD_ORDER]}
+
+
+def is_damaged(value):
+    """True if ``value`` (or any string inside it) holds a U+FFFD replacement character."""
+    if isinstance(value, str):
+        return '\ufffd' in value
+    if isinstance(value, dict):
+        return any(is_damaged(v) for v in value.values())
+    if isinstance(value, list):
+        return any(is_damaged(v) for v in value)
+    return False
+
+
+def _texts(value, key=None):
+    """Yield the strings in ``value`` that hold display text (every string for a plain ``str``)."""
+    if isinstance(value, str):
+        if key is None or key in TEXT_KEYS:
+            yield value
+    elif isinstance(value, dict):
+        for k, v in value.items():
+            yield from _texts(v, k if isinstance(v, str) else None)
+    elif isinstance(value, list):
+        for v in value:
+            yield from _texts(v)
+
+
+def _skill_names(record):
+    names = set()
+    for field in ('skills', 'equipment'):
+        names.update(_skill_names_in(record.get(field)))
+    return names
+
+
+def _skill_names_in(value):
+    if isinstance(value, dict):
+        if isinstance(value.get('name'), str) and 'desc' in value:
+            yield value['name']
+        for v in value.values():
+            yield from _skill_names_in(v)
+    elif isinstance(value, list):
+        for v in value:
+            yield from _skill_names_in(v)
+
+
+def merge(base, update):
+    """Deep-merge ``update`` into a copy of ``base``; lists and scalars are replaced.
+
+    A damaged value (:func:`is_damaged`) never replaces a non-empty one.
+    """
+    merged = dict(base)
+    for key, value in update.items():
+        if value is None:
+            continue
+        current = merged.get(key)
+        if isinstance(value, dict) and isinstance(current, dict):
+            merged[key] = merge(current, value)
+        elif not (is_damaged(value) and current not in (None, '', [], {})):
+            merged[key] = value
+    return merged
+
+
+def set_path(record, path, value):
+    """Return a copy of ``record`` with the dotted ``path`` (``equipment.icon``) set."""
+    head, _, rest = path.partition('.')
+    updated = dict(record)
+    if rest:
+        child = updated.get(head)
+        if child is None:
+            child = {}
+        elif not isinstance(child, dict):
+            raise HeroStoreError(f'cannot patch {path!r}: {head!r} is not an object')
+        updated[head] = set_path(child, rest, value)
+    elif value is None:
+        updated.pop(head, None)
+    else:
+        updated[head] = value
+    return updated
+
+
+class HeroStore:
+    """In-memory view of heroes.json that remembers each record's original bytes."""
+
+    def __init__(self, path=HEROES_JSON):
+        self.path = path
+        self.records = []
+        self.raw = []
+        self.by_id = {}
+        self.by_gen = defaultdict(set)
+        self.by_type = defaultdict(set)
+        self.duplicates = []
+        self.problems = []
+        self.encoding = UTF8
+        self._owners = None    # (name -> hero ids, skill name -> hero ids), built on demand
+        self._original = b''
+
+    @classmethod
+    def load(cls, path=HEROES_JSON):
+        store = cls(path)
+        with open(path, 'rb') as f:
+            store._original = f.read()
+        text, store.encoding = decode_bytes(store._original)
+        for record, start, end in _record_spans(text):
+            store._append(record, text[start:end])
+        return store
+
+    # -- indexes ---------------------------------------------------------------
+
+    def _append(self, record, raw=None):
+        hero_id = record.get('id')
+        if not hero_id:
+            raise HeroStoreError(f'record #{len(self.records)} has no id')
+        if hero_id in self.by_id:
+            self.duplicates.append((hero_id, len(self.records)))
+        else:
+            self.by_id[hero_id] = len(self.records)
+            self._index(record)
+        self.records.append(record)
+        self.raw.append(raw)
+
+    def _index(self, record):
+        self._owners = None
+        self.by_gen[record.get('gen')].add(record['id'])
+        self.by_type[record.get('type')].add(record['id'])
+
+    def _unindex(self, record):
+        self._owners = None
+        self.by_gen[record.get('gen')].discard(record['id'])
+        self.by_type[record.get('type')].discard(record['id'])
+
+    def get(self, hero_id):
+        index = self.by_id.get(hero_id)
+        return None if index is None else self.records[index]
+
+    def query(self, gen=None, type=None):
+        ids = None
+        for value, index in ((gen, self.by_gen), (type, self.by_type)):
+            if value is not None:
+                ids = set(index.get(value, ())) if ids is None else ids & index.get(value, set())
+        if ids is None:
+            ids = set(self.by_id)
+        return [self.records[i] for i in sorted(self.by_id[h] for h in ids)]
+
+    # -- edits -----------------------------------------------------------------
+
+    def _replace(self, index, record):
+        old = self.records[index]
+        if record == old:
+            return 'unchanged'
+        self._unindex(old)
+        self.records[index] = record
+        self.raw[index] = None
+        self._index(record)
+        return 'updated'
+
+    def _owners_of(self):
+        if self._owners is None:
+            names, skills = defaultdict(set), defaultdict(set)
+            for record in self.records:
+                if record.get('name'):
+                    names[record['name']].add(record['id'])
+                for skill in _skill_names(record):
+                    skills[skill].add(record['id'])
+            self._owners = names, skills
+        return self._owners
+
+    def _guard(self, current, record):
+        """Return ``({field: reason}, other)`` for the fields of ``record`` that must not overwrite ``current``.
+
+        ``other`` is the id of the hero the update's name or skills belong to
+        instead, if any; such an update is refused as a whole.
+        """
+        hero_id = current['id']
+        names, skills = self._owners_of()
+        refused, other = {}, None
+        for field in GUARDED_FIELDS:
+            if field not in record or record[field] in (None, '', [], {}):
+                continue
+            old = ' '.join(_texts(current.get(field)))
+            new = ' '.join(_texts(record[field]))
+            if not old.strip() or old == new:
+                continue
+            old_lang, new_lang = text_language(old), text_language(new)
+            if old_lang and new_lang and old_lang != new_lang:
+                refused[field] = f'{new_lang} text over {old_lang} text'
+            elif field == 'name' and names.get(record['name'], {hero_id}) - {hero_id}:
+                other = sorted(names[record['name']] - {hero_id})[0]
+                refused[field] = f"{record['name']!r} is the name of {other!r}"
+            elif field in ('skills', 'equipment'):
+                mine = _skill_names(current)
+                others = sorted({owner for skill in _skill_names({field: record[field]}) - mine
+                                 for owner in skills.get(skill, ()) if owner != hero_id})
+                if others:
+                    other = other or others[0]
+                    refused[field] = f'skills of {others[0]!r}'
+        return refused, other
+
+    def upsert(self, record, only=None, allow_insert=False, force=False):
+        """Deep-merge ``record`` into the existing hero with the same id.
+
+        Unless ``force``, the :data:`GUARDED_FIELDS` of an existing hero keep
+        their non-empty value when the update is in another language, and an
+        update carrying another hero's name or skills is not applied at all.
+        Each refusal is added to :attr:`problems`, and ``'refused'`` is
+        returned if nothing changed.
+
+        An unknown id is inserted only with ``allow_insert`` and only if the
+        record has every :data:`REQUIRED_FIELDS` field and no damaged text;
+        otherwise the outcome is ``'unknown id'`` or ``'rejected'`` and the
+        reason is added to :attr:`problems`.
+        """
+        record = {k: v for k, v in record.items() if k not in META_KEYS}
+        hero_id = record.get('id')
+        if not hero_id:
+            raise HeroStoreError(f'upsert without id: {record!r:.80}')
+        index = self.by_id.get(hero_id)
+        if only is not None:
+            record = {k: v for k, v in record.items() if k == 'id' or k in only}
+        if index is not None:
+            refused, other = ({}, None) if force else self._guard(self.records[index], record)
+            if other is not None:
+                reasons = '; '.join(refused.values())
+                self.problems.append(f'{hero_id!r}: update belongs to {other!r} ({reasons}); not applied, '
+                                     'use --force to overwrite')
+                return 'refused'
+            for field, reason in refused.items():
+                self.problems.append(f'{hero_id!r}: kept {field} ({reason}); use --force to overwrite')
+                del record[field]
+            outcome = self._replace(index, merge(self.records[index], record))
+            return 'refused' if refused and outcome == 'unchanged' else outcome
+        if not allow_insert:
+            self.problems.append(f'unknown id {hero_id!r}; not inserted (use --allow-insert for new heroes)')
+            return 'unknown id'
+        missing = [k for k in REQUIRED_FIELDS if record.get(k) in (None, '')]
+        if missing or is_damaged(record):
+            reason = f"missing {', '.join(missing)}" if missing else 'damaged text (U+FFFD)'
+            self.problems.append(f'new hero {hero_id!r} rejected: {reason}')
+            return 'rejected'
+        self._append(_ordered(record))
+        return 'inserted'
+
+    def patch(self, hero_id, fields):
+        """Apply ``{'dotted.path': value}`` field patches; ``None`` deletes the field."""
+        index = self.by_id.get(hero_id)
+        if index is None:
+            return 'missing'
+        record = self.records[index]
+        for path, value in fields.items():
+            record = set_path(record, path, value)
+        if record.get('id') != hero_id:
+            raise HeroStoreError(f'patch may not change the id of {hero_id!r}')
+        return self._replace(index, record)
+
+    def apply_batch(self, batch, only=None, allow_insert=False, force=False):
+        """Apply a batch and return a Counter of outcomes.
+
+        ``batch`` is a list of records, extractor output (``{'heroes': [...]}``)
+        or ``{'upserts': [...], 'patches': [{'id': ..., 'set': {...}}]}``.
+        """
+        if isinstance(batch, list):
+            batch = {'upserts': batch}
+        upserts = batch.get('upserts', batch.get('heroes', []))
+        stats = Counter()
+        seen = set()
+        for record in upserts:
+            if record.get('id') in seen:
+                stats['repeated in batch'] += 1
+            seen.add(record.get('id'))
+            stats[self.upsert(record, only=only, allow_insert=allow_insert, force=force)] += 1
+        for item in batch.get('patches', []):
+            stats[self.patch(item['id'], item['set'])] += 1
+        return stats
+
+    def drop_duplicates(self):
+        """Remove every record whose id already appeared earlier (first one wins)."""
+        if not self.duplicates:
+            return 0
+        dropped = {index for _, index in self.duplicates}
+        kept = [(r, raw) for i, (r, raw) in enumerate(zip(self.records, self.raw)) if i not in dropped]
+        self.records = [r for r, _ in kept]
+        self.raw = [raw for _, raw in kept]
+        self.by_id = {r['id']: i for i, r in enumerate(self.records)}
+        self.duplicates = []
+        return len(dropped)
+
+    # -- output ----------------------------------------------------------------
+
+    def dumps(self):
+        pad = ' ' * INDENT
+        body = (',\n' + pad).join(raw if raw is not None else dump_record(record)
+                                  for record, raw in zip(self.records, self.raw))
+        return '[\n' + pad + body + '\n]' if self.records else '[]'
+
+    def save(self):
+        """Write the file if its bytes changed; return ``True`` when written."""
+        data = encode_text(self.dumps(), self.encoding)
+        if data == self._original:
+            return False
+        atomic_write_bytes(self.path, data)
+        self._original = data
+        return True
+
+
+def _load_batch(path):
+    return json.loads(read_text(path))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--file', default=str(HEROES_JSON), help='heroes.json to operate on')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    sub.add_parser('check', help='report duplicate ids')
+
+    query = sub.add_parser('query', help='list heroes by generation and/or troop type')
+    query.add_argument('--gen')
+    query.add_argument('--type')
+
+    apply = sub.add_parser('apply', help='apply a batch of upserts/patches')
+    apply.add_argument('batch', nargs='+', help='batch JSON files, applied in order')
+    apply.add_argument('--only', help='comma-separated top-level fields upserts may change')
+    apply.add_argument('--allow-insert', action='store_true', help='insert complete records with unknown ids')
+    apply.add_argument('--force', action='store_true',
+                       help='let upserts overwrite names and skill text in another language or of another hero')
+    apply.add_argument('--dedupe', action='store_true', help='drop duplicate ids (first wins)')
+    apply.add_argument('--dry-run', action='store_true')
+
+    args = parser.parse_args(argv)
+    store = HeroStore.load(args.file)
+
+    if args.command == 'check':
+        for hero_id, index in store.duplicates:
+            print(f'duplicate id {hero_id!r} at record #{index} (first at #{store.by_id[hero_id]})')
+        print(f'{len(store.records)} heroes, {len(store.duplicates)} duplicates')
+        return 1 if store.duplicates else 0
+
+    if args.command == 'query':
+        for hero in store.query(gen=args.gen, type=args.type):
+            print(f"{hero['id']:<12} {hero.get('gen', ''):<4} {hero.get('type', ''):<3} {hero.get('name', '')}")
+        return 0
+
+    only = set(args.only.split(',')) if args.only else None
+    stats = Counter()
+    for path in args.batch:
+        stats.update(store.apply_batch(_load_batch(path), only=only, allow_insert=args.allow_insert,
+                                       force=args.force))
+    if args.dedupe:
+        stats['duplicates dropped'] = store.drop_duplicates()
+    for problem in store.problems:
+        print(problem, file=sys.stderr)
+    print(', '.join(f'{key}: {count}' for key, count in sorted(stats.items())) or 'empty batch')
+    if args.dry_run:
+        changed = sum(raw is None for raw in store.raw)
+        print(f'dry run: {changed} record(s) would be rewritten')
+    elif store.save():
+        print(f'{rel(store.path)} updated')
+    else:
+        print(f'{rel(store.path)} unchanged')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
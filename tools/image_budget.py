@@ -0,0 +1,154 @@
+"""Offline size-budget optimizer for the images the app actually ships.
+
+Uses the asset-reference index from :mod:`tools.asset_refs`, so only images
+that something references are touched. Each one is re-encoded in its real
+(header) format with metadata stripped and its longest side capped to the
+largest size the UI draws it at -- :data:`tools.asset_refs.MAX_SIDE`, the
+same table ``tools.asset_refs`` reports oversized images against. Results are cached by content hash, so
+re-running on unchanged images is free.
+
+Requires Pillow (``pip install Pillow``); it is only needed for this tool.
+
+Usage::
+
+    python -m tools.image_budget                 # optimise into .tools-cache/optimized/
+    python -m tools.image_budget --write         # replace the files under assets/
+"""
+
+import argparse
+import io
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from tools import asset_refs
+from tools.common import (CACHE_DIR, REPO_ROOT, atomic_write_bytes, load_cache, save_cache, sha256_bytes,
+                          write_if_changed)
+
+CACHE_NAME = 'image_budget.json'
+BLOB_DIR = CACHE_DIR / 'images'
+OUT_DIR = CACHE_DIR / 'optimized'
+# Bump when the encoder settings change so cached outputs are rebuilt.
+ENCODER_VERSION = 1
+
+JPEG_QUALITY = 85
+
+
+def _require_pillow():
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        sys.exit('tools.image_budget needs Pillow: pip install Pillow')
+
+
+def encode(data, fmt, max_side):
+    """Re-encode image bytes without metadata, capped to ``max_side``; return new bytes."""
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as image:
+        image.load()
+        if max_side and max(image.size) > max_side:
+            image.thumbnail((max_side, max_side), Image.LANCZOS)
+        out = io.BytesIO()
+        if fmt == 'jpeg':
+            if image.mode not in ('RGB', 'L'):
+                image = image.convert('RGB')
+            image.save(out, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+        else:
+            # Saving without pnginfo/exif drops text chunks and EXIF.
+            image.save(out, 'PNG', optimize=True)
+        return out.getvalue()
+
+
+def _encode_job(job):
+    path, fmt, max_side, key = job
+    data = (REPO_ROOT / path).read_bytes()
+    encoded = encode(data, fmt, max_side)
+    # Never ship a "smaller" budget file that is actually bigger.
+    if len(encoded) >= len(data):
+        encoded = data
+    return path, key, encoded
+
+
+def optimise(write=False, jobs=None):
+    """Optimise every referenced PNG/JPEG and return ``[(path, before, after, cached)]``."""
+    _require_pillow()
+    report = asset_refs.verify()
+    assets = report['assets']
+    cache = load_cache(CACHE_NAME)
+    if cache.get('version') != ENCODER_VERSION:
+        cache = {'version': ENCODER_VERSION, 'outputs': {}}
+    outputs = cache['outputs']
+
+    keys, plan = {}, []
+    for path in sorted(report['references']):
+        info = assets.get(path)
+        if info is None or info.format not in ('png', 'jpeg'):
+            continue
+        max_side = asset_refs.side_budget(path)
+        keys[path] = key = f'{sha256_bytes((REPO_ROOT / path).read_bytes())}:{info.format}:{max_side}'
+        blob = outputs.get(key)
+        if not blob or not (BLOB_DIR / blob).exists():
+            plan.append((path, info.format, max_side, key))
+
+    fresh = set()
+    if plan:
+        with ProcessPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as pool:
+            for path, key, encoded in pool.map(_encode_job, plan, chunksize=8):
+                blob = sha256_bytes(encoded)
+                if not (BLOB_DIR / blob).exists():
+                    atomic_write_bytes(BLOB_DIR / blob, encoded)
+                outputs[key] = blob
+                fresh.add(path)
+
+    results = []
+    for path, key in list(keys.items()):
+        blob = outputs[key]
+        encoded = (BLOB_DIR / blob).read_bytes()
+        before = assets[path].bytes
+        if write:
+            if len(encoded) < before:
+                atomic_write_bytes(REPO_ROOT / path, encoded)
+                # The rewritten file is its own optimised output; without this
+                # entry the next run would re-encode (and re-degrade) JPEGs.
+                keys[path] = key = blob + key[key.index(':'):]
+                outputs[key] = blob
+        else:
+            write_if_changed(OUT_DIR / path, encoded)
+        results.append((path, before, len(encoded), path not in fresh))
+
+    # Drop cache entries for images that are no longer referenced or have changed.
+    live = set(keys.values())
+    for key in [k for k in outputs if k not in live]:
+        del outputs[key]
+    live_blobs = set(outputs.values())
+    if BLOB_DIR.exists():
+        for blob in BLOB_DIR.iterdir():
+            if blob.name not in live_blobs:
+                blob.unlink()
+    save_cache(CACHE_NAME, cache)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--write', action='store_true', help='replace the referenced files in place')
+    parser.add_argument('--jobs', type=int, help='encoder processes (default: CPU count)')
+    args = parser.parse_args(argv)
+
+    results = optimise(write=args.write, jobs=args.jobs)
+    total_before = total_after = 0
+    for path, before, after, cached in results:
+        total_before += before
+        total_after += after
+        if after < before:
+            print(f'{path}: {before / 1024:.0f} KB -> {after / 1024:.0f} KB '
+                  f'(-{(before - after) / 1024:.0f} KB){" [cached]" if cached else ""}')
+    saved = total_before - total_after
+    print(f'{len(results)} images, {total_before / 1024:.0f} KB -> {total_after / 1024:.0f} KB, '
+          f'saved {saved / 1024:.0f} KB' + ('' if args.write else f' (written to {OUT_DIR.relative_to(REPO_ROOT)})'))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
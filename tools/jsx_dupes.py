@@ -0,0 +1,205 @@
+"""Near-duplicate JSX block detector.
+
+Finds JSX subtrees that were copied between screens and modals (the
+fortress/citadel slot editor in ``events.tsx``, ``ScheduleModal.tsx`` and
+``GrowthEventCard.tsx`` ...) without comparing files pairwise:
+
+* every file is tokenized once with :mod:`tools.tsx_tokens` and its element
+  tree is taken from :mod:`tools.tsx_check`;
+* identifiers and literals are normalised (tag and prop names are kept), so
+  renamed variables and changed strings still match;
+* k-token Rabin-Karp hashes are winnowed into a small fingerprint set per
+  element, and an inverted index from fingerprint to elements yields the
+  candidate pairs, so the work is close to linear in the size of the tree.
+
+Only the largest duplicated subtree of a pair is reported; its children, which
+trivially match as well, are suppressed.
+
+Usage::
+
+    python -m tools.jsx_dupes
+    python -m tools.jsx_dupes app/growth components/modals --similarity 0.5
+"""
+
+import argparse
+import os
+import sys
+import zlib
+from bisect import bisect_left
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+from tools.tsx_check import check_file, source_files
+
+DEFAULT_PATHS = ('app', 'components')
+
+# Length of the hashed token k-grams and of the winnowing window: any match of
+# at least K + W - 1 tokens is guaranteed to share a fingerprint.
+K = 12
+W = 8
+MIN_TOKENS = 80
+SIMILARITY = 0.7
+# Fingerprints found in more elements than this are boilerplate
+# (``<View style={...}>`` ...) and carry no signal.
+MAX_POSTINGS = 64
+
+_BASE = 1_000_003
+_MOD = (1 << 61) - 1
+
+# Identifiers kept verbatim when normalising: they shape the code, not name it.
+KEYWORDS = frozenset({
+    'return', 'if', 'else', 'const', 'let', 'var', 'function', 'new', 'typeof', 'await', 'async',
+    'true', 'false', 'null', 'undefined', 'this', 'map', 'filter', 'length',
+})
+_LITERAL_KINDS = {'str': 'S', 'num': 'N', 'tmpl': 'T', 'regex': 'R', 'jsx_text': 'X'}
+
+
+class Block(NamedTuple):
+    path: str
+    name: str
+    line: int
+    end_line: int
+    tokens: int
+    bytes: int
+    parent: int          # index of the enclosing block in the same file, -1 at the top
+    fingerprints: frozenset
+
+
+def normalise(token):
+    if token.kind == 'ident':
+        return token.value if token.value in KEYWORDS else 'I'
+    return _LITERAL_KINDS.get(token.kind, token.value)
+
+
+def fingerprints(values, k=K, w=W):
+    """Winnow the rolling k-gram hashes of ``values``; return ``[(position, hash)]``."""
+    ids = [zlib.crc32(v.encode('utf-8')) for v in values]
+    if len(ids) < k:
+        return []
+    top = pow(_BASE, k - 1, _MOD)
+    h = 0
+    for value in ids[:k]:
+        h = (h * _BASE + value) % _MOD
+    hashes = [h]
+    for i in range(k, len(ids)):
+        h = ((h - ids[i - k] * top) * _BASE + ids[i]) % _MOD
+        hashes.append(h)
+
+    selected = []
+    window = deque()  # positions with increasing hashes; the front is the window minimum
+    for i, h in enumerate(hashes):
+        while window and hashes[window[-1]] >= h:
+            window.pop()
+        window.append(i)
+        if window[0] <= i - w:
+            window.popleft()
+        if i >= w - 1 and (not selected or selected[-1][0] != window[0]):
+            selected.append((window[0], hashes[window[0]]))
+    return selected
+
+
+def file_blocks(path, min_tokens=MIN_TOKENS):
+    """Return the :class:`Block` list of every closed JSX element of ``min_tokens`` or more."""
+    result = check_file(path)
+    tokens = result.tokens
+    start_index = {t.start: i for i, t in enumerate(tokens)}
+    end_index = {t.end: i for i, t in enumerate(tokens)}
+    prints = fingerprints([normalise(t) for t in tokens])
+    positions = [p for p, _ in prints]
+
+    blocks, index_of = [], {}
+    for element in result.elements:   # parents come before their children
+        if element.end is None:
+            continue
+        first, last = start_index[element.start], end_index[element.end] + 1
+        if last - first < min_tokens:
+            continue
+        lo, hi = bisect_left(positions, first), bisect_left(positions, last - K + 1)
+        parent = element.parent
+        while parent is not None and id(parent) not in index_of:
+            parent = parent.parent
+        index_of[id(element)] = len(blocks)
+        blocks.append(Block(result.path, element.name, element.line, element.end_line, last - first,
+                            element.end - element.start, index_of[id(parent)] if parent is not None else -1,
+                            frozenset(h for _, h in prints[lo:hi])))
+    return blocks
+
+
+def _blocks_job(args):
+    return file_blocks(*args)
+
+
+def find_duplicates(paths, min_tokens=MIN_TOKENS, similarity=SIMILARITY, jobs=None):
+    """Return ``(blocks, pairs)``; ``pairs`` is ``[(similarity, a, b)]`` largest first."""
+    work = [(p, min_tokens) for p in paths]
+    if len(work) < 2 or jobs == 1:
+        per_file = [_blocks_job(w) for w in work]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as pool:
+            per_file = list(pool.map(_blocks_job, work, chunksize=4))
+
+    blocks, parents = [], []
+    for file_list in per_file:
+        offset = len(blocks)
+        blocks.extend(file_list)
+        parents.extend(b.parent + offset if b.parent >= 0 else -1 for b in file_list)
+
+    postings = {}
+    for index, block in enumerate(blocks):
+        for h in block.fingerprints:
+            postings.setdefault(h, []).append(index)
+
+    shared = Counter()
+    for ids in postings.values():
+        if len(ids) < 2 or len(ids) > MAX_POSTINGS:
+            continue
+        for i, a in enumerate(ids):
+            for b in ids[i + 1:]:
+                shared[a, b] += 1
+
+    def ancestors(index):
+        while index >= 0:
+            yield index
+            index = parents[index]
+
+    candidates = []
+    for (a, b), count in shared.items():
+        score = count / max(len(blocks[a].fingerprints), len(blocks[b].fingerprints))
+        if score >= similarity and a not in ancestors(parents[b]) and b not in ancestors(parents[a]):
+            candidates.append((score, a, b))
+    candidates.sort(key=lambda c: (-min(blocks[c[1]].tokens, blocks[c[2]].tokens), c[1], c[2]))
+
+    reported, pairs = set(), []
+    for score, a, b in candidates:
+        # Inside an already reported pair of subtrees: the children match by construction.
+        if any((x, y) in reported or (y, x) in reported for x in ancestors(a) for y in ancestors(b)):
+            continue
+        reported.add((a, b))
+        pairs.append((score, blocks[a], blocks[b]))
+    return blocks, pairs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('paths', nargs='*', help='files or directories (default: app/ components/)')
+    parser.add_argument('--min-tokens', type=int, default=MIN_TOKENS, help='smallest subtree considered')
+    parser.add_argument('--similarity', type=float, default=SIMILARITY,
+                        help='share of fingerprints two subtrees must have in common (0-1)')
+    parser.add_argument('--jobs', type=int)
+    args = parser.parse_args(argv)
+
+    paths = [p for p in source_files(args.paths or DEFAULT_PATHS) if p.suffix == '.tsx']
+    blocks, pairs = find_duplicates(paths, args.min_tokens, args.similarity, args.jobs)
+    duplicated = 0
+    for score, a, b in pairs:
+        duplicated += min(a.bytes, b.bytes)
+        print(f'{score:4.0%} {min(a.tokens, b.tokens):5d} tokens  '
+              f'{a.path}:{a.line}-{a.end_line} <{a.name}>  ~  {b.path}:{b.line}-{b.end_line} <{b.name}>')
+    print(f'{len(paths)} files, {len(blocks)} subtrees >= {args.min_tokens} tokens, '
+          f'{len(pairs)} duplicate pairs (~{duplicated / 1024:.0f} KB duplicated)', file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
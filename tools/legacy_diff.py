@@ -0,0 +1,275 @@
+"""Differential and throughput harness: legacy balance scripts vs :mod:`tools.tsx_check`.
+
+Runs ``check_syntax.py``, ``check_tags.py``, ``find_unclosed.py`` and
+``smart_balance.py`` from ``.old_backup/root_scripts`` unchanged except for
+their hard-coded Windows path, which is pointed at the file under test, and
+the new checker on the same file:
+
+* on every real TSX file, and on seeded random mutants of each one with a
+  bracket or JSX tag deleted or inserted;
+* each script is compared with the checker's diagnostics restricted to what
+  the script looks at (``( ) { }``, the six counted tags, or ``( )`` only):
+  a *balance* disagreement is one side calling the file balanced and the other
+  not; a *culprit* disagreement is both reporting a problem on different
+  lines (only ``find_unclosed``/``smart_balance`` name a line);
+* for mutants the mutated line (and the line of the bracket or tag it pairs
+  with) is the ground truth, so each disagreement shows which side was right;
+* wall time per file and per size bucket gives the speedup of the checker over
+  running the four scripts.
+
+Usage::
+
+    python -m tools.legacy_diff
+    python -m tools.legacy_diff app/growth/events.tsx --mutants 50 --seed 7
+    python -m tools.legacy_diff --mutants 0 --repeat 5     # timing only
+"""
+
+import argparse
+import contextlib
+import io
+import random
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from tools.common import REPO_ROOT, read_text, rel
+from tools.tsx_check import BRACKETS, CLOSERS, check_file, source_files
+from tools.tsx_tokens import LineIndex
+
+LEGACY_DIR = REPO_ROOT / '.old_backup' / 'root_scripts'
+DEFAULT_PATHS = ('app', 'components')
+
+# What each script checks: bracket characters, or JSX tag names.
+LEGACY_SCRIPTS = {
+    'check_syntax.py': frozenset('(){}'),
+    'check_tags.py': frozenset({'View', 'Pressable', 'TouchableOpacity', 'Modal', 'Text', 'ScrollView'}),
+    'find_unclosed.py': frozenset('()'),
+    'smart_balance.py': frozenset('()'),
+}
+# The scripts that name a culprit line rather than only counting.
+LOCATING_SCRIPTS = frozenset({'find_unclosed.py', 'smart_balance.py'})
+MUTATIONS = ('delete-bracket', 'insert-bracket', 'delete-tag', 'insert-tag')
+SIZE_BUCKETS = ((10_000, '< 10 KB'), (50_000, '10-50 KB'), (200_000, '50-200 KB'), (None, '>= 200 KB'))
+
+_PATH_RE = re.compile(r"^(\w*path) = r'[^']*'$", re.M)
+_DIFF_RE = re.compile(r'\(Diff: (-?\d+)\)')
+_EXTRA_RE = re.compile(r'Extra closing paren at line (\d+)')
+_OPEN_RE = re.compile(r'(?:Unclosed opening parens|Opening parens) from lines: \[([\d, ]*)\]')
+_TAG_RE = re.compile(r'</?([\w.]+)')
+
+
+class Verdict(NamedTuple):
+    balanced: bool
+    culprit: Optional[int] = None     # line the script blames, if it names one
+
+
+class Mutant(NamedTuple):
+    kind: str
+    line: int
+    target: str                       # the bracket or tag name that was deleted or inserted
+    truth: frozenset                  # lines a correct report may point at
+    text: str
+
+
+def load_legacy(name):
+    """Compile a legacy script with its hard-coded path replaced by the ``__target__`` global."""
+    source = read_text(LEGACY_DIR / name)
+    if not _PATH_RE.search(source):
+        raise ValueError(f'{name}: no hard-coded file path to redirect')
+    return compile(_PATH_RE.sub(r'\1 = __target__', source, count=1), str(LEGACY_DIR / name), 'exec')
+
+
+def run_legacy(code, path):
+    """Run a compiled legacy script on ``path``; return ``(stdout, seconds)``."""
+    out = io.StringIO()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(out):
+        exec(code, {'__name__': '__legacy__', '__target__': str(path)})
+    return out.getvalue(), time.perf_counter() - started
+
+
+def legacy_verdict(name, output):
+    if name not in LOCATING_SCRIPTS:
+        return Verdict(all(int(d) == 0 for d in _DIFF_RE.findall(output)))
+    extra = [int(n) for n in _EXTRA_RE.findall(output)]
+    match = _OPEN_RE.search(output)
+    unclosed = [int(n) for n in match.group(1).split(',') if n.strip()] if match else []
+    # Same convention as CheckResult.root_cause: the innermost opener or the first stray closer.
+    candidates = ([max(unclosed)] if unclosed else []) + ([min(extra)] if extra else [])
+    return Verdict(not candidates, min(candidates) if candidates else None)
+
+
+def engine_verdict(result):
+    cause = result.root_cause
+    return Verdict(cause is None, cause.line if cause else None)
+
+
+def mutate(result, rng):
+    """Return a :class:`Mutant` of the checked file ``result``, or ``None`` if it has nothing to mutate."""
+    text, tokens = result.text, result.tokens
+    lines = LineIndex(text)
+    kind = rng.choice(MUTATIONS)
+    if kind == 'delete-bracket':
+        partner, stack = {}, []
+        for i, t in enumerate(tokens):
+            if t.kind == 'punct' and t.value in BRACKETS:
+                stack.append(i)
+            elif t.kind == 'punct' and t.value in CLOSERS and stack:
+                j = stack.pop()
+                partner[i], partner[j] = j, i
+        if not partner:
+            return None
+        i = rng.choice(sorted(partner))
+        t, other = tokens[i], tokens[partner[i]]
+        line = lines.line(t.start)
+        return Mutant(kind, line, t.value, frozenset({line, lines.line(other.start)}),
+                      text[:t.start] + text[t.end:])
+    if kind == 'insert-bracket':
+        spots = [t for t in tokens if t.kind == 'punct' and t.value in (';', ',')]
+        if not spots:
+            return None
+        t, bracket = rng.choice(spots), rng.choice('(){}[]')
+        line = lines.line(t.start)
+        return Mutant(kind, line, bracket, frozenset({line}), text[:t.end] + bracket + text[t.end:])
+    closed = [e for e in result.elements if e.end is not None and e.name
+              and text.rfind('</', e.start, e.end) > e.start]
+    if not closed:
+        return None
+    element = rng.choice(closed)
+    if kind == 'delete-tag':
+        start = text.rfind('</', element.start, element.end)
+        line = lines.line(start)
+        return Mutant(kind, line, element.name, frozenset({line, element.line}), text[:start] + text[element.end:])
+    insert = rng.choice((f'</{element.name}>', f'<{element.name}>'))
+    line = lines.line(element.end)
+    return Mutant(kind, line, element.name, frozenset({line}), text[:element.end] + insert + text[element.end:])
+
+
+def bucket_of(size):
+    return next(label for limit, label in SIZE_BUCKETS if limit is None or size < limit)
+
+
+def compare(path, legacy, repeat):
+    """Run every script and the checker on ``path``; return ``(verdicts, result, legacy_s, engine_s)``."""
+    verdicts, legacy_s = {}, 0.0
+    for name, code in legacy.items():
+        best = None
+        for _ in range(repeat):
+            try:
+                output, seconds = run_legacy(code, path)
+            except Exception as exc:       # the scripts are not ours to fix; record the crash
+                output, seconds = f'crash: {type(exc).__name__}: {exc}', 0.0
+            best = seconds if best is None else min(best, seconds)
+        verdicts[name] = (legacy_verdict(name, output), output)
+        legacy_s += best
+    engine_s = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = check_file(path)
+        elapsed = time.perf_counter() - started
+        engine_s = elapsed if engine_s is None else min(engine_s, elapsed)
+    return verdicts, result, legacy_s, engine_s
+
+
+def disagreements(verdicts, result, mutant=None):
+    """Yield ``(script, kind, legacy_verdict, engine_verdict)`` for each script the checker disagrees with.
+
+    A mutant is only compared with the scripts that can see what was mutated.
+    """
+    engine = engine_verdict(result)
+    for name, (verdict, output) in verdicts.items():
+        if mutant is not None and mutant.target not in LEGACY_SCRIPTS[name]:
+            continue
+        if output.startswith('crash:'):
+            yield name, 'crash', verdict, engine
+        elif verdict.balanced != engine.balanced:
+            yield name, 'balance', verdict, engine
+        elif verdict.culprit is not None and verdict.culprit != engine.culprit:
+            yield name, 'culprit', verdict, engine
+
+
+def _describe(verdict):
+    if verdict.balanced:
+        return 'balanced'
+    return f'line {verdict.culprit}' if verdict.culprit is not None else 'unbalanced'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('paths', nargs='*', help='files or directories (default: app/ components/)')
+    parser.add_argument('--mutants', type=int, default=10, help='mutated copies per file')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=1, help='timing runs per file (the fastest counts)')
+    args = parser.parse_args(argv)
+
+    legacy = {name: load_legacy(name) for name in LEGACY_SCRIPTS}
+    paths = [p for p in source_files(args.paths or DEFAULT_PATHS) if p.suffix == '.tsx']
+    rng = random.Random(args.seed)
+    buckets = {}
+    stats = {name: dict.fromkeys(('runs', 'balance', 'culprit', 'crash', 'mutants', 'legacy detected',
+                                  'legacy located', 'engine detected', 'engine located'), 0)
+             for name in LEGACY_SCRIPTS}
+
+    def record(label, verdicts, result, mutant=None, baseline=None):
+        for name, kind, theirs, ours in disagreements(verdicts, result, mutant):
+            stats[name][kind] += 1
+            note = f"  truth: line {'/'.join(map(str, sorted(mutant.truth)))}" if mutant else ''
+            print(f'{label}: {name} {kind}: legacy {_describe(theirs)}, tsx_check {_describe(ours)}{note}')
+        ours = engine_verdict(result)
+        for name, scope in LEGACY_SCRIPTS.items():
+            stats[name]['runs'] += 1
+            if mutant is None or mutant.target not in scope:
+                continue
+            # A mutation the script can see: did each side notice it, and name the right line?
+            theirs, output = verdicts[name]
+            s = stats[name]
+            s['mutants'] += 1
+            s['legacy detected'] += output != baseline[name][1] and not theirs.balanced
+            s['legacy located'] += theirs.culprit in mutant.truth
+            s['engine detected'] += not ours.balanced
+            s['engine located'] += ours.culprit in mutant.truth
+
+    print(f"{'file':<48} {'size':>8} {'legacy':>9} {'tsx_check':>9} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for path in paths:
+            verdicts, result, legacy_s, engine_s = compare(path, legacy, args.repeat)
+            size = path.stat().st_size
+            totals = buckets.setdefault(bucket_of(size), [0, 0.0, 0.0])
+            totals[0] += 1
+            totals[1] += legacy_s
+            totals[2] += engine_s
+            print(f'{rel(path):<48} {size / 1024:7.1f}K {legacy_s * 1000:7.2f}ms {engine_s * 1000:7.2f}ms '
+                  f'{legacy_s / engine_s:7.1f}x')
+            record(rel(path), verdicts, result)
+
+            for n in range(args.mutants):
+                mutant = mutate(result, rng)
+                if mutant is None:
+                    break
+                target = Path(tmp) / path.name
+                target.write_text(mutant.text, encoding='utf-8')
+                mutated_verdicts, mutated, _, _ = compare(target, legacy, 1)
+                record(f'{rel(path)}#{n} {mutant.kind}@{mutant.line}', mutated_verdicts, mutated, mutant, verdicts)
+
+    print()
+    print(f"{'size bucket':<12} {'files':>5} {'legacy':>10} {'tsx_check':>10} {'speedup':>8}")
+    for _, label in SIZE_BUCKETS:
+        if label in buckets:
+            count, legacy_s, engine_s = buckets[label]
+            print(f'{label:<12} {count:5d} {legacy_s * 1000:8.1f}ms {engine_s * 1000:8.1f}ms '
+                  f'{legacy_s / engine_s:7.1f}x')
+    print()
+    for name, s in stats.items():
+        print(f"{name:<17} {s['runs']} runs: {s['balance']} balance / {s['culprit']} culprit disagreements, "
+              f"{s['crash']} crashes")
+        located = f"right line {s['legacy located']}" if name in LOCATING_SCRIPTS else 'names no line'
+        print(f"{'':<17} {s['mutants']} mutants it can see: detected {s['legacy detected']} ({located}), "
+              f"tsx_check detected {s['engine detected']} (right line {s['engine located']})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,434 @@
+"""Multi-file atomic patch sets with an undo journal.
+
+The old patch scripts (``final_ui_fix.py``, ``force_2column_final.py`` ...)
+wrote straight over ``events.tsx``; undoing one meant another script
+(``restore_font_fix_2column.py``) or a copy from ``.old_backup``. A patch set
+applies its edits to any number of files as one transaction:
+
+1. every new file content is computed in memory first (a failed replacement
+   aborts before anything is touched);
+2. the pre-image of every file is stored in ``.tools-cache/journal/objects``,
+   zlib-compressed and named by its SHA-256, so identical pre-images are kept
+   once no matter how many patch sets recorded them;
+3. new contents are staged to fsync'ed temp files next to their targets and
+   only then renamed into place; if a rename fails the files already replaced
+   are restored from the journal.
+
+Patch sets are idempotent: an edit whose post-image (``new``) is already in
+the file and whose pre-image (``old``) is not is reported as ``already
+applied`` instead of failing, and files whose bytes would not change are never
+rewritten, so re-running a whole suite of patches does not touch mtimes (and
+does not trigger a Metro/Expo rebuild).
+
+Any applied patch set can be undone; the undo is itself a patch set, so it
+can be undone too (by id; a plain ``undo`` walks back through the original
+patch sets). ``gc`` drops journal entries older than a given age and
+the objects nothing references any more.
+
+A patch file is JSON::
+
+    {"name": "2-column fortress slots",
+     "edits": [{"file": "app/growth/events.tsx", "old": "w-[48.5%]", "new": "w-[48.8%]"},
+               {"file": "components/x.tsx", "content": "..."},
+               {"file": "old.tsx", "delete": true}]}
+
+Scripts can use :class:`PatchSet` directly::
+
+    with PatchSet('restore font size') as ps:
+        ps.replace('app/growth/events.tsx', 'text-[10px]', 'text-xs')
+
+Usage::
+
+    python -m tools.patchset apply fix.json [--dry-run]
+    python -m tools.patchset list
+    python -m tools.patchset undo [ID]
+    python -m tools.patchset gc --days 30
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import zlib
+from pathlib import Path
+from typing import NamedTuple
+
+from tools.common import (CACHE_DIR, REPO_ROOT, UTF8, atomic_write_bytes, decode_bytes, encode_text, read_text, rel,
+                          sha256_bytes, stage_bytes)
+
+JOURNAL_DIR = CACHE_DIR / 'journal'
+GC_DAYS = 30
+
+
+APPLIED = 'applied'
+ALREADY_APPLIED = 'already applied'
+
+
+class PatchSetError(ValueError):
+    pass
+
+
+class EditResult(NamedTuple):
+    path: str
+    edit: str
+    status: str
+
+
+class Journal:
+    """Content-addressed pre-image store plus one JSON entry per patch set."""
+
+    def __init__(self, root=JOURNAL_DIR):
+        self.objects = Path(root) / 'objects'
+        self.sets = Path(root) / 'sets'
+
+    def put(self, data):
+        digest = sha256_bytes(data)
+        path = self.objects / digest
+        if not path.exists():
+            atomic_write_bytes(path, zlib.compress(data, 9))
+        return digest
+
+    def get(self, digest):
+        try:
+            return zlib.decompress((self.objects / digest).read_bytes())
+        except (OSError, zlib.error) as exc:
+            raise PatchSetError(f'journal object {digest[:12]} is missing or damaged') from exc
+
+    def save(self, entry):
+        payload = json.dumps(entry, ensure_ascii=False, indent=1).encode('utf-8')
+        atomic_write_bytes(self.sets / f"{entry['id']}.json", payload)
+
+    def entries(self):
+        """Every patch-set entry, oldest first."""
+        if not self.sets.exists():
+            return []
+        entries = []
+        for path in self.sets.glob('*.json'):
+            try:
+                entries.append(json.loads(read_text(path)))
+            except (OSError, ValueError):
+                continue
+        return sorted(entries, key=lambda e: (e['created'], e['id']))
+
+    def find(self, set_id=None):
+        """Return the entry whose id starts with ``set_id``, or the latest applied one."""
+        entries = self.entries()
+        if set_id is None:
+            applied = [e for e in entries if e['state'] == 'applied' and not e.get('undoes')]
+            if not applied:
+                raise PatchSetError('no applied patch set to undo')
+            return applied[-1]
+        matches = [e for e in entries if e['id'].startswith(set_id)]
+        if len(matches) != 1:
+            raise PatchSetError(f'{set_id!r} matches {len(matches)} patch sets')
+        return matches[0]
+
+    def gc(self, days=GC_DAYS):
+        """Drop entries older than ``days`` and unreferenced objects; return ``(entries, objects, bytes)``."""
+        cutoff = time.time() - days * 86400
+        removed_entries = 0
+        live = set()
+        for entry in self.entries():
+            if entry['created'] < cutoff:
+                (self.sets / f"{entry['id']}.json").unlink()
+                removed_entries += 1
+            else:
+                live.update(f['before'] for f in entry['files'] if f['before'])
+        removed_objects = freed = 0
+        if self.objects.exists():
+            for path in self.objects.iterdir():
+                if path.name not in live:
+                    freed += path.stat().st_size
+                    path.unlink()
+                    removed_objects += 1
+        return removed_entries, removed_objects, freed
+
+
+def _resolve(path):
+    full = (REPO_ROOT / path).resolve()
+    if full != REPO_ROOT and REPO_ROOT not in full.parents:
+        raise PatchSetError(f'{path}: outside the repository')
+    return full
+
+
+def _read(full):
+    try:
+        return full.read_bytes()
+    except FileNotFoundError:
+        return None
+
+
+def _clip(text, width=40):
+    text = text.replace('\r', '').replace('\n', '\\n')
+    return repr(text if len(text) <= width else text[:width - 3] + '...')
+
+
+def _already_applied(text, old, new):
+    if not new:
+        return old not in text   # a deletion is applied once ``old`` is gone
+    if new not in text:
+        return False
+    if old not in new:
+        return old not in text
+    # ``new`` extends ``old`` (``gap-2`` -> ``gap-2 justify-between``): applied
+    # when no ``old`` is left outside an occurrence of ``new``.
+    return text.count(old) == text.count(new) * new.count(old)
+
+
+def _fsync_dirs(paths):
+    if os.name == 'nt':
+        return
+    for directory in {p.parent for p in paths}:
+        fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+class PatchSet:
+    """Edits to several files, committed together or not at all."""
+
+    def __init__(self, name, journal=None, undoes=None):
+        self.name = name
+        self.journal = journal or Journal()
+        self.undoes = undoes
+        self.changes = {}   # repo-relative path -> new bytes, or None to delete
+        self.results = []   # EditResult per edit, in order
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        return False
+
+    def read_bytes(self, path):
+        key = rel(_resolve(path))
+        if key in self.changes:
+            return self.changes[key]
+        return _read(_resolve(path))
+
+    def read(self, path):
+        """Decode ``path`` with :func:`tools.common.decode_bytes`; files that do not decode losslessly are refused."""
+        data = self.read_bytes(path)
+        if data is None:
+            raise PatchSetError(f'{path}: no such file')
+        text, encoding = decode_bytes(data)
+        if encoding.kind == 'unknown':
+            raise PatchSetError(f'{path}: not valid text in any known encoding; fix it before patching')
+        return text
+
+    def _encode(self, path, text):
+        """Encode ``text`` in the encoding ``path`` already has (UTF-8 for new files)."""
+        data = self.read_bytes(path)
+        return encode_text(text, decode_bytes(data)[1] if data is not None else UTF8)
+
+    def _record(self, path, edit, status):
+        self.results.append(EditResult(rel(_resolve(path)), edit, status))
+        return status
+
+    def write_bytes(self, path, data):
+        status = ALREADY_APPLIED if self.read_bytes(path) == data else APPLIED
+        self.changes[rel(_resolve(path))] = data
+        return self._record(path, f'write {len(data)} bytes', status)
+
+    def write(self, path, text):
+        return self.write_bytes(path, self._encode(path, text))
+
+    def delete(self, path):
+        status = ALREADY_APPLIED if self.read_bytes(path) is None else APPLIED
+        self.changes[rel(_resolve(path))] = None
+        return self._record(path, 'delete', status)
+
+    def replace(self, path, old, new, count=-1):
+        """Replace ``old`` by ``new`` in ``path`` and return the edit's status.
+
+        The edit is already applied when ``new`` is present and ``old`` is not
+        (or, if ``new`` contains ``old``, when every ``old`` sits inside a
+        ``new``); a deletion (empty ``new``) is applied when ``old`` is gone.
+        When neither is present the whole set is aborted.
+        """
+        text = self.read(path)
+        if '\r\n' in text and '\n' in old and old not in text and new not in text:
+            # Patch files are written with \n; some sources are checked in with CRLF.
+            old, new = old.replace('\n', '\r\n'), new.replace('\n', '\r\n')
+        edit = f'{_clip(old)} -> {_clip(new)}'
+        if _already_applied(text, old, new):
+            return self._record(path, edit, ALREADY_APPLIED)
+        if old not in text:
+            raise PatchSetError(f'{path}: neither the text to replace nor its replacement found: {_clip(old)}')
+        self.changes[rel(_resolve(path))] = self._encode(path, text.replace(old, new, count))
+        return self._record(path, edit, APPLIED)
+
+    def plan(self):
+        """Return ``[(path, before_bytes, after_bytes)]`` for the files that really change."""
+        plan = []
+        for path, after in sorted(self.changes.items()):
+            before = _read(_resolve(path))
+            if before != after:
+                plan.append((path, before, after))
+        return plan
+
+    def commit(self):
+        """Apply the set atomically and return its journal id (``None`` if nothing changed)."""
+        plan = self.plan()
+        if not plan:
+            return None
+        created = time.time()
+        digest = sha256_bytes(repr([(p, b and sha256_bytes(b), a and sha256_bytes(a)) for p, b, a in plan])
+                              .encode('utf-8'))
+        entry = {
+            'id': time.strftime('%Y%m%d-%H%M%S', time.localtime(created)) + '-' + digest[:8],
+            'name': self.name,
+            'created': created,
+            'state': 'pending',
+            'undoes': self.undoes,
+            'files': [{'path': path,
+                       'before': self.journal.put(before) if before is not None else None,
+                       'after': sha256_bytes(after) if after is not None else None}
+                      for path, before, after in plan],
+        }
+        self.journal.save(entry)
+
+        staged = {}
+        try:
+            for path, _, after in plan:
+                if after is not None:
+                    staged[path] = stage_bytes(_resolve(path), after)
+        except BaseException:
+            for tmp in staged.values():
+                os.unlink(tmp)
+            entry['state'] = 'failed'
+            self.journal.save(entry)
+            raise
+
+        done = []
+        try:
+            for path, _, after in plan:
+                full = _resolve(path)
+                if after is None:
+                    full.unlink()
+                else:
+                    os.replace(staged.pop(path), full)
+                done.append((path, full))
+            _fsync_dirs([full for _, full in done])
+        except BaseException:
+            befores = {path: before for path, before, _ in plan}
+            for path, full in done:
+                if befores[path] is None:
+                    full.unlink()
+                else:
+                    atomic_write_bytes(full, befores[path])
+            for tmp in staged.values():
+                os.unlink(tmp)
+            entry['state'] = 'failed'
+            self.journal.save(entry)
+            raise
+
+        entry['state'] = 'applied'
+        self.journal.save(entry)
+        self.changes = {}
+        return entry['id']
+
+
+def apply_edits(patch, edits):
+    """Add the edits of a patch file to ``patch`` (a :class:`PatchSet`)."""
+    for edit in edits:
+        path = edit['file']
+        if edit.get('delete'):
+            patch.delete(path)
+        elif 'content' in edit:
+            patch.write(path, edit['content'])
+        else:
+            patch.replace(path, edit['old'], edit['new'], edit.get('count', -1))
+
+
+def undo(set_id=None, force=False, journal=None):
+    """Restore the pre-images of a patch set; return the id of the undoing patch set.
+
+    Raises :class:`PatchSetError`, leaving the entry as it was, when every file
+    already holds its pre-image and there is nothing to restore.
+    """
+    journal = journal or Journal()
+    entry = journal.find(set_id)
+    if entry['state'] not in ('applied', 'pending'):
+        raise PatchSetError(f"patch set {entry['id']} is {entry['state']}")
+    conflicts = []
+    for f in entry['files']:
+        current = _read(_resolve(f['path']))
+        if (sha256_bytes(current) if current is not None else None) != f['after']:
+            conflicts.append(f['path'])
+    if conflicts and not force:
+        raise PatchSetError('changed since the patch set was applied (use --force to overwrite): '
+                            + ', '.join(conflicts))
+
+    patch = PatchSet(f"undo {entry['id']} ({entry['name']})", journal, undoes=entry['id'])
+    for f in entry['files']:
+        if f['before'] is None:
+            patch.delete(f['path'])
+        else:
+            patch.write_bytes(f['path'], journal.get(f['before']))
+    undo_id = patch.commit()
+    if undo_id is None:
+        raise PatchSetError(f"patch set {entry['id']}: the files already hold their pre-images, "
+                            'nothing to restore')
+    entry['state'] = 'undone'
+    entry['undone_by'] = undo_id
+    journal.save(entry)
+    return undo_id
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    sub = parser.add_subparsers(dest='command', required=True)
+    apply = sub.add_parser('apply', help='apply JSON patch files, each as one transaction')
+    apply.add_argument('patches', nargs='+', metavar='patch')
+    apply.add_argument('--name', help='journal name (default: the patch file name field or file name)')
+    apply.add_argument('--quiet', action='store_true', help='do not list the edits')
+    apply.add_argument('--dry-run', action='store_true')
+    sub.add_parser('list', help='list journaled patch sets')
+    undo_cmd = sub.add_parser('undo', help='roll back a patch set (default: the latest applied one that '
+                                           'is not itself an undo)')
+    undo_cmd.add_argument('id', nargs='?')
+    undo_cmd.add_argument('--force', action='store_true', help='overwrite files changed since')
+    gc_cmd = sub.add_parser('gc', help='drop old journal entries and unreferenced pre-images')
+    gc_cmd.add_argument('--days', type=float, default=GC_DAYS)
+    args = parser.parse_args(argv)
+
+    journal = Journal()
+    try:
+        if args.command == 'apply':
+            for patch_file in args.patches:
+                spec = json.loads(read_text(patch_file))
+                patch = PatchSet(args.name or spec.get('name') or Path(patch_file).name, journal)
+                apply_edits(patch, spec['edits'])
+                if not args.quiet:
+                    for result in patch.results:
+                        print(f'[{result.status}] {result.path}: {result.edit}')
+                changed = len(patch.plan())
+                if args.dry_run:
+                    print(f'{patch_file}: {changed} file(s) would be written')
+                    continue
+                set_id = patch.commit()
+                print(f'{patch_file}: applied as {set_id}, {changed} file(s) written' if set_id
+                      else f'{patch_file}: already applied, nothing written')
+        elif args.command == 'list':
+            for entry in journal.entries():
+                files = ', '.join(f['path'] for f in entry['files'])
+                print(f"{entry['id']} {entry['state']:<8} {entry['name']}: {files}")
+        elif args.command == 'undo':
+            print(f'undone by {undo(args.id, force=args.force, journal=journal)}')
+        else:
+            entries, objects, freed = journal.gc(args.days)
+            print(f'removed {entries} patch set(s), {objects} object(s), {freed / 1024:.0f} KB')
+    except PatchSetError as exc:
+        print(f'error: {exc}', file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""Repository-wide text encoding and mojibake scan.
+
+Classifies every text file as UTF-8, UTF-8 with BOM, UTF-16 LE/BE (with or
+without BOM), legacy CP949, or *mojibake* -- Korean CP949 text that was once
+decoded as Latin-1 and saved again as UTF-8, so every Hangul syllable turns
+into a pair of accented Latin letters -- the damage the old
+``fix_encoding.ps1`` script was written for.
+
+A BOM or the NUL pattern of UTF-16 in the first 512 bytes decides a file
+without reading the rest (:func:`tools.common.sniff_head`); any other file is
+classified by :func:`tools.common.decode_bytes` -- the same function behind
+:func:`tools.common.read_text`, so the tokenizer and every other tool decode a
+file once, with the codec reported here, instead of assuming UTF-8. The checks
+are byte level (``bytes.isascii``, one UTF-8 decode and a byte regex for
+mojibake runs), and files are scanned on a thread pool.
+
+Usage::
+
+    python -m tools.text_encoding                 # report everything that is not plain UTF-8
+    python -m tools.text_encoding app components --all
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from tools.common import REPO_ROOT, UTF8, decode_bytes, rel, sniff_head
+
+TEXT_SUFFIXES = frozenset({
+    '.ts', '.tsx', '.js', '.jsx', '.mjs', '.cjs', '.json', '.md', '.py', '.ps1', '.bat', '.cmd', '.sh',
+    '.txt', '.log', '.css', '.html', '.htm', '.xml', '.svg', '.yml', '.yaml', '.toml', '.ini', '.env',
+})
+SKIP_DIRS = frozenset({'.git', 'node_modules', '.tools-cache', '.expo', 'dist', 'web-build', 'venv', '__pycache__'})
+# Kinds that mean a tool reading the file as UTF-8 gets it wrong.
+DAMAGED = frozenset({'mojibake', 'unknown'})
+
+
+def text_files(paths=None):
+    """Expand ``paths`` (files or directories, default: the whole repository) into text files."""
+    found = []
+    for root in [REPO_ROOT / p for p in paths] if paths else [REPO_ROOT]:
+        if root.is_file():
+            found.append(root)
+            continue
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+            found.extend(Path(dirpath) / name for name in sorted(filenames)
+                         if os.path.splitext(name)[1].lower() in TEXT_SUFFIXES)
+    return found
+
+
+def classify_file(path):
+    """Classify ``path``; return its :class:`~tools.common.Encoding`.
+
+    A BOM or the NUL pattern of UTF-16 decides from the first 512 bytes without
+    reading the rest; only a file whose head is ambiguous is read whole and run
+    through :func:`tools.common.decode_bytes`.
+    """
+    with open(path, 'rb') as f:
+        head = f.read(512)
+        found = sniff_head(head)
+        if found is not None:
+            return found
+        data = head + f.read()
+    return UTF8 if data.isascii() else decode_bytes(data)[1]
+
+
+def _classify_job(path):
+    return path, classify_file(path)
+
+
+def scan(paths, jobs=None):
+    """Classify ``paths`` on a thread pool; return ``[(path, Encoding)]`` in path order."""
+    with ThreadPoolExecutor(max_workers=jobs or min(32, (os.cpu_count() or 1) + 4)) as pool:
+        return list(pool.map(_classify_job, paths))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('paths', nargs='*', help='files or directories (default: the repository)')
+    parser.add_argument('--all', action='store_true', help='list plain UTF-8 files too')
+    parser.add_argument('--jobs', type=int)
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    results = scan(text_files(args.paths), args.jobs)
+    elapsed = time.perf_counter() - started
+
+    counts = {}
+    for path, encoding in results:
+        counts[encoding.kind] = counts.get(encoding.kind, 0) + 1
+        if args.all or encoding.kind != 'utf-8':
+            print(f'{encoding.kind:<10} {rel(path)}')
+    summary = ', '.join(f'{kind}: {count}' for kind, count in sorted(counts.items()))
+    print(f'{len(results)} files ({summary}) in {elapsed * 1000:.0f} ms', file=sys.stderr)
+    return 1 if any(kind in DAMAGED for kind in counts) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,209 @@
+"""Streaming parser for ``tsc --noEmit`` output, correlated with structure checks.
+
+Reads compiler logs as they were saved on Windows (UTF-8 or the UTF-16 that
+PowerShell redirection produces) line by line, so memory stays flat however
+long the log is. Multi-line diagnostics (the indented ``Overload 1 of 2 ...``
+traces of TS2769) are folded into the diagnostic they belong to, and
+diagnostics are grouped per file in a bounded summary.
+
+Each file that appears in the log is checked once with :mod:`tools.tsx_check`.
+When the file has a structural error (an unclosed tag or bracket), every tsc
+*syntax* error (TS1xxx, TS17xxx) from that line onwards, or on the line of an
+outer opener the checker also reported, is counted as a cascade of it, so a
+log with hundreds of TS1005/TS17002 lines collapses to the one missing
+``</View>``. Type errors are never folded into a structural root cause.
+
+The same diagnostic in several logs (or twice in one) is reported once.
+
+Usage::
+
+    python -m tools.tsc_log                          # .old_backup/logs/tsc*
+    python -m tools.tsc_log tsc_output.txt
+    npx tsc --noEmit | python -m tools.tsc_log -
+"""
+
+import argparse
+import re
+import sys
+from collections import Counter
+from typing import NamedTuple
+
+from tools import tsx_check
+from tools.common import REPO_ROOT, open_text
+
+DEFAULT_LOGS = ('.old_backup/logs/tsc*',)
+
+# Lines of an indented trace kept per diagnostic; the rest are only counted.
+MAX_DETAIL_LINES = 20
+# Independent (non-cascade) diagnostics listed per file in the report.
+MAX_SAMPLES = 10
+
+# Syntax error codes (scanner/parser and JSX parser); only these can cascade from a structural error.
+SYNTAX_CODES = (range(1000, 2000), range(17000, 18000))
+
+# ``path(line,col): error TS1234: message`` (default / --pretty false) and
+# ``path:line:col - error TS1234: message`` (--pretty, after stripping colours).
+_PLAIN_RE = re.compile(r'^(?P<file>.+?)\((?P<line>\d+),(?P<col>\d+)\): (?P<severity>error|warning) '
+                       r'(?P<code>TS\d+): (?P<message>.*)$')
+_PRETTY_RE = re.compile(r'^(?P<file>.+?):(?P<line>\d+):(?P<col>\d+) - (?P<severity>error|warning) '
+                        r'(?P<code>TS\d+): (?P<message>.*)$')
+_ANSI_RE = re.compile(r'\x1b\[[0-9;]*m')
+
+
+class TscDiagnostic(NamedTuple):
+    file: str
+    line: int
+    col: int
+    code: str
+    message: str
+    details: tuple = ()
+
+
+def is_syntax_error(code):
+    number = int(code[2:])
+    return any(number in codes for codes in SYNTAX_CODES)
+
+
+class FileSummary:
+    """Per-file aggregate of tsc diagnostics, bounded by ``MAX_SAMPLES``."""
+
+    __slots__ = ('path', 'count', 'codes', 'root_cause', 'structural_lines', 'cascaded', 'independent', 'dropped')
+
+    def __init__(self, path, check=None):
+        self.path = path
+        self.count = 0
+        self.codes = Counter()
+        self.root_cause = check.root_cause if check is not None else None
+        self.structural_lines = frozenset(d.line for d in check.diagnostics) if check is not None else frozenset()
+        self.cascaded = 0
+        self.independent = []
+        self.dropped = 0
+
+    def add(self, diagnostic, max_samples=MAX_SAMPLES):
+        self.count += 1
+        self.codes[diagnostic.code] += 1
+        if (self.root_cause is not None and is_syntax_error(diagnostic.code)
+                and (diagnostic.line >= self.root_cause.line or diagnostic.line in self.structural_lines)):
+            self.cascaded += 1
+        elif len(self.independent) < max_samples:
+            self.independent.append(diagnostic)
+        else:
+            self.dropped += 1
+
+
+def parse_lines(lines):
+    """Yield :class:`TscDiagnostic` objects from an iterable of log lines."""
+    current = None
+    details = []
+    extra = 0
+    for raw in lines:
+        line = _ANSI_RE.sub('', raw.rstrip('\r\n'))
+        if current is not None and line[:1] in (' ', '\t') and line.strip():
+            if len(details) < MAX_DETAIL_LINES:
+                details.append(line.strip())
+            else:
+                extra += 1
+            continue
+        match = _PLAIN_RE.match(line) or _PRETTY_RE.match(line)
+        if current is not None and (match or line.strip()):
+            if extra:
+                details.append(f'... {extra} more line(s)')
+            yield current._replace(details=tuple(details))
+            current, details, extra = None, [], 0
+        if match:
+            current = TscDiagnostic(match['file'].strip().replace('\\', '/'), int(match['line']),
+                                    int(match['col']), match['code'], match['message'])
+    if current is not None:
+        if extra:
+            details.append(f'... {extra} more line(s)')
+        yield current._replace(details=tuple(details))
+
+
+def parse_log(path):
+    """Stream the diagnostics of one log file (``-`` reads stdin)."""
+    with open_text(path) as f:
+        yield from parse_lines(f)
+
+
+def _check(path):
+    source = REPO_ROOT / path
+    if source.suffix not in tsx_check.SOURCE_SUFFIXES or not source.is_file():
+        return None
+    return tsx_check.check_file(source)
+
+
+def summarise(diagnostics, max_samples=MAX_SAMPLES):
+    """Group ``diagnostics`` by file; return ``{path: FileSummary}`` in first-seen order.
+
+    Each referenced file is structure-checked once, the first time it appears.
+    """
+    files = {}
+    for diagnostic in diagnostics:
+        summary = files.get(diagnostic.file)
+        if summary is None:
+            summary = files[diagnostic.file] = FileSummary(diagnostic.file, _check(diagnostic.file))
+        summary.add(diagnostic, max_samples)
+    return files
+
+
+def _expand(patterns):
+    paths = []
+    for pattern in patterns:
+        if pattern == '-':
+            paths.append(pattern)
+        elif any(ch in pattern for ch in '*?['):
+            paths.extend(sorted(REPO_ROOT.glob(pattern)))
+        else:
+            paths.append(pattern)
+    return paths
+
+
+def _log_diagnostics(paths):
+    """Chain the logs, skipping diagnostics already seen in this or an earlier log.
+
+    The key is ``(file, line, col, code, message)``, without the trace, so
+    the set grows with the distinct diagnostics (which the summary counts
+    anyway), not with the length or number of the logs.
+    """
+    seen = set()
+    for path in paths:
+        for diagnostic in parse_log(path):
+            key = diagnostic[:5]
+            if key not in seen:
+                seen.add(key)
+                yield diagnostic
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('logs', nargs='*', help='tsc output files or globs; - for stdin (default: %(default)s)',
+                        default=list(DEFAULT_LOGS))
+    parser.add_argument('--samples', type=int, default=MAX_SAMPLES, help='diagnostics listed per file')
+    parser.add_argument('--details', action='store_true', help='print the indented trace of each diagnostic')
+    args = parser.parse_args(argv)
+
+    files = summarise(_log_diagnostics(_expand(args.logs)), max_samples=args.samples)
+    total = cascaded = 0
+    for summary in files.values():
+        total += summary.count
+        cascaded += summary.cascaded
+        codes = ', '.join(f'{code} x{n}' for code, n in summary.codes.most_common())
+        print(f'{summary.path}: {summary.count} error(s) ({codes})')
+        root = summary.root_cause
+        if root is not None:
+            print(f'  root cause {root.line}:{root.col} {root.rule}: {root.message} '
+                  f'-> explains {summary.cascaded} syntax error(s) from line {root.line} on')
+        for d in summary.independent:
+            print(f'  {d.line}:{d.col} {d.code}: {d.message}')
+            if args.details:
+                for detail in d.details:
+                    print(f'      {detail}')
+        if summary.dropped:
+            print(f'  ... {summary.dropped} more')
+    print(f'{len(files)} file(s), {total} error(s), {cascaded} explained by structural root causes',
+          file=sys.stderr)
+    return 1 if total else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
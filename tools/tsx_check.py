@@ -0,0 +1,352 @@
+"""Bracket and JSX structure checker built on :mod:`tools.tsx_tokens`.
+
+Supersedes the one-file counters in ``.old_backup/root_scripts``
+(``check_syntax.py``, ``check_tags.py``, ``find_unclosed.py``,
+``smart_balance.py`` ...). A single token pass matches ``( [ {`` and JSX
+elements on one stack, so a missing ``</View>`` is reported at the element
+that was left open instead of as a global count difference, and everything
+after the first structural error is recognised as a cascade.
+
+The same pass builds the JSX element tree (:class:`Element`), which other
+tools reuse for depth, props and render-site information.
+
+Files are checked on a process pool and each file's diagnostics are written
+as soon as it finishes, as text, JSON Lines or SARIF (:mod:`tools.diag_output`).
+
+Usage::
+
+    python -m tools.tsx_check                      # app/ components/ hooks/ ...
+    python -m tools.tsx_check app/growth/events.tsx
+    python -m tools.tsx_check --format jsonl
+    python -m tools.tsx_check --format sarif > tsx_check.sarif
+"""
+
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import NamedTuple, Optional
+
+from tools.common import REPO_ROOT, rel
+from tools.diag_output import FORMATS, open_writer
+from tools.tsx_tokens import LineIndex, Token, tokenize, tokenize_file
+
+SOURCE_DIRS = ('app', 'components', 'hooks', 'services', 'data', 'utils')
+SOURCE_SUFFIXES = ('.ts', '.tsx')
+
+BRACKETS = {'(': ')', '[': ']', '{': '}'}
+CLOSERS = {v: k for k, v in BRACKETS.items()}
+
+RULES = {
+    'unclosed-bracket': 'An opening bracket is never closed',
+    'unclosed-tag': 'A JSX element is never closed',
+    'unmatched-bracket': 'A closing bracket has no opening bracket',
+    'mismatched-bracket': 'A closing bracket does not match the innermost open bracket',
+    'unmatched-tag': 'A JSX closing tag has no opening tag',
+}
+
+
+class Diagnostic(NamedTuple):
+    rule: str
+    path: str
+    line: int
+    col: int
+    end_line: int
+    end_col: int
+    message: str
+    fix: Optional[str] = None
+
+
+class Element:
+    """One JSX element; ``end_line`` is ``None`` while (or if it stays) unclosed."""
+
+    __slots__ = ('name', 'props', 'line', 'col', 'start', 'end', 'end_line', 'depth', 'parent', 'children')
+
+    def __init__(self, name, line, col, start, depth, parent):
+        self.name = name
+        self.props = []
+        self.line = line
+        self.col = col
+        self.start = start
+        self.end = None
+        self.end_line = None
+        self.depth = depth
+        self.parent = parent
+        self.children = []
+
+    def __repr__(self):
+        return f'<{self.name or ""} line={self.line} depth={self.depth}>'
+
+
+class CheckResult(NamedTuple):
+    path: str
+    diagnostics: list
+    elements: list
+    tokens: list
+    text: str
+
+    @property
+    def max_depth(self):
+        return max((e.depth for e in self.elements), default=0)
+
+    @property
+    def root_cause(self):
+        """The diagnostic the rest most likely cascade from.
+
+        Unclosed openers nest, so the innermost (latest) one is the culprit and
+        the outer ones are consequences; stray closers count from the first one.
+        """
+        unclosed = [d for d in self.diagnostics if d.rule.startswith('unclosed')]
+        stray = [d for d in self.diagnostics if not d.rule.startswith('unclosed')]
+        candidates = []
+        if unclosed:
+            candidates.append(max(unclosed, key=lambda d: (d.line, d.col)))
+        if stray:
+            candidates.append(min(stray, key=lambda d: (d.line, d.col)))
+        return min(candidates, key=lambda d: (d.line, d.col), default=None)
+
+
+class _Opener(NamedTuple):
+    kind: str          # '(', '[', '{' or 'jsx'
+    token_index: int
+    element: Optional[Element]
+
+
+def check_tokens(path, text, tokens):
+    """Match brackets and JSX tags in ``tokens`` and build the element tree."""
+    lines = LineIndex(text)
+    diagnostics = []
+    elements = []
+    stack = []
+    pending = None   # element whose opening tag is still being read
+    closing = None   # name collected for the current closing tag
+    closing_token = None
+
+    def report(rule, token, message, fix=None):
+        line, col = lines.line_col(token.start)
+        end_line, end_col = lines.line_col(token.end)
+        diagnostics.append(Diagnostic(rule, path, line, col, end_line, end_col, message, fix))
+
+    def describe(opener):
+        if opener.kind == 'jsx':
+            return f'<{opener.element.name}>'
+        return f"'{opener.kind}'"
+
+    def unclosed(opener):
+        token = tokens[opener.token_index]
+        if opener.kind == 'jsx':
+            name = opener.element.name
+            report('unclosed-tag', token, f'<{name}> is never closed', fix=f'</{name}>')
+        else:
+            report('unclosed-bracket', token, f"'{opener.kind}' is never closed", fix=BRACKETS[opener.kind])
+
+    def depth():
+        return sum(1 for o in stack if o.kind == 'jsx')
+
+    def parent_element():
+        for opener in reversed(stack):
+            if opener.kind == 'jsx':
+                return opener.element
+        return None
+
+    def close_element(element, token):
+        element.end = token.end
+        element.end_line = lines.line(token.end)
+
+    for index, token in enumerate(tokens):
+        kind, value = token.kind, token.value
+
+        if kind == 'jsx_open':
+            parent = parent_element()
+            line, col = lines.line_col(token.start)
+            pending = Element(None, line, col, token.start, depth() + 1, parent)
+            pending_index = index
+            pending_level = len(stack)
+            continue
+        if kind == 'jsx_close':
+            closing, closing_token = '', token
+            continue
+        if kind == 'jsx_name':
+            if pending is not None:
+                if pending.name is None:
+                    pending.name = value
+                else:
+                    pending.props.append(value)
+            elif closing == '':
+                closing = value
+            continue
+        if kind == 'jsx_self' and pending is not None:
+            pending.name = pending.name or ''
+            close_element(pending, token)
+            elements.append(pending)
+            if pending.parent is not None:
+                pending.parent.children.append(pending)
+            pending = None
+            continue
+        if kind == 'jsx_end':
+            if pending is not None:
+                pending.name = pending.name or ''
+                elements.append(pending)
+                if pending.parent is not None:
+                    pending.parent.children.append(pending)
+                stack.append(_Opener('jsx', pending_index, pending))
+                pending = None
+            elif closing is not None:
+                _close_tag(stack, closing, closing_token, token, report, unclosed, close_element)
+                closing = closing_token = None
+            continue
+
+        if kind == 'jsx_text' and '}' in value:
+            # ``}`` is not allowed in JSX text; it is usually the rest of a ``{...}`` whose ``{`` was lost.
+            at = token.start + value.index('}')
+            report('unmatched-bracket', Token('punct', '}', at, at + 1), "'}' in JSX text has no matching '{'")
+            continue
+        if kind != 'punct':
+            continue
+        if value in BRACKETS:
+            if pending is not None and value == '{' and len(stack) == pending_level \
+                    and tokens[index - 1].value != '=':
+                # spread props: <View {...props}>
+                pending.props.append('...')
+            stack.append(_Opener(value, index, None))
+        elif value in CLOSERS:
+            want = CLOSERS[value]
+            if stack and stack[-1].kind == want:
+                stack.pop()
+                continue
+            target = _resync_target(stack, want, token, tokens, text, lines)
+            if target is not None:
+                # Something inside was left open; report it and resynchronise.
+                while len(stack) > target + 1:
+                    unclosed(stack.pop())
+                stack.pop()
+            elif any(o.kind == want for o in stack):
+                report('unmatched-bracket', token, f"'{value}' has no matching '{want}' at this indentation")
+            elif stack:
+                report('mismatched-bracket', token,
+                       f"'{value}' does not match {describe(stack[-1])} opened on line "
+                       f"{lines.line(tokens[stack[-1].token_index].start)}")
+            else:
+                report('unmatched-bracket', token, f"'{value}' has no matching '{want}'")
+
+    if pending is not None:
+        report('unclosed-tag', tokens[pending_index], f'<{pending.name or ""} tag is never finished', fix='>')
+    while stack:
+        unclosed(stack.pop())
+
+    diagnostics.sort(key=lambda d: (d.line, d.col))
+    return diagnostics, elements
+
+
+def _indent_of(text, lines, offset, own_line=False):
+    """Indentation of the line holding ``offset``; with ``own_line`` only if it starts that line."""
+    start = lines.starts[lines.line(offset) - 1]
+    prefix = text[start:offset]
+    if own_line and prefix.strip():
+        return None
+    stripped = text[start:].lstrip(' \t')
+    return len(text) - start - len(stripped)
+
+
+def _resync_target(stack, want, token, tokens, text, lines):
+    """Pick the stack position a mismatched closer really closes, or ``None`` if it is extra.
+
+    Formatted code closes a bracket at the indentation of the line that opened
+    it, so a closer on its own line is matched by indentation; a closer in the
+    middle of a line falls back to the nearest opener of the same kind.
+    """
+    indent = _indent_of(text, lines, token.start, own_line=True)
+    for position in range(len(stack) - 1, -1, -1):
+        opener = stack[position]
+        if opener.kind != want:
+            continue
+        if indent is None or _indent_of(text, lines, tokens[opener.token_index].start) == indent:
+            return position
+    return None
+
+
+def _close_tag(stack, name, open_token, end_token, report, unclosed, close_element):
+    for position in range(len(stack) - 1, -1, -1):
+        opener = stack[position]
+        if opener.kind == 'jsx' and opener.element.name == name:
+            for inner in stack[position + 1:]:
+                unclosed(inner)
+            del stack[position:]
+            close_element(opener.element, end_token)
+            return
+        if opener.kind != 'jsx':
+            # A closing tag never crosses an open bracket; the bracket is the problem.
+            break
+    report('unmatched-tag', open_token, f'</{name}> has no matching <{name}>')
+
+
+def check_source(path, text):
+    tokens = list(tokenize(text, jsx=str(path).endswith(('.tsx', '.jsx'))))
+    diagnostics, elements = check_tokens(rel(path), text, tokens)
+    return CheckResult(rel(path), diagnostics, elements, tokens, text)
+
+
+def check_file(path):
+    text, tokens = tokenize_file(path)
+    diagnostics, elements = check_tokens(rel(path), text, tokens)
+    return CheckResult(rel(path), diagnostics, elements, tokens, text)
+
+
+def source_files(paths=None):
+    """Expand ``paths`` (files or directories) into TS/TSX files; default: the app sources."""
+    roots = [REPO_ROOT / p for p in (paths or SOURCE_DIRS)]
+    found = []
+    for root in roots:
+        if root.is_file():
+            found.append(root)
+        elif root.is_dir():
+            found.extend(p for p in sorted(root.rglob('*'))
+                         if p.suffix in SOURCE_SUFFIXES and 'node_modules' not in p.parts)
+    return found
+
+
+def _diagnostics_job(path):
+    return check_file(path).diagnostics
+
+
+def iter_check(paths, jobs=None):
+    """Yield ``(path, diagnostics)`` for each file as soon as it has been checked."""
+    if len(paths) < 2 or jobs == 1:
+        for path in paths:
+            yield path, _diagnostics_job(path)
+        return
+    with ProcessPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as pool:
+        futures = {pool.submit(_diagnostics_job, path): path for path in paths}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+
+def check_paths(paths, jobs=None):
+    """Check ``paths`` on a process pool and return their diagnostics in path order."""
+    results = dict(iter_check(paths, jobs))
+    return [d for path in paths for d in results[path]]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('paths', nargs='*', help='files or directories (default: app sources)')
+    parser.add_argument('--jobs', type=int)
+    parser.add_argument('--format', choices=FORMATS, default='text', help='output format (default: text)')
+    args = parser.parse_args(argv)
+
+    paths = source_files(args.paths)
+    writer = open_writer(args.format, 'tools.tsx_check', RULES)
+    problems = 0
+    try:
+        for _, diagnostics in iter_check(paths, jobs=args.jobs):
+            for d in diagnostics:
+                writer.emit(d)
+            problems += len(diagnostics)
+    finally:
+        writer.close()
+    print(f'{len(paths)} files, {problems} problems', file=sys.stderr)
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
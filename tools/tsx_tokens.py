@@ -0,0 +1,327 @@
+"""JSX-aware tokenizer for the TS/TSX sources.
+
+One hand-written lexer shared by every source tool (bracket/JSX checker,
+duplicate detector, usage index ...). It never raises on broken input:
+half-patched files are exactly what the tools need to look at, so the lexer
+keeps going and leaves structural judgement to :mod:`tools.tsx_check`.
+
+Token kinds:
+
+``ident``      identifiers and keywords
+``num``        numeric literals
+``str``        quoted strings (including JSX attribute strings)
+``tmpl``       a raw template-literal chunk (``\\`a${`` / ``}b\\```)
+``regex``      regular-expression literals
+``punct``      operators and ``( ) [ ] { }``
+``jsx_open``   ``<`` starting a JSX opening tag
+``jsx_close``  ``</`` starting a JSX closing tag
+``jsx_name``   tag and attribute names inside a JSX tag
+``jsx_end``    ``>`` ending a JSX tag
+``jsx_self``   ``/>`` ending a self-closing JSX tag
+``jsx_text``   text between JSX tags (whitespace-only text is dropped)
+
+Comments and whitespace are skipped.
+"""
+
+import re
+from bisect import bisect_right
+from typing import NamedTuple
+
+from tools.common import read_text
+
+
+class Token(NamedTuple):
+    kind: str
+    value: str
+    start: int
+    end: int
+
+
+# Keywords after which ``<`` or ``/`` starts an expression, not an operator.
+EXPR_KEYWORDS = frozenset({
+    'return', 'yield', 'await', 'case', 'default', 'else', 'do', 'in', 'of',
+    'typeof', 'void', 'delete', 'new', 'throw', 'instanceof',
+})
+
+_PUNCT = sorted((
+    '>>>=', '...', '===', '!==', '**=', '<<=', '>>=', '>>>', '&&=', '||=', '??=',
+    '=>', '==', '!=', '<=', '>=', '&&', '||', '??', '?.', '++', '--', '+=', '-=',
+    '*=', '/=', '%=', '&=', '|=', '^=', '**', '<<', '>>',
+), key=len, reverse=True)
+_PUNCT_RE = re.compile('|'.join(re.escape(p) for p in _PUNCT) + r'|[{}()\[\];,<>+\-*/%&|^!~?:=.@#]')
+_IDENT_RE = re.compile(r'[A-Za-z_$À-￿][\w$À-￿]*')
+_NUM_RE = re.compile(r'0[xXbBoO][\da-fA-F_]+n?|(?:\d[\d_]*\.?[\d_]*|\.\d[\d_]*)(?:[eE][+-]?\d+)?n?')
+_SPACE_RE = re.compile(r'\s+')
+_JSX_NAME_RE = re.compile(r'[A-Za-z_$][\w$.:\-]*')
+_JSX_TEXT_RE = re.compile(r'[^{<]+')
+_JSX_START_RE = re.compile(r'[A-Za-z_$>]')
+# ``<T,>`` / ``<T extends X>``: type parameters of a generic arrow function, which TSX spells this way.
+_TYPE_PARAMS_RE = re.compile(r'<\s*[A-Za-z_$][\w$]*\s*(?:,|extends\s)')
+
+_EXPR_END_PUNCT = frozenset({')', ']', '}'})
+_EXPR_END_KINDS = frozenset({'num', 'str', 'tmpl', 'regex', 'jsx_end', 'jsx_self'})
+_JSX_END_KINDS = frozenset({'jsx_end', 'jsx_self'})
+
+
+class LineIndex:
+    """Offset -> (line, column) lookup, both 1-based."""
+
+    def __init__(self, text):
+        self.starts = [0] + [m.end() for m in re.finditer('\n', text)]
+
+    def line_col(self, offset):
+        line = bisect_right(self.starts, offset)
+        return line, offset - self.starts[line - 1] + 1
+
+    def line(self, offset):
+        return bisect_right(self.starts, offset)
+
+
+def _expression_can_start(prev):
+    """True if the previous significant token leaves us where an operand is expected."""
+    if prev is None:
+        return True
+    if prev.kind == 'ident':
+        return prev.value in EXPR_KEYWORDS
+    if prev.kind == 'punct':
+        return prev.value not in _EXPR_END_PUNCT
+    if prev.kind in _EXPR_END_KINDS:
+        return False
+    return True
+
+
+def _scan_string(text, pos, quote):
+    end = len(text)
+    pos += 1
+    while pos < end:
+        ch = text[pos]
+        if ch == '\\':
+            pos += 2
+            continue
+        if ch == quote or ch == '\n':
+            return pos + 1 if ch == quote else pos
+        pos += 1
+    return end
+
+
+def _scan_template(text, pos):
+    """Scan from just inside a template; return ``(end, opens_expr)``."""
+    end = len(text)
+    while pos < end:
+        ch = text[pos]
+        if ch == '\\':
+            pos += 2
+            continue
+        if ch == '`':
+            return pos + 1, False
+        if ch == '$' and text.startswith('${', pos):
+            return pos + 2, True
+        pos += 1
+    return end, False
+
+
+def _scan_regex(text, pos):
+    end = len(text)
+    pos += 1
+    in_class = False
+    while pos < end:
+        ch = text[pos]
+        if ch == '\\':
+            pos += 2
+            continue
+        if ch == '\n':
+            return None
+        if ch == '[':
+            in_class = True
+        elif ch == ']':
+            in_class = False
+        elif ch == '/' and not in_class:
+            pos += 1
+            while pos < end and (text[pos].isalnum() or text[pos] == '_'):
+                pos += 1
+            return pos
+        pos += 1
+    return None
+
+
+def _skip_comment(text, pos):
+    """Return the position after a comment starting at ``pos``, or ``None``."""
+    if text.startswith('//', pos):
+        nl = text.find('\n', pos)
+        return len(text) if nl < 0 else nl
+    if text.startswith('/*', pos):
+        close = text.find('*/', pos + 2)
+        return len(text) if close < 0 else close + 2
+    return None
+
+
+def _push(modes, names, mode, name=None):
+    modes.append(mode)
+    names.append(name)
+
+
+def _pop(modes, names):
+    if len(modes) > 1:
+        modes.pop()
+        names.pop()
+
+
+def _close_children(modes, names, name):
+    """Leave the 'children' mode closed by ``</name>``.
+
+    If an inner element lost its closing tag, unwind the directly nested
+    children modes down to the one that ``name`` really closes.
+    """
+    depth = len(modes) - 1
+    while depth > 0 and modes[depth] == 'children':
+        if names[depth] == name:
+            del modes[depth:], names[depth:]
+            return
+        depth -= 1
+    if modes[-1] == 'children':
+        _pop(modes, names)
+
+
+def tokenize(text, jsx=True):
+    """Yield :class:`Token` objects for ``text``; set ``jsx=False`` for plain ``.ts``."""
+    # Mode stack: 'js' (base), 'brace' (JS block/object), 'expr' (JSX expression
+    # container), 'tmpl' (template ${...}), 'tag' / 'ctag' (inside <A ...> or
+    # </A ...>) and 'children' (between an opening and closing JSX tag).
+    modes = ['js']
+    # Tag name for each 'tag'/'ctag'/'children' entry in ``modes`` (None
+    # elsewhere), so a closing tag can unwind past children whose own closing
+    # tag is missing.
+    names = [None]
+    prev = None
+    pos = 0
+    end = len(text)
+
+    while pos < end:
+        mode = modes[-1]
+
+        if mode == 'children':
+            ch = text[pos]
+            if ch == '{':
+                _push(modes, names, 'expr')
+                prev = Token('punct', '{', pos, pos + 1)
+                yield prev
+                pos += 1
+            elif ch == '<':
+                if text.startswith('</', pos):
+                    _push(modes, names, 'ctag')
+                    prev = Token('jsx_close', '</', pos, pos + 2)
+                    pos += 2
+                else:
+                    _push(modes, names, 'tag')
+                    prev = Token('jsx_open', '<', pos, pos + 1)
+                    pos += 1
+                yield prev
+            else:
+                m = _JSX_TEXT_RE.match(text, pos)
+                if m.group().strip():
+                    yield Token('jsx_text', m.group(), pos, m.end())
+                pos = m.end()
+            continue
+
+        m = _SPACE_RE.match(text, pos)
+        if m:
+            pos = m.end()
+            continue
+        skipped = _skip_comment(text, pos)
+        if skipped is not None:
+            pos = skipped
+            continue
+
+        ch = text[pos]
+
+        if mode in ('tag', 'ctag'):
+            if text.startswith('/>', pos):
+                _pop(modes, names)
+                prev = Token('jsx_self', '/>', pos, pos + 2)
+                pos += 2
+            elif ch == '>':
+                tag_name = names[-1] or ''
+                _pop(modes, names)
+                if mode == 'tag':
+                    _push(modes, names, 'children', tag_name)
+                else:
+                    _close_children(modes, names, tag_name)
+                prev = Token('jsx_end', '>', pos, pos + 1)
+                pos += 1
+            elif ch == '{':
+                _push(modes, names, 'expr')
+                prev = Token('punct', '{', pos, pos + 1)
+                pos += 1
+            elif ch in '"\'':
+                close = text.find(ch, pos + 1)
+                close = end if close < 0 else close + 1
+                prev = Token('str', text[pos:close], pos, close)
+                pos = close
+            elif ch == '=':
+                prev = Token('punct', '=', pos, pos + 1)
+                pos += 1
+            else:
+                m = _JSX_NAME_RE.match(text, pos)
+                if m:
+                    if names[-1] is None:
+                        names[-1] = m.group()
+                    prev = Token('jsx_name', m.group(), pos, m.end())
+                    pos = m.end()
+                else:
+                    # Not valid JSX after all; drop back to JS so we make progress.
+                    _pop(modes, names)
+                    continue
+            yield prev
+            continue
+
+        # JS modes
+        if ch in '"\'':
+            close = _scan_string(text, pos, ch)
+            prev = Token('str', text[pos:close], pos, close)
+        elif ch == '`':
+            close, opens = _scan_template(text, pos + 1)
+            if opens:
+                _push(modes, names, 'tmpl')
+            prev = Token('tmpl', text[pos:close], pos, close)
+        elif ch == '}' and mode == 'tmpl':
+            _pop(modes, names)
+            close, opens = _scan_template(text, pos + 1)
+            if opens:
+                _push(modes, names, 'tmpl')
+            prev = Token('tmpl', text[pos:close], pos, close)
+        # A tag right after the outermost element was closed is a stray closing tag or
+        # a second root element, never ``<`` as an operator; lex it as JSX so it gets reported.
+        elif jsx and prev is not None and prev.kind in _JSX_END_KINDS and text.startswith('</', pos):
+            _push(modes, names, 'ctag')
+            prev = Token('jsx_close', '</', pos, pos + 2)
+        elif (jsx and ch == '<' and (_expression_can_start(prev) or prev.kind in _JSX_END_KINDS)
+              and _JSX_START_RE.match(text, pos + 1) and not _TYPE_PARAMS_RE.match(text, pos)):
+            _push(modes, names, 'tag')
+            prev = Token('jsx_open', '<', pos, pos + 1)
+        elif ch == '/' and _expression_can_start(prev) and (close := _scan_regex(text, pos)):
+            prev = Token('regex', text[pos:close], pos, close)
+        elif ch.isdigit() or (ch == '.' and text[pos + 1:pos + 2].isdigit()):
+            m = _NUM_RE.match(text, pos)
+            prev = Token('num', m.group(), pos, m.end())
+        elif (m := _IDENT_RE.match(text, pos)):
+            prev = Token('ident', m.group(), pos, m.end())
+        else:
+            m = _PUNCT_RE.match(text, pos)
+            value = m.group() if m else ch
+            if value == '{':
+                _push(modes, names, 'brace')
+            elif value == '}' and mode in ('brace', 'expr'):
+                _pop(modes, names)
+            prev = Token('punct', value, pos, pos + len(value))
+        yield prev
+        pos = prev.end
+
+
+def is_jsx_path(path):
+    return str(path).endswith(('.tsx', '.jsx'))
+
+
+def tokenize_file(path):
+    """Read ``path`` and return ``(text, tokens)``."""
+    text = read_text(path)
+    return text, list(tokenize(text, jsx=is_jsx_path(path)))
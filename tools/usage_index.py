@@ -0,0 +1,351 @@
+"""Persistent cross-file index of component and hook usages.
+
+Maps every exported symbol (``components/common/WheelPicker.tsx:default``,
+``hooks/useFirestoreEventSchedules.ts:useFirestoreEventSchedules`` ...) to the
+places that import it, render it as JSX (with the props passed) and call or
+reference it. Files are parsed with :mod:`tools.tsx_tokens` and the element
+tree of :mod:`tools.tsx_check`; the index lives in ``.tools-cache`` and
+``update`` parses again only the files whose contents changed. ``find`` reads
+the index as of the last ``update`` and never scans the tree, so a query costs
+one cache load and a dictionary lookup; ``find --refresh`` updates first.
+
+Imports are resolved through relative paths, ``index`` files and
+``export ... from`` re-exports; package imports are indexed under the package
+name (``react-native:Modal``).
+
+Usage::
+
+    python -m tools.usage_index find WheelPicker
+    python -m tools.usage_index find useFirestoreEventSchedules --kind call
+    python -m tools.usage_index find components/events/GrowthEventCard.tsx:default
+    python -m tools.usage_index find WheelPicker --refresh     # update the index first
+    python -m tools.usage_index update
+"""
+
+import argparse
+import os
+import posixpath
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from tools.common import load_cache, rel, save_cache, sha256_file
+from tools.tsx_check import check_file, source_files
+from tools.tsx_tokens import LineIndex
+
+CACHE_NAME = 'usage_index.json'
+# Bump when the per-file record format changes so the index is rebuilt.
+INDEX_VERSION = 1
+
+RESOLVE_SUFFIXES = ('', '.ts', '.tsx', '.js', '.jsx', '/index.ts', '/index.tsx', '/index.js')
+# Wrappers skipped when naming a default export: ``export default memo(Card)``.
+_DEFAULT_WRAPPERS = frozenset({'function', 'class', 'async', 'memo', 'React', 'forwardRef'})
+_DECLARATIONS = frozenset({'const', 'let', 'var', 'function', 'class', 'interface', 'type', 'enum', 'async'})
+
+
+def resolve_module(importer, spec, known):
+    """Resolve an import specifier to a repo-relative file, or keep a package name as is."""
+    if not spec.startswith('.'):
+        return spec
+    base = posixpath.normpath(posixpath.join(posixpath.dirname(importer), spec))
+    for suffix in RESOLVE_SUFFIXES:
+        if base + suffix in known:
+            return base + suffix
+    return base
+
+
+def _specifiers(tokens, i):
+    """Parse ``{ a, b as c, type d }`` starting at ``{``; return ``([(name, alias)], next_index)``."""
+    names = []
+    i += 1
+    while i < len(tokens) and tokens[i].value != '}':
+        if tokens[i].kind == 'ident':
+            if tokens[i].value == 'type' and i + 1 < len(tokens) and tokens[i + 1].kind == 'ident':
+                i += 1
+            name = alias = tokens[i].value
+            if i + 2 < len(tokens) and tokens[i + 1].value == 'as':
+                alias = tokens[i + 2].value
+                i += 2
+            names.append((name, alias))
+        i += 1
+    return names, i + 1
+
+
+def _module_after(tokens, i):
+    """Return ``(spec, next_index)`` for ``from '<spec>'`` at ``i``, or ``(None, i)``."""
+    if i + 1 < len(tokens) and tokens[i].value == 'from' and tokens[i + 1].kind == 'str':
+        return tokens[i + 1].value[1:-1], i + 2
+    return None, i
+
+
+def parse_file(path, known):
+    """Extract the exports, imports and symbol uses of one source file."""
+    result = check_file(path)
+    tokens, lines = result.tokens, LineIndex(result.text)
+    me = result.path
+    exports, reexports, imports, uses = {}, [], {}, []
+    statement_tokens = set()
+    n = len(tokens)
+
+    i = 0
+    while i < n:
+        token = tokens[i]
+        nxt = tokens[i + 1] if i + 1 < n else None
+        prev = tokens[i - 1] if i else None
+        at_statement = prev is None or prev.value != '.'
+        if token.kind == 'ident' and token.value == 'import' and at_statement and nxt is not None \
+                and nxt.value not in ('(', '.'):
+            start, j = i, i + 1
+            if tokens[j].value == 'type':
+                j += 1
+            bound = []
+            if tokens[j].kind == 'ident' and tokens[j].value != 'from':
+                bound.append(('default', tokens[j].value))
+                j += 1
+                if j < n and tokens[j].value == ',':
+                    j += 1
+            if j < n and tokens[j].value == '*' and j + 2 < n:
+                bound.append(('*', tokens[j + 2].value))
+                j += 3
+            elif j < n and tokens[j].value == '{':
+                names, j = _specifiers(tokens, j)
+                bound.extend(names)
+            spec, j = _module_after(tokens, j)
+            if spec is None and j < n and tokens[j].kind == 'str':
+                spec, j = tokens[j].value[1:-1], j + 1      # side-effect import
+            if spec is not None:
+                target = resolve_module(me, spec, known)
+                line, col = lines.line_col(token.start)
+                for name, local in bound:
+                    imports[local] = [target, name, line, col]
+            statement_tokens.update(range(start, j))
+            i = j
+            continue
+        if token.kind == 'ident' and token.value == 'export' and at_statement and nxt is not None:
+            j = i + 1
+            if nxt.value == 'default':
+                display = None
+                for follow in tokens[i + 2:i + 10]:
+                    if follow.value in ('{', ';') or follow.kind not in ('ident', 'punct'):
+                        break
+                    if follow.kind == 'ident' and follow.value not in _DEFAULT_WRAPPERS:
+                        display = follow.value
+                        break
+                exports['default'] = display or posixpath.splitext(posixpath.basename(me))[0]
+            elif nxt.value == '{':
+                names, j = _specifiers(tokens, j)
+                spec, k = _module_after(tokens, j)
+                if spec is not None:
+                    target = resolve_module(me, spec, known)
+                    reexports.extend([target, name, alias] for name, alias in names)
+                    statement_tokens.update(range(i, k))
+                    j = k
+                else:
+                    for name, alias in names:
+                        exports[alias] = name
+            elif nxt.value == '*':
+                alias = None
+                if j + 2 < n and tokens[j + 1].value == 'as':
+                    alias, j = tokens[j + 2].value, j + 2
+                spec, j = _module_after(tokens, j + 1)
+                if spec is not None:
+                    target = resolve_module(me, spec, known)
+                    if alias:
+                        imports[alias] = [target, '*', *lines.line_col(token.start)]
+                        exports[alias] = alias
+                    else:
+                        reexports.append([target, '*', '*'])
+            elif nxt.value in _DECLARATIONS:
+                for follow in tokens[i + 2:i + 5]:
+                    if follow.kind == 'ident' and follow.value not in _DECLARATIONS:
+                        exports[follow.value] = follow.value
+                        break
+            i = j
+            continue
+        i += 1
+
+    for element in result.elements:
+        head, _, member = (element.name or '').partition('.')
+        if head in imports:
+            uses.append([head, member or None, 'render', element.line, element.col, element.props])
+    for index, token in enumerate(tokens):
+        if token.kind != 'ident' or token.value not in imports or index in statement_tokens:
+            continue
+        prev = tokens[index - 1] if index else None
+        nxt = tokens[index + 1] if index + 1 < n else None
+        if prev is not None and prev.value in ('.', '?.'):
+            continue
+        member = None
+        if nxt is not None and nxt.value == '.' and imports[token.value][1] == '*' and index + 2 < n:
+            member = tokens[index + 2].value
+            nxt = tokens[index + 3] if index + 3 < n else None
+        kind = 'call' if nxt is not None and nxt.value == '(' else 'ref'
+        uses.append([token.value, member, kind, *lines.line_col(token.start), None])
+    return {'exports': exports, 'reexports': reexports, 'imports': imports, 'uses': uses}
+
+
+def _parse_job(args):
+    path, known = args
+    return rel(path), sha256_file(path), parse_file(path, known)
+
+
+class UsageIndex:
+    """The persisted per-file records plus the derived symbol -> usages map."""
+
+    def __init__(self, data):
+        self.files = data['files']
+        self.symbols = data['symbols']
+        self.names = data['names']
+
+    @classmethod
+    def load(cls):
+        """Return the index as of the last :meth:`update` without touching the sources, or ``None``."""
+        cache = load_cache(CACHE_NAME)
+        if cache.get('version') != INDEX_VERSION or not cache.get('files'):
+            return None
+        return cls(cache)
+
+    @classmethod
+    def update(cls, jobs=None):
+        """Load the cached index, re-parse changed files and return ``(index, parsed_count)``."""
+        cache = load_cache(CACHE_NAME)
+        if cache.get('version') != INDEX_VERSION:
+            cache = {'version': INDEX_VERSION, 'files': {}, 'symbols': {}, 'names': {}}
+        files = cache['files']
+        paths = source_files()
+        known = {rel(p) for p in paths}
+
+        stale = []
+        for path in paths:
+            key = rel(path)
+            st = path.stat()
+            entry = files.get(key)
+            if entry is not None and entry['stat'] == [st.st_mtime_ns, st.st_size]:
+                continue
+            if entry is not None and entry['sha'] == sha256_file(path):
+                entry['stat'] = [st.st_mtime_ns, st.st_size]
+                continue
+            stale.append(path)
+        removed = [key for key in files if key not in known]
+
+        if stale:
+            work = [(p, known) for p in stale]
+            if len(work) < 2 or jobs == 1:
+                results = [_parse_job(w) for w in work]
+            else:
+                with ProcessPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as pool:
+                    results = list(pool.map(_parse_job, work, chunksize=4))
+            for (key, sha, record), path in zip(results, stale):
+                st = path.stat()
+                files[key] = {'stat': [st.st_mtime_ns, st.st_size], 'sha': sha, **record}
+        for key in removed:
+            del files[key]
+
+        if stale or removed or not cache['symbols']:
+            cache['symbols'], cache['names'] = _build_symbols(files)
+        save_cache(CACHE_NAME, cache)
+        return cls(cache), len(stale)
+
+    def lookup(self, query):
+        """Return the symbol keys ``query`` names: a key, an export name or a default export's name."""
+        if query in self.symbols:
+            return [query]
+        return self.names.get(query, [])
+
+    def find(self, query, kind=None):
+        """Return ``{symbol: [[path, kind, line, col, props], ...]}`` for ``query``."""
+        return {key: [u for u in self.symbols.get(key, []) if kind is None or u[1] == kind]
+                for key in self.lookup(query)}
+
+
+def _resolve(files, target, name, depth=0):
+    """Follow re-exports until the file that defines ``name``; return its symbol key."""
+    record = files.get(target)
+    if record is None or depth > 8:
+        return f'{target}:{name}'
+    if name in record['exports']:
+        return f'{target}:{name}'
+    for source, imported, exported in record['reexports']:
+        if exported == name:
+            return _resolve(files, source, imported, depth + 1)
+        if exported == '*' and name in files.get(source, {}).get('exports', ()):
+            return f'{source}:{name}'
+    return f'{target}:{name}'
+
+
+def _build_symbols(files):
+    symbols, names = {}, {}
+    for path, record in files.items():
+        for exported, local in record['exports'].items():
+            key = f'{path}:{exported}'
+            symbols.setdefault(key, [])
+            display = local if exported == 'default' else exported
+            names.setdefault(display, []).append(key)
+    for path, record in files.items():
+        imports = record['imports']
+        for local, (target, name, line, col) in imports.items():
+            if name != '*':
+                symbols.setdefault(_resolve(files, target, name), []).append([path, 'import', line, col, None])
+        for local, member, kind, line, col, props in record['uses']:
+            target, name = imports[local][:2]
+            if name == '*':
+                if member is None:
+                    continue
+                name = member
+            symbols.setdefault(_resolve(files, target, name), []).append([path, kind, line, col, props])
+    for key, usages in symbols.items():
+        usages.sort(key=lambda u: (u[0], u[2], u[3]))
+        if ':' in key and key.split(':', 1)[0] not in files:
+            # Package symbols (react-native:View) are also findable by their bare name.
+            name = key.rsplit(':', 1)[1]
+            if key not in names.get(name, []):
+                names.setdefault(name, []).append(key)
+    for keys in names.values():
+        keys.sort()
+    return symbols, names
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--jobs', type=int)
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('update', help='bring the index up to date')
+    find = sub.add_parser('find', help='list the usages of a component, hook or other export')
+    find.add_argument('symbol', help='export name, default export name or path:export')
+    find.add_argument('--kind', choices=('import', 'render', 'call', 'ref'))
+    find.add_argument('--refresh', action='store_true', help='re-parse changed files before the lookup')
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    if args.command == 'update' or args.refresh:
+        index, parsed = UsageIndex.update(jobs=args.jobs)
+        if args.command == 'update':
+            print(f'{len(index.files)} files indexed, {parsed} re-parsed, {len(index.symbols)} symbols')
+            return 0
+        source = f'refreshed, {parsed} file(s) re-parsed'
+    else:
+        index = UsageIndex.load()
+        if index is None:
+            print('no usage index yet: run `python -m tools.usage_index update` or pass --refresh',
+                  file=sys.stderr)
+            return 1
+        source = 'index as of the last update'
+    found = index.find(args.symbol, kind=args.kind)
+    if not found:
+        print(f'{args.symbol}: no such export in the index', file=sys.stderr)
+        return 1
+    total = 0
+    for key, usages in found.items():
+        print(f'{key}')
+        for path, kind, line, col, props in usages:
+            suffix = f" [{', '.join(props)}]" if props else ''
+            print(f'  {path}:{line}:{col} {kind}{suffix}')
+        total += len(usages)
+    # Everything the caller waited for: loading (or refreshing) the index, the lookup and the output.
+    elapsed = (time.perf_counter() - started) * 1000
+    print(f'{total} usage(s) in {elapsed:.1f} ms ({source})', file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
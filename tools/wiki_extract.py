@@ -0,0 +1,600 @@
+"""Streaming extractor for saved wiki pages.
+
+Parses the HTML kept in ``.old_backup/html_temp``, ``docs/`` and
+``data/rookie_events_raw.html`` with :class:`html.parser.HTMLParser` fed in
+fixed-size chunks, so no DOM is ever built. Pages are decoded with
+:func:`tools.common.read_text`; text that still holds undecodable bytes
+(U+FFFD) is dropped with a warning rather than copied into ``heroes.json``.
+Four page layouts are recognised:
+
+* whiteoutsurvival.wiki hero detail pages (``#exploration-skills`` tabs)
+* whiteoutsurvival.wiki hero list (``.pet-card-item`` cards per generation tab)
+* whiteoutsurvival.wiki event lists (``.blue-bg-card-item`` cards)
+* whiteoutdata.com "Generation N Heroes" articles
+
+Hero records are normalised to the field names and Korean labels used by
+``data/heroes.json`` and only carry the fields the page actually provided, so
+they can be applied as partial upserts. A detail page's hero is the one its
+heading (or ``<title>``) names, resolved against the ids and names in
+``heroes.json``; when the file name (``sonya_wiki_ko.html``, ``소냐_wiki.html``)
+resolves to a different hero, or the heading matches no hero, the page is
+reported and produces no record (``docs/gwen_wiki.html`` is Norah's page).
+
+Every hero record is tagged with the language of the page (``lang``). The
+text fields of ``heroes.json`` are Korean, so records from English pages keep
+only language-neutral fields (type, generation, rarity, image); their names,
+descriptions and skill text are left out. Pages whose content hash is
+unchanged since the last run are not parsed again; their cached records are
+reused.
+
+Usage::
+
+    python -m tools.wiki_extract                       # default page set
+    python -m tools.wiki_extract docs/wayne_wiki_ko.html --out /tmp/wayne.json
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from html.parser import HTMLParser
+from pathlib import Path
+from urllib.parse import unquote, urlparse
+
+from tools.common import (CHUNK_SIZE, HEROES_JSON, REPO_ROOT, load_cache, read_text, rel, save_cache, sha256_file,
+                          text_language)
+
+CACHE_NAME = 'wiki_extract.json'
+# Bump when the record format changes so stale cache entries are re-parsed.
+EXTRACTOR_VERSION = 3
+
+DEFAULT_SOURCES = (
+    '.old_backup/html_temp/*.html',
+    'docs/*.html',
+    'data/rookie_events_raw.html',
+)
+
+TROOP_TYPES = {
+    'infantry': '보병',
+    'lancer': '창병',
+    'marksman': '궁병',
+}
+
+SKILL_SECTIONS = {
+    'exploration-skills': 'exploration',
+    'expedition-skills': 'expedition',
+    'special-skills': 'special',
+}
+
+EVENT_CATEGORIES = {
+    'rookie-events': '초보자',
+}
+
+# English names used by whiteoutdata.com that differ from our hero ids.
+ID_ALIASES = {
+    'renee': 'rene',
+    'gatot': 'kato',
+    'sonya': 'sonia',
+    'norah': 'nora',
+    'blanchette': 'blanche',
+    'gato': 'kato',
+    'garoal': 'karol',
+}
+
+# Fields that heroes.json holds in Korean; records from other languages leave them out.
+KOREAN_FIELDS = ('name', 'description', 'skills', 'equipment')
+
+# File name suffixes of the saved detail pages, longest first.
+PAGE_SUFFIXES = ('_wiki_temp', '_wiki_ko', '_wiki_en', '_detail', '_source', '_wiki', '_ko')
+
+_SPACE_RE = re.compile(r'\s+')
+_GEN_TITLE_RE = re.compile(r'Generation\s+(\d+)\s+Heroes', re.I)
+_GEN_PANE_RE = re.compile(r'generation-(\d+)')
+_ID_RE = re.compile(r'^[a-z]+$')
+_CLASS_RE = re.compile(r'\b(Infantry|Lancer|Marksman)\b', re.I)
+
+
+def clean_text(text):
+    return _SPACE_RE.sub(' ', text).strip()
+
+
+def hero_id(name):
+    slug = re.sub(r'[^a-z0-9]', '', name.lower())
+    return ID_ALIASES.get(slug, slug)
+
+
+def url_filename(url):
+    """Last path segment of ``url``, percent-decoded (``.../hero_skill_icon_500191.png``)."""
+    if not url:
+        return ''
+    return unquote(urlparse(url).path.rsplit('/', 1)[-1])
+
+
+def page_stem(path):
+    """The hero part of a saved detail page's file name (``sonya_wiki_ko.html`` -> ``sonya``)."""
+    stem = Path(path).stem
+    for suffix in PAGE_SUFFIXES:
+        if stem.endswith(suffix):
+            return stem[:-len(suffix)]
+    return stem
+
+
+def known_heroes(path=HEROES_JSON):
+    """Map every hero id and (Korean) name in ``path`` to the hero id."""
+    index = {}
+    for record in json.loads(read_text(path)):
+        index[record['id']] = record['id']
+        if record.get('name'):
+            index.setdefault(record['name'], record['id'])
+    return index
+
+
+def resolve_hero_id(stem, known):
+    """Hero id for a page file stem or hero name, or ``None`` if it matches no known hero."""
+    slug = hero_id(stem)
+    if slug in known:
+        return known[slug]
+    return known.get(stem.strip())
+
+
+def tag_language(record, lang):
+    """Tag ``record`` with ``lang``; drop the :data:`KOREAN_FIELDS` unless it is Korean."""
+    record['lang'] = lang
+    if lang != 'ko':
+        for key in KOREAN_FIELDS:
+            record.pop(key, None)
+    return record
+
+
+def resolve_detail(detail, known):
+    """Return ``(hero id, None)`` for a parsed detail page, or ``(None, reason)`` if it cannot be trusted."""
+    title = detail.get('title')
+    if not title:
+        return None, 'no heading or title to identify the hero'
+    by_title = resolve_hero_id(title, known)
+    if by_title is None:
+        return None, f'heading {title!r} matches no known hero'
+    by_name = resolve_hero_id(detail['page'], known)
+    if by_name is not None and by_name != by_title:
+        return None, f'file name says {by_name!r} but the page is {title!r} ({by_title!r})'
+    return by_title, None
+
+
+class WikiPageParser(HTMLParser):
+    """Event-driven parser that collects hero and event records from one page."""
+
+    def __init__(self, source):
+        super().__init__(convert_charrefs=True)
+        self.source = source
+        self.heroes = []
+        self.events = []
+        self.detail = None
+
+        self._depth = 0
+        self._title = []
+        self._in_title = False
+        self._heading = None
+        self._capture = None
+        self._buffer = []
+
+        self._pane = None
+        self._pane_depth = None
+
+        # wiki detail pages
+        self._section = None
+        self._section_depth = None
+        self._skill = None
+        self._skill_depth = None
+        self._skills = {}
+        self._detail_type = None
+
+        # wiki hero / event list cards
+        self._card = None
+        self._card_kind = None
+        self._card_depth = None
+
+        # whiteoutdata articles
+        self._in_article = False
+        self._article_depth = None
+        self._article_hero = None
+        self._article_section = None
+        self._paragraph = None
+        self._table_row = None
+        self._table_cell = None
+        self._skill_table = False
+
+    # -- helpers -----------------------------------------------------------
+
+    def _start_capture(self, field):
+        self._capture = field
+        self._buffer = []
+
+    def _end_capture(self):
+        field, text = self._capture, clean_text(''.join(self._buffer))
+        self._capture = None
+        self._buffer = []
+        return field, text
+
+    # -- HTMLParser callbacks ------------------------------------------------
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        classes = (attrs.get('class') or '').split()
+        if tag == 'title':
+            self._in_title = True
+        if tag == 'div':
+            self._depth += 1
+            self._open_div(attrs, classes)
+        elif tag == 'img':
+            self._image(attrs, classes)
+        elif tag == 'h2' and 'fs-1' in classes and not self._in_article:
+            self._start_capture('heading')
+        elif tag == 'a' and self._card is not None:
+            self._card.setdefault('link', attrs.get('href') or '')
+            self._start_capture('name')
+        elif tag == 'h5' and self._skill is not None:
+            self._start_capture('name')
+        elif tag == 'p' and self._skill is not None:
+            self._start_capture('desc')
+        elif self._in_article:
+            self._article_start(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        if tag == 'img':
+            attrs = dict(attrs)
+            self._image(attrs, (attrs.get('class') or '').split())
+
+    def handle_endtag(self, tag):
+        if tag == 'title':
+            self._in_title = False
+        elif tag == 'div':
+            self._close_div()
+            self._depth -= 1
+        elif tag in ('h5', 'p', 'a') and self._capture in ('name', 'desc'):
+            field, text = self._end_capture()
+            target = self._skill if self._skill is not None else self._card
+            if target is not None and text:
+                target.setdefault(field, text)
+        elif tag == 'h2' and self._capture == 'heading':
+            _, text = self._end_capture()
+            self._heading = self._heading or text
+        elif self._in_article:
+            self._article_end(tag)
+
+    def handle_data(self, data):
+        if self._in_title:
+            self._title.append(data)
+        if self._capture is not None:
+            self._buffer.append(data)
+        if self._paragraph is not None:
+            self._paragraph['text'].append(data)
+            if self._paragraph['strong'] is not None:
+                self._paragraph['strong'].append(data)
+        if self._table_cell is not None:
+            self._table_cell.append(data)
+
+    # -- div bookkeeping -----------------------------------------------------
+
+    def _open_div(self, attrs, classes):
+        div_id = attrs.get('id')
+        if 'tab-pane' in classes and div_id:
+            self._pane, self._pane_depth = div_id, self._depth
+        if div_id in SKILL_SECTIONS:
+            self._section, self._section_depth = SKILL_SECTIONS[div_id], self._depth
+        elif self._section and 'bg-dark' in classes:
+            self._skill, self._skill_depth = {}, self._depth
+        elif 'pet-card-item' in classes:
+            self._card, self._card_kind, self._card_depth = {}, 'hero', self._depth
+        elif 'blue-bg-card-item' in classes:
+            self._card, self._card_kind, self._card_depth = {}, 'event', self._depth
+        elif 'dynamic-entry-content' in classes:
+            self._in_article, self._article_depth = True, self._depth
+
+    def _close_div(self):
+        depth = self._depth
+        if self._skill is not None and depth == self._skill_depth:
+            if self._skill.get('name'):
+                skill = {'name': self._skill['name'], 'desc': self._skill.get('desc', '')}
+                if self._skill.get('icon'):
+                    skill['icon'] = self._skill['icon']
+                self._skills.setdefault(self._section, []).append(skill)
+            self._skill = None
+        elif self._section and depth == self._section_depth:
+            self._section = None
+        elif self._card is not None and depth == self._card_depth:
+            self._finish_card()
+        elif self._in_article and depth == self._article_depth:
+            self._finish_article_hero()
+            self._in_article = False
+        if self._pane and depth == self._pane_depth:
+            self._pane = None
+
+    def _image(self, attrs, classes):
+        src = attrs.get('src') or ''
+        name = url_filename(src)
+        stem = name.rsplit('.', 1)[0]
+        if self._skill is not None:
+            if name:
+                self._skill.setdefault('icon', name)
+        elif self._card is not None:
+            if stem in TROOP_TYPES:
+                self._card.setdefault('type', TROOP_TYPES[stem])
+            elif 'pet-image' in classes or 'blue-bg-image' in classes:
+                self._card['image'] = name if self._card_kind == 'hero' else src
+        elif stem in TROOP_TYPES and self._detail_type is None:
+            self._detail_type = TROOP_TYPES[stem]
+
+    # -- list cards ----------------------------------------------------------
+
+    def _finish_card(self):
+        card, kind = self._card, self._card_kind
+        self._card = self._card_kind = self._card_depth = None
+        if not card.get('name'):
+            return
+        if kind == 'event':
+            category = EVENT_CATEGORIES.get(self._pane, self._pane or '')
+            self.events.append({
+                'id': '%s_%d' % (self._pane or 'event', len(self.events)),
+                'title': card['name'],
+                'category': category,
+                'imageUrl': card.get('image', ''),
+                'link': card.get('link', ''),
+            })
+            return
+        hero = {'name': card['name']}
+        stem = card.get('image', '').rsplit('.', 1)[0]
+        # Older cards use upload timestamps as file names; those carry no hero id.
+        if _ID_RE.match(stem):
+            hero['id'] = hero_id(stem)
+            hero['image'] = card['image']
+        if card.get('type'):
+            hero['type'] = card['type']
+        pane = self._pane or ''
+        match = _GEN_PANE_RE.match(pane)
+        if match:
+            hero['gen'] = 'S' + match.group(1)
+            hero['rarity'] = '전설'
+        elif pane.startswith('epic'):
+            hero['gen'], hero['rarity'] = '상설', '에픽'
+        elif pane.startswith('rare'):
+            hero['gen'], hero['rarity'] = '상설', '레어'
+        if hero.get('id'):
+            self.heroes.append(tag_language(hero, text_language(hero['name'])))
+
+    # -- whiteoutdata articles -------------------------------------------------
+
+    def _article_start(self, tag):
+        if tag in ('h2', 'h3'):
+            self._start_capture(tag)
+        elif tag in ('p', 'li'):
+            self._paragraph = {'text': [], 'strong': None, 'name': None}
+        elif tag == 'strong' and self._paragraph is not None and self._paragraph['name'] is None:
+            self._paragraph['strong'] = []
+        elif tag == 'table':
+            self._skill_table = False
+        elif tag == 'tr':
+            self._table_row = []
+        elif tag in ('td', 'th') and self._table_row is not None:
+            self._table_cell = []
+
+    def _article_end(self, tag):
+        if tag in ('h2', 'h3') and self._capture == tag:
+            _, text = self._end_capture()
+            if tag == 'h2':
+                self._finish_article_hero()
+                self._article_hero = {'name': text, 'skills': {}}
+                self._article_section = None
+            elif self._article_hero is not None:
+                lowered = text.lower()
+                if 'exploration' in lowered:
+                    self._article_section = 'exploration'
+                elif 'expedition' in lowered:
+                    self._article_section = 'expedition'
+                else:
+                    self._article_section = None
+        elif tag == 'strong' and self._paragraph is not None and self._paragraph['strong'] is not None:
+            self._paragraph['name'] = clean_text(''.join(self._paragraph['strong'])).rstrip(':').strip()
+            self._paragraph['strong'] = None
+        elif tag in ('td', 'th') and self._table_cell is not None:
+            text = clean_text(''.join(self._table_cell))
+            self._table_cell = None
+            if tag == 'th':
+                self._skill_table = self._skill_table or text.lower() == 'skill name'
+            else:
+                self._table_row.append(text)
+        elif tag == 'tr' and self._table_row is not None:
+            # "Skill Name | Description | Upgrade Preview" tables (Gen 8+ articles)
+            row, self._table_row = self._table_row, None
+            if self._skill_table and self._article_section and self._article_hero and len(row) >= 2 and row[0]:
+                self._article_hero['skills'].setdefault(self._article_section, []).append(
+                    {'name': row[0], 'desc': row[1]})
+        elif tag in ('p', 'li') and self._paragraph is not None:
+            paragraph, self._paragraph = self._paragraph, None
+            hero = self._article_hero
+            if hero is None:
+                return
+            text = clean_text(''.join(paragraph['text']))
+            if 'type' not in hero:
+                match = _CLASS_RE.search(text)
+                if match:
+                    hero['type'] = TROOP_TYPES[match.group(1).lower()]
+            name = paragraph['name']
+            if self._article_section and name and text.startswith(name):
+                desc = text[len(name):].lstrip(': ').strip()
+                hero['skills'].setdefault(self._article_section, []).append({'name': name, 'desc': desc})
+
+    def _finish_article_hero(self):
+        hero, self._article_hero = self._article_hero, None
+        if hero is None or not hero['skills']:
+            return
+        record = {'id': hero_id(hero['name']), 'name': hero['name']}
+        match = _GEN_TITLE_RE.search(''.join(self._title))
+        if match:
+            record['gen'] = 'S' + match.group(1)
+            record['rarity'] = '전설'
+        if hero.get('type'):
+            record['type'] = hero['type']
+        record['skills'] = hero['skills']
+        self.heroes.append(tag_language(record, text_language(hero['name'])))
+
+    # -- page end ------------------------------------------------------------
+
+    def finish(self):
+        self.close()
+        self._finish_article_hero()
+        if self._skills:
+            title = self._heading or clean_text(''.join(self._title)).split(' - ')[0]
+            hero = {'page': page_stem(self.source)}
+            if title:
+                hero['title'] = title
+            if self._detail_type:
+                hero['type'] = self._detail_type
+            skills = {k: v for k, v in self._skills.items() if k != 'special'}
+            if skills:
+                hero['skills'] = skills
+            if self._skills.get('special'):
+                hero['equipment'] = {'skills': self._skills['special']}
+            # The id and language are resolved against heroes.json by extract(), after the cache.
+            self.detail = hero
+        return {'heroes': self.heroes, 'events': self.events, 'detail': self.detail}
+
+
+def _undecodable(value):
+    if isinstance(value, str):
+        return '\ufffd' in value
+    if isinstance(value, dict):
+        return any(_undecodable(v) for v in value.values())
+    if isinstance(value, list):
+        return any(_undecodable(v) for v in value)
+    return False
+
+
+def _scrub(record, label, warnings):
+    """Drop the fields of ``record`` holding U+FFFD; return ``None`` if its id itself is lost."""
+    bad = [key for key, value in record.items() if _undecodable(value)]
+    for key in bad:
+        warnings.append(f'{label}: dropped {key!r} (undecodable text)')
+        del record[key]
+    if any(key in bad for key in ('id', 'page')):
+        return None
+    return record
+
+
+def parse_page(path):
+    """Parse one page and return its ``{'heroes', 'events', 'detail', 'warnings'}`` records."""
+    parser = WikiPageParser(str(path))
+    text = read_text(path)
+    for start in range(0, len(text), CHUNK_SIZE):
+        parser.feed(text[start:start + CHUNK_SIZE])
+    records = parser.finish()
+    page, warnings = rel(path), []
+    records['heroes'] = [h for h in records['heroes']
+                         if _scrub(h, f"{page} hero {h.get('id') or h.get('name')!r}", warnings) is not None]
+    records['events'] = [e for e in records['events']
+                         if _scrub(e, f"{page} event {e.get('id')!r}", warnings) is not None]
+    if records['detail'] is not None:
+        records['detail'] = _scrub(records['detail'], f'{page} detail', warnings)
+    records['warnings'] = warnings
+    return records
+
+
+def _parse_job(path):
+    return rel(path), parse_page(path)
+
+
+def collect_sources(patterns):
+    paths = []
+    for pattern in patterns:
+        candidate = REPO_ROOT / pattern
+        if candidate.is_file():
+            paths.append(candidate)
+        else:
+            paths.extend(sorted(REPO_ROOT.glob(pattern)))
+    return [p for p in dict.fromkeys(paths) if p.stat().st_size > 0]
+
+
+def extract(paths, jobs=None, force=False, known=None):
+    """Extract records from ``paths``, reusing cached results for unchanged pages.
+
+    Returns ``(results, stats)`` where ``results`` maps each page (relative
+    path) to its records in input order. Detail pages are resolved against
+    ``known`` (default: :func:`known_heroes`) with :func:`resolve_detail`;
+    ``stats['unresolved']`` lists ``(page, reason)`` for those skipped, and
+    ``stats['warnings']`` the fields dropped for undecodable text.
+    """
+    cache = {} if force else load_cache(CACHE_NAME)
+    if cache.get('version') != EXTRACTOR_VERSION:
+        cache = {'version': EXTRACTOR_VERSION, 'pages': {}}
+    pages = cache['pages']
+
+    digests = {rel(p): sha256_file(p) for p in paths}
+    stale = [p for p in paths if pages.get(rel(p), {}).get('sha256') != digests[rel(p)]]
+
+    if stale:
+        workers = jobs or min(len(stale), os.cpu_count() or 1)
+        if workers > 1 and len(stale) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                parsed = list(pool.map(_parse_job, stale))
+        else:
+            parsed = [_parse_job(p) for p in stale]
+        for key, records in parsed:
+            pages[key] = {'sha256': digests[key], **records}
+
+    for key in list(pages):
+        if key not in digests and not (REPO_ROOT / key).exists():
+            del pages[key]
+    save_cache(CACHE_NAME, cache)
+
+    if known is None:
+        known = known_heroes()
+    results, unresolved, warnings = {}, [], []
+    for p in paths:
+        page = pages[rel(p)]
+        heroes = list(page['heroes'])
+        detail = page['detail']
+        if detail is not None:
+            resolved, reason = resolve_detail(detail, known)
+            if resolved is None:
+                unresolved.append((rel(p), reason))
+            else:
+                record = {'id': resolved, 'name': detail['title'],
+                          **{k: v for k, v in detail.items() if k not in ('page', 'title')}}
+                heroes.append(tag_language(record, text_language(detail['title'])))
+        results[rel(p)] = {'heroes': heroes, 'events': page['events']}
+        warnings.extend(page['warnings'])
+    return results, {'pages': len(paths), 'parsed': len(stale), 'skipped': len(paths) - len(stale),
+                     'unresolved': unresolved, 'warnings': warnings}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('sources', nargs='*', help='pages or glob patterns relative to the repo root')
+    parser.add_argument('--out', help='write the records here instead of stdout')
+    parser.add_argument('--jobs', type=int, help='parallel worker processes (default: CPU count)')
+    parser.add_argument('--force', action='store_true', help='ignore the content-hash cache')
+    args = parser.parse_args(argv)
+
+    paths = collect_sources(args.sources or DEFAULT_SOURCES)
+    results, stats = extract(paths, jobs=args.jobs, force=args.force)
+
+    heroes = [dict(hero, source=page) for page, records in results.items() for hero in records['heroes']]
+    events = [dict(event, source=page) for page, records in results.items() for event in records['events']]
+    payload = json.dumps({'heroes': heroes, 'events': events}, ensure_ascii=False, indent=4) + '\n'
+    if args.out:
+        Path(args.out).write_text(payload, encoding='utf-8')
+    else:
+        sys.stdout.write(payload)
+
+    for warning in stats['warnings']:
+        print(f'warning: {warning}', file=sys.stderr)
+    for page, reason in stats['unresolved']:
+        print(f'warning: {page}: {reason}; page skipped', file=sys.stderr)
+    print(f"pages: {stats['pages']}, parsed: {stats['parsed']}, unchanged: {stats['skipped']}, "
+          f"heroes: {len(heroes)}, events: {len(events)}", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())